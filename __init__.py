@@ -3,11 +3,13 @@ Malleus Anki Addon
 Main entry point for the addon
 """
 import os
+import time
 from aqt import mw, dialogs
 from aqt.qt import QAction, QShortcut, QKeySequence, Qt, QMenu
 from aqt.utils import showInfo
 from anki.hooks import addHook
-from aqt.gui_hooks import browser_menus_did_init, browser_will_show, add_cards_did_init, editor_did_load_note
+from aqt.gui_hooks import (browser_menus_did_init, browser_will_show, add_cards_did_init,
+                           editor_did_load_note, profile_will_close)
 import weakref
 
 # Import sip for Qt object checking
@@ -20,23 +22,39 @@ except ImportError:
 # Load environment variables
 addon_dir = os.path.dirname(os.path.realpath(__file__))
 
-# Import submodules
+# Startup only registers menu actions, hooks and shortcuts.  The heavy modules
+# (the dialogs, notion_cache and requests) are imported on first use, and the
+# cache — legacy migration, startup cache check — is set up once the main
+# window has settled (see _deferred_startup).  benchmarks/bench_import_time.py
+# fails if one of them creeps back into the module-level imports below.
 from .config import load_config, DATABASES, GENERATED_DATABASES
-from .notion_cache import NotionCache
-from .ui.page_selector import NotionPageSelector
-from .ui.randomization_dialog import show_randomization_dialog, setup_editor_buttons
-from .utils import open_browser_with_search
-from .ui.update_subject_tags import update_subject_tags_for_browser
 
 # Initialize config first
 config = load_config()
 
-# Initialize cache instance
-notion_cache = NotionCache(addon_dir, config)
+# Let the main window finish showing before any cache work starts.
+STARTUP_DELAY_MS = 2000
+
+_notion_cache = None
+
+
+def get_notion_cache():
+    """The add-on's NotionCache, created on first use."""
+    global _notion_cache
+    if _notion_cache is None:
+        from .notion_cache import NotionCache
+        _notion_cache = NotionCache(addon_dir, config)
+    return _notion_cache
+
 
 def show_page_selector(parent=None):
-    """Show the page selector dialog with the appropriate parent window"""
+    """Show the page selector dialog with the appropriate parent window.
+
+    A closed dialog is only hidden; the next open on the same parent shows it
+    again (reset to a fresh state) instead of building a new one."""
+    started = time.perf_counter()
     from aqt.qt import QWidget
+    from .ui.page_selector import NotionPageSelector
     
     # Ensure we have a proper QWidget parent
     if parent is None or not isinstance(parent, QWidget):
@@ -49,43 +67,65 @@ def show_page_selector(parent=None):
     # Clean up any deleted dialogs
     parent._malleus_dialogs = [d for d in parent._malleus_dialogs if not sip.isdeleted(d)]
 
-    # Create new dialog with proper parent
-    dialog = NotionPageSelector(parent, notion_cache, config)
+    # Keep at most one hidden dialog per parent: reuse it if it was built for
+    # the current layout (see NotionPageSelector.can_reuse), else drop it.
+    dialog = None
+    for candidate in list(parent._malleus_dialogs):
+        if not candidate.isHidden():
+            continue
+        if dialog is None and candidate.can_reuse():
+            dialog = candidate
+        else:
+            parent._malleus_dialogs.remove(candidate)
+            candidate.deleteLater()
+
+    reused = dialog is not None
+    if reused:
+        dialog.reset_for_show()
+    else:
+        # Create new dialog with proper parent
+        dialog = NotionPageSelector(parent, get_notion_cache(), config)
+        parent._malleus_dialogs.append(dialog)
 
-    # Set up browser note selection change handler
     from aqt.browser import Browser
     if isinstance(parent, Browser):
-        # Store original currentRowChanged handler
-        original_handler = parent.onRowChanged
+        _follow_browser_note(parent, dialog)
 
-        # Create a wrapper function that updates the dialog
-        def row_changed_wrapper(current, previous):
-            # Call the original handler first
-            original_handler(current, previous)
+    dialog.present(started, reused=reused)
+    return dialog
 
-            # Update the dialog's current_note reference
-            if dialog and not sip.isdeleted(dialog):
-                if hasattr(parent, 'editor') and hasattr(parent.editor, 'note'):
-                    dialog.current_note = parent.editor.note
 
-        # Replace the browser's row change handler
-        parent.onRowChanged = row_changed_wrapper
+def _follow_browser_note(browser, dialog):
+    """While `dialog` is open, keep its current_note on the note selected in
+    `browser`."""
+    # Store original currentRowChanged handler
+    original_handler = browser.onRowChanged
 
-        # Restore original handler when dialog closes
-        def on_dialog_finished():
-            if hasattr(parent, 'onRowChanged') and parent.onRowChanged == row_changed_wrapper:
-                parent.onRowChanged = original_handler
+    # Create a wrapper function that updates the dialog
+    def row_changed_wrapper(current, previous):
+        # Call the original handler first
+        original_handler(current, previous)
 
-        dialog.finished.connect(on_dialog_finished)
+        # Update the dialog's current_note reference
+        if dialog and not sip.isdeleted(dialog):
+            if hasattr(browser, 'editor') and hasattr(browser.editor, 'note'):
+                dialog.current_note = browser.editor.note
 
-    parent._malleus_dialogs.append(dialog)
-    dialog.show()
-    return dialog
+    # Replace the browser's row change handler
+    browser.onRowChanged = row_changed_wrapper
+
+    # Restore original handler when dialog closes (once: the dialog is reused)
+    def on_dialog_finished():
+        if hasattr(browser, 'onRowChanged') and browser.onRowChanged == row_changed_wrapper:
+            browser.onRowChanged = original_handler
+        dialog.finished.disconnect(on_dialog_finished)
+
+    dialog.finished.connect(on_dialog_finished)
 
 def download_github_cache(browser=None):
     """Download cache from GitHub repository and update cache from Notion"""
     from .cache_updater import perform_cache_update
-    perform_cache_update(notion_cache, mw)
+    perform_cache_update(get_notion_cache(), mw)
 
 # Register shortcut in a window
 def register_shortcut(window):
@@ -251,50 +291,111 @@ def setup_browser_context_menu(browser, menu):
 
     # ── Update Malleus Subject Tags ───────────────────────────────────────────
     update_tags_action = QAction("Update Malleus Subject Tags", browser)
-    update_tags_action.triggered.connect(
-        lambda: update_subject_tags_for_browser(browser, notion_cache, config)
-    )
+    update_tags_action.triggered.connect(lambda: _update_subject_tags(browser))
     menu.addAction(update_tags_action)
 
+def _update_subject_tags(browser):
+    from .ui.update_subject_tags import update_subject_tags_for_browser
+    update_subject_tags_for_browser(browser, get_notion_cache(), config)
+
+
+def _setup_editor_buttons(buttons, editor):
+    from .ui.randomization_dialog import setup_editor_buttons
+    return setup_editor_buttons(buttons, editor, show_page_selector)
+
+
+def _cancel_updates():
+    # Nothing to cancel if the cache was never created.
+    if _notion_cache is not None:
+        _notion_cache.cancel_updates()
+
+
 def init_notion_cache():
     """Initialize the cache check asynchronously on startup"""
     import threading
-    
+    notion_cache = get_notion_cache()
+
     def check_caches():
         try:
+            # Off the main thread: the one-time copy from the old cache/ dir.
+            notion_cache.migrate_legacy_cache()
             print("Starting background cache check...")
-            
+            notion_cache.begin_refresh_cycle()
+            # One conditional request for every seed's hash (None if unavailable:
+            # then each expired cache checks its own seed).
+            manifest = notion_cache.fetch_seed_manifest()
+
+            outdated = []
             for db_id, name in DATABASES:
                 if not db_id:
                     print(f"Skipping {name} - no database ID")
                     continue
 
                 print(f"Checking {name} cache status...")
-                if notion_cache.is_cache_expired(db_id):
-                    # Both ordinary and generated DBs download their freshly-built
-                    # cache from GitHub (the daily CI build commits the generated
-                    # seed too) — cheap, no slow runtime regenerate.
-                    print(f"{name} cache is expired, attempting GitHub download...")
-                    if notion_cache.download_cache_from_github(db_id):
-                        print(f"Successfully updated {name} cache from GitHub")
-                        continue
-                    # Fallback: rebuild from Notion (full regenerate for generated
-                    # DBs so we never merge raw pages over the generated cache).
-                    print(f"GitHub download failed for {name}, falling back to Notion update...")
-                    notion_cache.update_cache_async(
-                        db_id, force=True, full=(db_id in GENERATED_DATABASES)
-                    )
+                if notion_cache.is_cache_expired(db_id) or notion_cache.seed_outdated(db_id, manifest):
+                    print(f"{name} cache is out of date, attempting GitHub download...")
+                    outdated.append((db_id, name))
                 else:
                     print(f"{name} cache is up to date")
 
+            # Both ordinary and generated DBs download their freshly-built cache
+            # from GitHub (the daily CI build commits the generated seed too) —
+            # cheap, no slow runtime regenerate — all out-of-date seeds at once.
+            results = notion_cache.download_caches_from_github(
+                [db_id for db_id, _ in outdated], manifest)
+            for db_id, name in outdated:
+                if results.get(db_id):
+                    print(f"Successfully updated {name} cache from GitHub")
+                    continue
+                # Fallback: rebuild from Notion (full regenerate for generated
+                # DBs so we never merge raw pages over the generated cache).
+                print(f"GitHub download failed for {name}, falling back to Notion update...")
+                notion_cache.update_cache_async(
+                    db_id, force=True, full=(db_id in GENERATED_DATABASES)
+                )
+
             print("Background cache check completed")
 
         except Exception as e:
             print(f"Error in background cache check: {e}")
 
+        # Caches are as fresh as startup will make them: warm them up.
+        if config.get('warmup', True):
+            notion_cache.warm_up(config.get('warmup_memory_mb', 256), _warmup_steps())
+
     thread = threading.Thread(target=check_caches, daemon=True)
     thread.start()
 
+
+def _warmup_steps():
+    """The add-on-level warm-up steps, after NotionCache's own (caches and
+    search indexes): what the first dialog open and 'Suggest tags' pay."""
+    from .warmup import estimate_bytes
+
+    def suggestion_index():
+        from .suggest_tags import build_index
+        return estimate_bytes(build_index(get_notion_cache()))
+
+    def page_selector_module():
+        from .ui import page_selector  # noqa: F401 — import cost only
+
+    def note_tag_counts():
+        from .ui.page_selector import note_tag_strings
+        col = mw.col
+        return estimate_bytes(note_tag_strings(col)) if col is not None else 0
+
+    steps = [("suggestion index", suggestion_index),
+             ("page selector", page_selector_module)]
+    if config.get('show_card_counts', False):
+        steps.append(("note tag counts", note_tag_counts))
+    return steps
+
+
+def _deferred_startup():
+    """Cache setup, once the main window is up and idle."""
+    from aqt.qt import QTimer
+    QTimer.singleShot(STARTUP_DELAY_MS, init_notion_cache)
+
 # Setup menu action
 malleus_add_card_action = QAction("Malleus Find/Add Cards", mw)
 malleus_add_card_action.triggered.connect(show_page_selector)
@@ -305,6 +406,8 @@ browser_menus_did_init.append(setup_browser_menu)
 browser_will_show.append(on_browser_setup)
 add_cards_did_init.append(on_addcards_setup)
 editor_did_load_note.append(on_editor_did_load_note)
+# Don't leave database updates running against a closed profile.
+profile_will_close.append(_cancel_updates)
 
 # Register browser context menu hook
 try:
@@ -316,10 +419,15 @@ except ImportError:
     print("Browser context menu hook not available in this Anki version")
 
 # Setup editor buttons with callback
-addHook("setupEditorButtons", lambda buttons, editor: setup_editor_buttons(buttons, editor, show_page_selector))
+addHook("setupEditorButtons", _setup_editor_buttons)
 
 # Initial registration for main window
 register_shortcuts()
 
-# Initialize cache when addon is loaded
-init_notion_cache()
+# Initialize the cache once the main window is up
+try:
+    from aqt.gui_hooks import main_window_did_init
+    main_window_did_init.append(_deferred_startup)
+except ImportError:
+    # Older Anki without the hook
+    _deferred_startup()
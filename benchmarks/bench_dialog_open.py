@@ -0,0 +1,74 @@
+"""
+Open-to-first-paint latency of the page selector dialog.
+
+The dialog itself measures it: show_page_selector notes when the user asked
+for the dialog, and the dialog's first paintEvent logs the elapsed time —
+split into opens that built a new dialog and opens that reused the hidden one
+— to <addon>/user_files/_dialog_open.jsonl (see log_open_latency in
+ui/page_selector.py).  The log is off by default: set "log_dialog_open": true
+in the add-on's config (Tools → Add-ons → Config) first.  Opening needs a
+running Anki, so this reports on that log rather than driving the dialog:
+open the selector a few times in Anki, then run
+
+    python benchmarks/bench_dialog_open.py                    # the repo's user_files/
+    python benchmarks/bench_dialog_open.py ~/.local/share/Anki2/addons21/<id>/user_files/_dialog_open.jsonl
+    python benchmarks/bench_dialog_open.py --last 20 --json bench_output.txt
+"""
+import argparse
+import json
+import statistics
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_LOG = ROOT / "user_files" / "_dialog_open.jsonl"
+
+
+def load(path: Path, last: int = 0) -> list:
+    records = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        try:
+            records.append(json.loads(line))
+        except ValueError:
+            continue                    # a line cut short by a crash
+    return records[-last:] if last else records
+
+
+def percentile(values: list, q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q * (len(values) - 1))))]
+
+
+def summarise(records: list) -> dict:
+    out = {}
+    for kind, reused in (("new", False), ("reused", True)):
+        ms = [r["first_paint_ms"] for r in records if bool(r.get("reused")) == reused]
+        if ms:
+            out[kind] = {"opens": len(ms), "median_ms": statistics.median(ms),
+                         "p95_ms": percentile(ms, 0.95), "max_ms": max(ms)}
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("log", nargs="?", type=Path, default=DEFAULT_LOG,
+                        help="the _dialog_open.jsonl to read")
+    parser.add_argument("--last", type=int, default=0, help="only the last N opens")
+    parser.add_argument("--json", type=Path, help="also write the summary as JSON here")
+    args = parser.parse_args()
+
+    if not args.log.exists():
+        parser.exit(1, f"{args.log}: no opens logged yet — set \"log_dialog_open\": true in the "
+                       "add-on config and open the page selector in Anki first\n")
+    summary = summarise(load(args.log, args.last))
+    for kind, row in summary.items():
+        print(f"{kind:<8} {row['opens']:>4} opens  median {row['median_ms']:7.1f}ms  "
+              f"p95 {row['p95_ms']:7.1f}ms  max {row['max_ms']:7.1f}ms")
+    if "new" in summary and "reused" in summary:
+        print(f"reuse saves {summary['new']['median_ms'] - summary['reused']['median_ms']:.1f}ms "
+              "at the median")
+    if args.json:
+        args.json.write_text(json.dumps(summary, indent=1))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Scaling benchmark for the generated-database tag generators.
+
+Times `cache_generation.generate_from_pages` for each kind (subjects,
+pharmacology, guidelines) over synthetic Notion graphs (see synthetic.py) at
+several multiples of today's database sizes, and reports wall time plus peak
+traced memory.  Runs offline in a plain Python environment — the generators
+are aqt-free.
+
+Run from the repo root:
+    python benchmarks/bench_generators.py                      # 1x, 10x, 50x
+    python benchmarks/bench_generators.py --scales 1,10 --kinds subjects --profile
+    python benchmarks/bench_generators.py --json bench_output.txt
+
+Each measurement generates a fresh dataset and times only the
+generate_from_pages call.
+Peak memory comes from a separate tracemalloc pass so tracing overhead does not
+distort the timings.
+"""
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from cache_generation import generate_from_pages          # noqa: E402
+from generation_profile import GenerationProfile          # noqa: E402
+from synthetic import make_dataset                        # noqa: E402
+
+KINDS = ("subjects", "pharmacology", "guidelines")
+
+
+def _run(kind, scale, seed, profile=None):
+    ds = make_dataset(kind, scale=scale, seed=seed)
+    t0 = time.perf_counter()
+    out = generate_from_pages(kind, ds.pages, ds.qb_pages, ds.rotation_pages,
+                              profile=profile)
+    return time.perf_counter() - t0, len(ds.pages), len(out)
+
+
+def _peak_memory(kind, scale, seed):
+    ds = make_dataset(kind, scale=scale, seed=seed)
+    tracemalloc.start()
+    try:
+        generate_from_pages(kind, ds.pages, ds.qb_pages, ds.rotation_pages)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def bench(kind, scale, repeat=1, seed=0, profile=False, memory=True):
+    times = []
+    for _ in range(repeat):
+        elapsed, n_in, n_out = _run(kind, scale, seed)
+        times.append(elapsed)
+    result = {
+        "kind": kind,
+        "scale": scale,
+        "pages_in": n_in,
+        "pages_out": n_out,
+        "best_s": round(min(times), 4),
+        "mean_s": round(sum(times) / len(times), 4),
+    }
+    if memory:
+        result["peak_mb"] = round(_peak_memory(kind, scale, seed) / 2 ** 20, 2)
+    if profile:
+        prof = GenerationProfile(kind)
+        _run(kind, scale, seed, profile=prof)
+        result["profile"] = prof.as_dict()
+    return result
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--kinds", default=",".join(KINDS))
+    ap.add_argument("--scales", default="1,10,50")
+    ap.add_argument("--repeat", type=int, default=1)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--no-memory", action="store_true",
+                    help="skip the tracemalloc pass (much faster at 50x)")
+    ap.add_argument("--profile", action="store_true",
+                    help="also print the per-stage generation profile")
+    ap.add_argument("--json", metavar="PATH", help="write results as JSON")
+    args = ap.parse_args(argv)
+
+    kinds = [k.strip() for k in args.kinds.split(",") if k.strip()]
+    scales = [float(s) for s in args.scales.split(",") if s.strip()]
+    results = []
+    print(f"{'kind':<13}{'scale':>6}{'pages':>9}{'out':>8}{'best s':>10}{'peak MB':>10}")
+    for kind in kinds:
+        for scale in scales:
+            r = bench(kind, scale, repeat=args.repeat, seed=args.seed,
+                      profile=args.profile, memory=not args.no_memory)
+            results.append(r)
+            print(f"{kind:<13}{scale:>5g}x{r['pages_in']:>9}{r['pages_out']:>8}"
+                  f"{r['best_s']:>10.3f}{r.get('peak_mb', float('nan')):>10.1f}")
+            if args.profile:
+                stages = r["profile"]["stages_s"]
+                print("    " + ", ".join(f"{k} {v:.3f}s" for k, v in stages.items() if v))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"generated": time.time(), "results": results}, f, indent=2)
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Import-time benchmark for the add-on's startup path (`python -X importtime`).
+
+Anki imports the add-on package while the main window is starting, so every
+module __init__.py imports at top level is paid on every launch.  This runs
+each target in a fresh interpreter under `-X importtime` and reports the best
+cumulative import time of several runs, plus the slowest modules it pulled in:
+
+    addon     the add-on package itself — what Anki pays at startup (needs
+              aqt; skipped in a plain Python environment)
+    <name>    any top-level module of the repo, e.g. notion_cache's
+              dependency-free helpers (cache_generation, seed_download, …)
+
+It also checks statically that __init__.py keeps the heavy modules (the
+dialogs, notion_cache, requests, …) out of its module-level imports; with
+--check a violation exits non-zero, so CI can catch the regression without
+Anki installed.
+
+Run from the repo root:
+    python benchmarks/bench_import_time.py
+    python benchmarks/bench_import_time.py --repeat 10 cache_generation seed_download
+    python benchmarks/bench_import_time.py --check --json bench_output.txt
+"""
+import argparse
+import ast
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Modules the add-on entry point must only import on first use.
+DEFERRED = {"notion_cache", "cache_updater", "cache_generation", "extra_sync",
+            "suggest_tags", "ui.page_selector", "ui.randomization_dialog",
+            "ui.update_subject_tags", "requests", "shutil", "concurrent.futures"}
+
+# Dependency-free modules notion_cache pulls in (importable without aqt).
+DEFAULT_MODULES = ["cache_generation", "seed_download", "page_store", "snapshots",
+                   "derived_indexes", "task_executor", "connectivity"]
+
+
+def eager_imports(path: Path) -> list:
+    """(dotted module, line) for each import `path` runs at module level —
+    not inside a function; relative imports without their leading dots."""
+    found = []
+
+    def visit(nodes):
+        for node in nodes:
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda)):
+                continue
+            if isinstance(node, ast.Import):
+                found.extend((alias.name, node.lineno) for alias in node.names)
+            elif isinstance(node, ast.ImportFrom):
+                base = node.module or ""
+                if base:
+                    found.append((base, node.lineno))
+                # The names may be submodules (from .ui import page_selector).
+                found.extend((f"{base}.{alias.name}" if base else alias.name, node.lineno)
+                             for alias in node.names)
+            for field in ("body", "orelse", "finalbody", "handlers"):
+                visit(getattr(node, field, []))
+    visit(ast.parse(path.read_text(encoding="utf-8")).body)
+    return found
+
+
+def check_entry_point() -> list:
+    """(module, line) for every deferred module __init__.py imports eagerly."""
+    return [(name, line) for name, line in eager_imports(ROOT / "__init__.py")
+            if any(name == mod or name.startswith(mod + ".") for mod in DEFERRED)]
+
+
+def importtime(module: str, path: Path) -> tuple:
+    """Import `module` in a fresh interpreter under -X importtime.  Returns
+    (its cumulative µs, [(cumulative µs, module)] for the imports it triggered)."""
+    env = dict(os.environ, PYTHONPATH=str(path))
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          capture_output=True, text=True, env=env, cwd=str(path))
+    if proc.returncode != 0:
+        lines = proc.stderr.strip().splitlines()
+        raise RuntimeError(lines[-1] if lines else f"exit {proc.returncode}")
+    # "import time: <self µs> | <cumulative µs> | <indent><module>", nested
+    # imports (indented) listed before the module that triggered them.
+    block = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split(":", 1)[1].split("|")
+        block.append((int(cumulative), name.strip()))
+        if not name[1:].startswith(" "):       # a top-level import
+            if name[1:] == module:
+                return int(cumulative), sorted(block[:-1], reverse=True)
+            block = []                         # interpreter startup (site, …)
+    raise RuntimeError(f"{module} not in the -X importtime output")
+
+
+def bench(target: str, repeat: int, top: int) -> dict:
+    if target == "addon":
+        module, path = ROOT.name, ROOT.parent
+    else:
+        module, path = target, ROOT
+    best = None
+    for _ in range(repeat):
+        total, rows = importtime(module, path)
+        if best is None or total < best[0]:
+            best = (total, rows)
+    total, rows = best
+    return {"target": target, "import_ms": total / 1000,
+            "slowest": [{"module": name, "cumulative_ms": cum / 1000} for cum, name in rows[:top]]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("targets", nargs="*",
+                        help="'addon' and/or repo modules (default: addon + notion_cache's helpers)")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per target (best of)")
+    parser.add_argument("--top", type=int, default=5, help="slowest imports listed per target")
+    parser.add_argument("--check", action="store_true",
+                        help="exit 1 if __init__.py imports a deferred module eagerly")
+    parser.add_argument("--json", type=Path, help="also write the results as JSON here")
+    args = parser.parse_args()
+
+    violations = check_entry_point()
+    for name, line in violations:
+        print(f"__init__.py:{line}: '{name}' is imported at startup — import it on first use")
+    if not violations:
+        print("__init__.py: no deferred module imported at startup")
+
+    results = []
+    for target in args.targets or ["addon"] + DEFAULT_MODULES:
+        try:
+            result = bench(target, args.repeat, args.top)
+        except RuntimeError as e:
+            print(f"{target:<20} skipped ({e})")
+            continue
+        results.append(result)
+        print(f"{target:<20} {result['import_ms']:>8.1f}ms")
+        for row in result["slowest"]:
+            print(f"    {row['module']:<36} {row['cumulative_ms']:>8.1f}ms")
+
+    if args.json:
+        args.json.write_text(json.dumps({"violations": violations, "results": results}, indent=1))
+    if args.check and violations:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Size and load-time benchmark for compressed seeds (seed_codec.py).
+
+For each committed seed in cache/ (or the files given), writes its compressed
+variants to a temp dir and reports the compression ratio, the encode time CI
+pays, and the time to load the seed through PageStore as plain JSON versus
+each compressed variant — i.e. what the add-on pays on every cache load for
+the smaller download.  Runs offline in a plain Python environment.
+
+Run from the repo root:
+    python benchmarks/bench_seed_compression.py
+    python benchmarks/bench_seed_compression.py --repeat 10 cache/<id>.json
+    python benchmarks/bench_seed_compression.py --json bench_output.txt
+"""
+import argparse
+import json
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import seed_codec                                         # noqa: E402
+from page_store import PageStore                          # noqa: E402
+
+
+def _best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def bench(path: Path, repeat: int, workdir: Path):
+    blob = path.read_bytes()
+    plain = workdir / path.name
+    plain.write_bytes(blob)
+    t0 = time.perf_counter()
+    variants = seed_codec.write_variants(plain, blob)
+    encode = time.perf_counter() - t0
+
+    base_load = _best_of(lambda: PageStore(plain).load(), repeat)
+    rows = [{"seed": path.name, "variant": "json", "bytes": len(blob), "ratio": 1.0,
+             "load_s": base_load, "load_delta_s": 0.0}]
+    for suffix, compressed in sorted(variants.items()):
+        # A downloaded variant is stored under the seed's own name.
+        stored = workdir / f"{suffix.strip('.')}_{path.name}"
+        shutil.copyfile(compressed, stored)
+        load = _best_of(lambda: PageStore(stored).load(), repeat)
+        size = compressed.stat().st_size
+        rows.append({"seed": path.name, "variant": suffix, "bytes": size,
+                     "ratio": len(blob) / size, "load_s": load,
+                     "load_delta_s": load - base_load, "encode_all_s": encode})
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("seeds", nargs="*", type=Path,
+                        help="seed files (default: every cache/<id>.json)")
+    parser.add_argument("--repeat", type=int, default=5, help="loads timed per variant (best of)")
+    parser.add_argument("--json", type=Path, help="also write the rows as JSON here")
+    args = parser.parse_args()
+
+    seeds = args.seeds or sorted((ROOT / "cache").glob("*.json"))
+    if not seeds:
+        parser.error("no seeds found in cache/")
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for path in seeds:
+            rows.extend(bench(path, args.repeat, Path(tmp)))
+
+    print(f"{'seed':<40} {'variant':>7} {'bytes':>11} {'ratio':>6} {'load':>9} {'Δ load':>9}")
+    for row in rows:
+        print(f"{row['seed']:<40} {row['variant']:>7} {row['bytes']:>11,} {row['ratio']:>5.1f}x "
+              f"{row['load_s'] * 1000:>7.1f}ms {row['load_delta_s'] * 1000:>+7.1f}ms")
+    total = sum(r["bytes"] for r in rows if r["variant"] == "json")
+    for suffix in seed_codec.codecs():
+        compressed = sum(r["bytes"] for r in rows if r["variant"] == suffix)
+        if compressed:
+            print(f"total {suffix}: {total:,} → {compressed:,} bytes ({total / compressed:.1f}x)")
+    if args.json:
+        args.json.write_text(json.dumps(rows, indent=1))
+
+
+if __name__ == "__main__":
+    main()
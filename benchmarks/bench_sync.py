@@ -0,0 +1,174 @@
+"""
+Offline sync-throughput benchmark against the local Notion stand-in.
+
+Starts benchmarks/notion_stub.py on localhost, points every fetcher at it via
+NOTION_API_BASE, and measures wall time, request counts and retry behaviour
+(429/504 served) for:
+
+    fetch     cache_generation.fetch_all_pages over every database
+              (the add-on's runtime rebuild path)
+    ci        update_cache.update_notion_cache() — the whole daily CI build,
+              written into a temporary directory
+    addon     cache_generation.fetch_updated_pages over every ordinary
+              database — what NotionCache.fetch_updated_pages runs for an
+              incremental sync (legacy databases/{id}/query endpoint)
+
+Fixtures: the committed cache/ seeds where they exist, synthetic graphs
+(synthetic.py) for the rest — including the full Subjects / Pharmacology /
+Guidelines graphs and the Question Banks database the generators need.
+
+Run from the repo root:
+    python benchmarks/bench_sync.py --scale 0.1                       # smoke test
+    python benchmarks/bench_sync.py --scenario ci --latency-ms 150 --per-page-ms 20
+    python benchmarks/bench_sync.py --error-429 0.05 --retry-after 0.5 --rate-limit 3
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from notion_stub import NotionStub, StubConfig, load_fixtures   # noqa: E402
+from synthetic import make_dataset                              # noqa: E402
+
+# Database ids (mirrors config.py / update_cache.py; kept literal so this
+# module can build fixtures before those modules are imported).
+SUBJECTS = '2674b67cbdf84a11a057a29cc24c524f'
+PHARMACOLOGY = '9ff96451736d43909d49e3b9d60971f8'
+ETG = '22282971487f4f559dce199476709b03'
+ROTATION = '69b3e7fdce1548438b26849466d7c18e'
+TEXTBOOKS = '13d5964e68a480bfb07cf7e2f1786075'
+GUIDELINES = '13d5964e68a48056b40de8148dd91a06'
+SYNCED_EXTRA = '2dc5964e68a480909c4ac1dc169b16fb'
+SYNCED_ADDITIONAL = '31b5964e68a48023b1c1c7b23fbdec64'
+QUESTION_BANKS = 'bf443eb7144c46aba3106a4b915959d7'
+
+
+def build_fixtures(scale: float, seed: int = 0, use_seeds: bool = True) -> dict:
+    fixtures = load_fixtures(ROOT / "cache") if use_seeds else {}
+    subjects = make_dataset("subjects", scale=scale, seed=seed)
+    fixtures[SUBJECTS] = subjects.pages
+    fixtures[QUESTION_BANKS] = subjects.qb_pages
+    fixtures.setdefault(ROTATION, subjects.rotation_pages)
+    fixtures[PHARMACOLOGY] = make_dataset("pharmacology", scale=scale, seed=seed).pages
+    # The committed Guidelines seed holds only the leaves; generation wants the
+    # full graph, so serve a synthetic one.
+    fixtures[GUIDELINES] = make_dataset("guidelines", scale=scale, seed=seed).pages
+    if ETG not in fixtures:
+        etg = make_dataset("guidelines", scale=scale * 2, seed=seed + 1).pages
+        for p in etg:
+            p["properties"]["For Search"] = {"type": "formula",
+                                             "formula": {"type": "boolean", "boolean": True}}
+        fixtures[ETG] = etg
+    for db in (TEXTBOOKS, SYNCED_EXTRA, SYNCED_ADDITIONAL):
+        fixtures.setdefault(db, [])
+    return fixtures
+
+
+def _report(name, elapsed, stats):
+    served_errors = {k: v for k, v in stats.items() if k.startswith("status:") and k != "status:200"}
+    endpoints = {k.split(":", 1)[1]: v for k, v in stats.items() if k.startswith("endpoint:")}
+    print(f"{name:<8} {elapsed:8.2f}s  requests={stats.get('requests', 0)}  "
+          f"errors={served_errors or 0}  endpoints={endpoints}")
+    return {"scenario": name, "wall_s": round(elapsed, 3), "stats": stats}
+
+
+def scenario_fetch(stub, fixtures):
+    import cache_generation
+    stub.reset_stats()
+    t0 = time.perf_counter()
+    for db_id, pages in fixtures.items():
+        got = cache_generation.fetch_all_pages(db_id, "stub-token")
+        assert len(got) == len(pages), (db_id, len(got), len(pages))
+    return _report("fetch", time.perf_counter() - t0, stub.stats())
+
+
+def scenario_ci(stub, fixtures):
+    import update_cache
+    stub.reset_stats()
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            t0 = time.perf_counter()
+            update_cache.update_notion_cache()
+            elapsed = time.perf_counter() - t0
+        finally:
+            os.chdir(cwd)
+    return _report("ci", elapsed, stub.stats())
+
+
+def scenario_addon(stub, fixtures):
+    import cache_generation
+    stub.reset_stats()
+    t0 = time.perf_counter()
+    for db_id in fixtures:
+        if db_id in (SUBJECTS, PHARMACOLOGY, GUIDELINES, QUESTION_BANKS):
+            continue   # generated / cross-ref DBs refresh via fetch_edited_since
+        cache_generation.fetch_updated_pages(
+            db_id, "stub-token", "2000-01-01",
+            use_for_search=db_id in (ETG, ROTATION, TEXTBOOKS))
+    return _report("addon", time.perf_counter() - t0, stub.stats())
+
+
+SCENARIOS = {"fetch": scenario_fetch, "ci": scenario_ci, "addon": scenario_addon}
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--scenario", default="fetch,ci,addon")
+    ap.add_argument("--scale", type=float, default=1.0)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--no-seeds", action="store_true",
+                    help="serve only synthetic fixtures (ignore committed cache/ seeds)")
+    ap.add_argument("--latency-ms", type=float, default=0.0)
+    ap.add_argument("--per-page-ms", type=float, default=0.0)
+    ap.add_argument("--error-429", type=float, default=0.0)
+    ap.add_argument("--error-504", type=float, default=0.0)
+    ap.add_argument("--rate-limit", type=float, default=0.0, help="stub-side req/s limit")
+    ap.add_argument("--retry-after", type=float, default=1.0)
+    ap.add_argument("--slow-page-size", type=int, default=0,
+                    help="answer 504 to generated-DB queries above this page size")
+    ap.add_argument("--json", metavar="PATH", help="write results as JSON")
+    args = ap.parse_args(argv)
+
+    fixtures = build_fixtures(args.scale, args.seed, use_seeds=not args.no_seeds)
+    slow = ({db: args.slow_page_size for db in (SUBJECTS, PHARMACOLOGY, GUIDELINES)}
+            if args.slow_page_size else {})
+    stub = NotionStub(fixtures, StubConfig(
+        latency_ms=args.latency_ms, per_page_ms=args.per_page_ms,
+        error_rate_429=args.error_429, error_rate_504=args.error_504,
+        rate_limit=args.rate_limit, retry_after=args.retry_after,
+        slow_page_size=slow, seed=args.seed,
+    )).start()
+    # Must be set before the fetch modules are imported (read at import time).
+    os.environ["NOTION_API_BASE"] = stub.base_url
+    os.environ.setdefault("NOTION_TOKEN", "stub-token")
+    print(f"Notion stand-in at {stub.base_url} serving "
+          f"{sum(len(p) for p in fixtures.values())} pages in {len(fixtures)} databases")
+
+    results = []
+    try:
+        for name in [s.strip() for s in args.scenario.split(",") if s.strip()]:
+            try:
+                results.append(SCENARIOS[name](stub, fixtures))
+            except Exception as e:
+                # A fetcher giving up (e.g. no retry on an injected 429) is a
+                # result worth reporting, not a reason to abort the run.
+                print(f"{name:<8} FAILED: {type(e).__name__}: {e}")
+                results.append({"scenario": name, "error": str(e), "stats": stub.stats()})
+    finally:
+        stub.stop()
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"generated": time.time(), "args": vars(args), "results": results}, f, indent=2)
+    return results
+
+
+if __name__ == "__main__":
+    main()
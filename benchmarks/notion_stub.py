@@ -0,0 +1,309 @@
+"""
+Local stand-in for the subset of the Notion API the cache fetchers use.
+
+Serves, from in-memory fixtures:
+    GET  /v1/databases/{id}                 → {"data_sources": [{"id": …}]}
+    GET  /v1/data_sources/{id}              → {"properties": {name: {"id", "type"}}}
+    POST /v1/databases/{id}/query           (legacy query, used by the add-on)
+    POST /v1/data_sources/{id}/query        (cache_generation / update_cache)
+    GET  /v1/blocks/{id}/children           (Synced Extra block content)
+    GET  /_stats                            request / status counters
+
+Queries honour `page_size` (capped at 100 like Notion), `start_cursor`, the
+`last_edited_time` timestamp filter, the `For Search` formula filter (alone or
+inside an `and`) and `filter_properties`.
+
+Fault model (all optional, see StubConfig):
+    latency_ms + per_page_ms   base latency plus a per-returned-row cost, which
+                               is what makes page size matter (rollups/formulas)
+    slow_page_size             {db_id: n} — queries above n rows answer 504,
+                               like the formula-heavy databases do today
+    error_rate_429 / _504      random injected failures (seeded)
+    rate_limit / burst         token-bucket limiter answering 429 + Retry-After
+    retry_after                Retry-After seconds sent with every 429
+
+Fixtures are seed-shaped (`{"pages": [...]}`) JSON files keyed by database id —
+the committed cache/ seeds work as-is — or any {db_id: pages} mapping, e.g.
+from synthetic.make_dataset.  Point the fetchers at it with
+NOTION_API_BASE=http://127.0.0.1:<port>/v1 (see bench_sync.py).
+
+    stub = NotionStub(fixtures, StubConfig(latency_ms=50)).start()
+    os.environ["NOTION_API_BASE"] = stub.base_url
+    ...
+    stub.stop(); print(stub.stats())
+"""
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+MAX_PAGE_SIZE = 100
+
+
+@dataclass
+class StubConfig:
+    latency_ms: float = 0.0
+    per_page_ms: float = 0.0
+    slow_page_size: dict = field(default_factory=dict)
+    error_rate_429: float = 0.0
+    error_rate_504: float = 0.0
+    rate_limit: float = 0.0          # requests/second; 0 = unlimited
+    burst: int = 10
+    retry_after: float = 1.0
+    blocks_per_page: int = 3
+    seed: int = 0
+
+
+def load_fixtures(directory) -> dict:
+    """{db_id: pages} from every `<db_id>.json` seed file in `directory`
+    (underscore-prefixed metadata files are skipped)."""
+    out = {}
+    for path in Path(directory).glob("*.json"):
+        if path.name.startswith("_"):
+            continue
+        with path.open("r", encoding="utf-8") as f:
+            out[path.stem] = json.load(f).get("pages", [])
+    return out
+
+
+def _norm(i: str) -> str:
+    return i.replace("-", "")
+
+
+def _for_search(page) -> bool:
+    prop = page.get("properties", {}).get("For Search", {})
+    return bool(prop.get("formula", {}).get("boolean"))
+
+
+def _matches(page, flt) -> bool:
+    if not flt:
+        return True
+    if "and" in flt:
+        return all(_matches(page, f) for f in flt["and"])
+    if "or" in flt:
+        return any(_matches(page, f) for f in flt["or"])
+    if flt.get("timestamp") == "last_edited_time":
+        since = flt["last_edited_time"].get("on_or_after", "")
+        # ISO-8601 strings of the same shape compare chronologically; a bare
+        # date compares as midnight of that day.
+        return page.get("last_edited_time", "") >= since
+    if flt.get("property") == "For Search":
+        want = flt.get("formula", {}).get("checkbox", {}).get("equals", True)
+        return _for_search(page) == want
+    return True
+
+
+def _project(page, prop_ids):
+    """Apply filter_properties: keep only the named (or id'd) properties."""
+    if prop_ids is None:
+        return page
+    wanted = set(prop_ids)
+    props = {k: v for k, v in page.get("properties", {}).items()
+             if k in wanted or v.get("id") in wanted}
+    return {**page, "properties": props}
+
+
+class _TokenBucket:
+    def __init__(self, rate, burst):
+        self.rate, self.capacity = rate, burst
+        self.tokens, self.stamp = float(burst), time.monotonic()
+        self.lock = threading.Lock()
+
+    def take(self) -> bool:
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.stamp) * self.rate)
+            self.stamp = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+
+class NotionStub:
+    def __init__(self, fixtures: dict, config: StubConfig = None, port: int = 0):
+        self.config = config or StubConfig()
+        self.pages = {_norm(k): list(v) for k, v in fixtures.items()}
+        self.counts = Counter()
+        self._lock = threading.Lock()
+        self._rng = random.Random(self.config.seed)
+        self._bucket = (_TokenBucket(self.config.rate_limit, self.config.burst)
+                        if self.config.rate_limit else None)
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    # ── lifecycle ────────────────────────────────────────────────────────────
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self.counts)
+
+    def reset_stats(self):
+        with self._lock:
+            self.counts.clear()
+
+    def schema(self, db_id) -> dict:
+        """Property schema as the union of the fixture pages' properties (ids
+        fall back to the property name, which _project also accepts)."""
+        props = {}
+        for page in self.pages.get(db_id, []):
+            for name, value in page.get("properties", {}).items():
+                props.setdefault(name, {"id": value.get("id", name),
+                                        "type": value.get("type")})
+        return props
+
+    def _count(self, *keys):
+        with self._lock:
+            for k in keys:
+                self.counts[k] += 1
+
+    # ── request handling ─────────────────────────────────────────────────────
+    def _fault(self, endpoint: str):
+        """(status, headers) for an injected failure, or None."""
+        cfg = self.config
+        if self._bucket and not self._bucket.take():
+            return 429, {"Retry-After": str(cfg.retry_after)}
+        with self._lock:
+            roll = self._rng.random()
+        if roll < cfg.error_rate_429:
+            return 429, {"Retry-After": str(cfg.retry_after)}
+        if roll < cfg.error_rate_429 + cfg.error_rate_504:
+            return 504, {}
+        return None
+
+    def _query(self, db_id, body, params):
+        cfg = self.config
+        pages = self.pages.get(db_id)
+        if pages is None:
+            return 404, {"object": "error", "code": "object_not_found"}
+        page_size = min(int(body.get("page_size", MAX_PAGE_SIZE)), MAX_PAGE_SIZE)
+        limit = cfg.slow_page_size.get(db_id)
+        if limit and page_size > limit:
+            time.sleep(cfg.latency_ms / 1000)
+            return 504, {"object": "error", "code": "gateway_timeout"}
+        matched = [p for p in pages if _matches(p, body.get("filter"))]
+        try:
+            start = int(body.get("start_cursor") or 0)
+        except ValueError:   # Notion rejects an unknown/expired cursor the same way
+            return 400, {"object": "error", "code": "validation_error"}
+        chunk = matched[start:start + page_size]
+        props = params.get("filter_properties")
+        time.sleep((cfg.latency_ms + cfg.per_page_ms * len(chunk)) / 1000)
+        more = start + page_size < len(matched)
+        return 200, {
+            "object": "list",
+            "results": [_project(p, props) for p in chunk],
+            "has_more": more,
+            "next_cursor": str(start + page_size) if more else None,
+        }
+
+    def _blocks(self, block_id, params):
+        n = self.config.blocks_per_page
+        start = int((params.get("start_cursor") or ["0"])[0])
+        size = min(int((params.get("page_size") or [MAX_PAGE_SIZE])[0]), MAX_PAGE_SIZE)
+        blocks = [{
+            "object": "block", "id": f"{block_id}-b{i}", "type": "paragraph",
+            "has_children": False,
+            "paragraph": {"rich_text": [{"type": "text", "plain_text": f"Block {i}",
+                                         "annotations": {}}], "color": "default"},
+        } for i in range(n)]
+        chunk = blocks[start:start + size]
+        time.sleep(self.config.latency_ms / 1000)
+        more = start + size < n
+        return 200, {"object": "list", "results": chunk, "has_more": more,
+                     "next_cursor": str(start + size) if more else None}
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):   # keep benchmark output clean
+                pass
+
+            def _send(self, status, body, headers=None):
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for k, v in (headers or {}).items():
+                    self.send_header(k, v)
+                self.end_headers()
+                self.wfile.write(data)
+                stub._count(f"status:{status}")
+
+            def _body(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                raw = self.rfile.read(length) if length else b""
+                return json.loads(raw) if raw else {}
+
+            def _dispatch(self, method):
+                url = urlparse(self.path)
+                params = parse_qs(url.query)
+                body = self._body() if method == "POST" else {}
+                if url.path == "/_stats":
+                    return self._send(200, stub.stats())
+
+                m = re.fullmatch(r"/v1/(databases|data_sources)/([^/]+)(/query)?", url.path)
+                b = re.fullmatch(r"/v1/blocks/([^/]+)/children", url.path)
+                if m:
+                    kind, obj_id, query = m.group(1), _norm(m.group(2)), m.group(3)
+                    endpoint = f"{kind}/query" if query else kind
+                elif b:
+                    obj_id, endpoint = b.group(1), "blocks/children"
+                else:
+                    return self._send(404, {"object": "error", "code": "invalid_request_url"})
+                stub._count(f"endpoint:{endpoint}", "requests")
+
+                fault = stub._fault(endpoint)
+                if fault:
+                    status, headers = fault
+                    return self._send(status, {"object": "error", "status": status}, headers)
+
+                if endpoint == "databases":
+                    if obj_id not in stub.pages:
+                        return self._send(404, {"object": "error", "code": "object_not_found"})
+                    return self._send(200, {"object": "database", "id": obj_id,
+                                            "data_sources": [{"id": obj_id}]})
+                if endpoint == "data_sources":
+                    if obj_id not in stub.pages:
+                        return self._send(404, {"object": "error", "code": "object_not_found"})
+                    return self._send(200, {"object": "data_source", "id": obj_id,
+                                            "properties": stub.schema(obj_id)})
+                if endpoint.endswith("/query") and method == "POST":
+                    props = params.get("filter_properties[]") or params.get("filter_properties")
+                    status, payload = stub._query(obj_id, body,
+                                                  {"filter_properties": props})
+                    return self._send(status, payload)
+                if endpoint == "blocks/children":
+                    return self._send(*stub._blocks(obj_id, params))
+                return self._send(405, {"object": "error", "code": "method_not_allowed"})
+
+            def do_GET(self):
+                self._dispatch("GET")
+
+            def do_POST(self):
+                self._dispatch("POST")
+
+        return Handler
@@ -0,0 +1,245 @@
+"""
+Synthetic Notion-shaped page graphs for benchmarking the tag generators.
+
+Builds page objects shaped like the Notion data-sources API returns them (the
+same property names / types the generators read), so subjects_tags,
+pharmacology_tags and guidelines_tags can be timed offline at any size.
+
+The graph is a layered DAG: every non-root page gets one primary parent in the
+level above and, with probability `multi_parent_ratio`, a second parent there
+too (the multi-parent fan-out the generators enumerate).  Some categories get a
+`*General` child, some pages carry `Subtag override`, and pages link into the
+Question Bank (eMedici) and Rotation cross-ref databases.
+
+`BASE_SIZES` approximates today's databases; `scale` multiplies them.  Output
+is deterministic for a given seed.
+
+    from synthetic import make_dataset      # benchmarks/ on sys.path
+    ds = make_dataset("subjects", scale=10)
+    generate_from_pages("subjects", ds.pages, ds.qb_pages, ds.rotation_pages)
+"""
+import random
+import uuid
+from dataclasses import dataclass, field
+from typing import List
+
+# Rough page counts of the live databases (full graph incl. ancestors).
+BASE_SIZES = {
+    "subjects": 3000,
+    "pharmacology": 1200,
+    "guidelines": 800,
+    "qb": 400,
+    "rotation": 44,
+}
+
+SUBJECT_SUBTAGS = ["Epidemiology", "Aetiology", "Risk Factors", "Physiology/Anatomy",
+                   "Pathophysiology", "Clinical Features", "Pathology",
+                   "Diagnosis/Investigations", "Scoring Criteria", "Management",
+                   "Complications/Prognosis", "Screening/Prevention"]
+PHARM_SUBTAGS = ["Generic Names", "Mechanism of Action", "Indications",
+                 "Contraindications/Precautions", "Route/Frequency", "Adverse Effects",
+                 "Toxicity & Reversal", "Advantages/Disadvantages", "Monitoring"]
+_WORDS = ["cardiac", "renal", "acute", "chronic", "syndrome", "disease", "failure",
+          "infection", "neoplasm", "disorder", "injury", "deficiency", "toxicity",
+          "paediatric", "vascular", "pulmonary", "hepatic", "endocrine", "neuro",
+          "gastro", "haem", "rheum", "obstetric", "psychiatric", "surgical"]
+
+
+@dataclass
+class Dataset:
+    kind: str
+    pages: List[dict]
+    qb_pages: List[dict] = field(default_factory=list)
+    rotation_pages: List[dict] = field(default_factory=list)
+
+
+# ── Notion property builders ────────────────────────────────────────────────
+def _text(s):
+    return [{"type": "text", "text": {"content": s, "link": None}, "plain_text": s,
+             "annotations": {}, "href": None}]
+
+
+def _title(s):
+    return {"id": "title", "type": "title", "title": _text(s)}
+
+
+def _rich(s):
+    return {"type": "rich_text", "rich_text": _text(s) if s else []}
+
+
+def _relation(ids):
+    return {"type": "relation", "relation": [{"id": i} for i in ids], "has_more": False}
+
+
+def _checkbox(v):
+    return {"type": "checkbox", "checkbox": bool(v)}
+
+
+def _multi(names):
+    return {"type": "multi_select", "multi_select": [{"name": n} for n in names]}
+
+
+def _formula(s):
+    return {"type": "formula", "formula": {"type": "string", "string": s}}
+
+
+def _page(rng, db_id, props):
+    # uuid4 from the seeded rng keeps ids deterministic across runs.
+    pid = str(uuid.UUID(int=rng.getrandbits(128), version=4))
+    return {
+        "object": "page",
+        "id": pid,
+        "created_time": "2025-01-01T00:00:00.000Z",
+        "last_edited_time": "2026-01-01T00:00:00.000Z",
+        "parent": {"type": "data_source_id", "database_id": db_id},
+        "archived": False,
+        "in_trash": False,
+        "properties": props,
+    }
+
+
+def _name(rng, i):
+    return f"{rng.choice(_WORDS).title()} {rng.choice(_WORDS)} {i}"
+
+
+# ── graph skeleton ──────────────────────────────────────────────────────────
+def _layered_graph(rng, db_id, n_pages, depth, multi_parent_ratio, general_ratio,
+                   numbered_levels=1):
+    """Pages with `Name`/`Parent item`/`Sub-item` wired as a layered DAG.
+    Level sizes grow geometrically so the leaves dominate, like the real DBs."""
+    depth = max(depth, 2)
+    weights = [2 ** i for i in range(depth)]
+    sizes = [max(1, n_pages * w // sum(weights)) for w in weights]
+    levels, pages = [], []
+    counter = 0
+    for lvl, size in enumerate(sizes):
+        level = []
+        for _ in range(size):
+            counter += 1
+            name = _name(rng, counter)
+            if 0 < lvl <= numbered_levels:
+                name = f"{len(level) + 1:02d}_{name}"
+            page = _page(rng, db_id, {"Name": _title(name),
+                                      "Parent item": _relation([]),
+                                      "Sub-item": _relation([])})
+            level.append(page)
+        levels.append(level)
+        pages.extend(level)
+
+    def link(child, parent):
+        child["properties"]["Parent item"]["relation"].append({"id": parent["id"]})
+        parent["properties"]["Sub-item"]["relation"].append({"id": child["id"]})
+
+    for lvl in range(1, len(levels)):
+        above = levels[lvl - 1]
+        for child in levels[lvl]:
+            primary = rng.choice(above)
+            link(child, primary)
+            if len(above) > 1 and rng.random() < multi_parent_ratio:
+                other = rng.choice(above)
+                if other is not primary:
+                    link(child, other)
+
+    # `*General` leaf under a share of the internal (non-leaf) pages.
+    for parent in [p for lvl in levels[:-1] for p in lvl]:
+        if rng.random() < general_ratio:
+            gen = _page(rng, db_id, {"Name": _title("*General"),
+                                     "Parent item": _relation([]),
+                                     "Sub-item": _relation([])})
+            link(gen, parent)
+            pages.append(gen)
+    return pages
+
+
+# ── cross-ref databases ─────────────────────────────────────────────────────
+def make_qb_pages(rng, n):
+    pages = []
+    for i in range(n):
+        props = {
+            "Name": _title(f"eMedici {i}"),
+            "Tag": _rich(f"#Malleus_CM::#Question_Banks::eMedici::Topic_{i}"),
+            "Disease Subtag": _multi(rng.sample(SUBJECT_SUBTAGS, rng.randint(0, 3))),
+            "Pharm Subtag": _multi(rng.sample(PHARM_SUBTAGS, rng.randint(0, 2))),
+        }
+        pages.append(_page(rng, "qb", props))
+    return pages
+
+
+def make_rotation_pages(rng, n):
+    pages = []
+    for i in range(n):
+        props = {
+            "Name": _title(f"Rotation {i}"),
+            "Tag": _formula(f"#Malleus_CM::#Resources_by_Rotation::Rotation_{i}"),
+            "For Search": {"type": "formula", "formula": {"type": "boolean", "boolean": True}},
+        }
+        pages.append(_page(rng, "rotation", props))
+    return pages
+
+
+def _sprinkle_relations(rng, pages, key, targets, ratio, max_links=2):
+    for p in pages:
+        ids = []
+        if targets and rng.random() < ratio:
+            ids = [t["id"] for t in rng.sample(targets, min(len(targets), rng.randint(1, max_links)))]
+        p["properties"][key] = _relation(ids)
+
+
+# ── per-kind datasets ───────────────────────────────────────────────────────
+def make_dataset(kind: str, scale: float = 1, seed: int = 0, depth: int = None,
+                 multi_parent_ratio: float = 0.08, general_ratio: float = 0.15,
+                 crossref_ratio: float = 0.3, override_ratio: float = 0.03) -> Dataset:
+    """A Notion-shaped dataset for one generated database kind.
+
+    scale               multiplier on BASE_SIZES (1, 10, 50 …)
+    depth               hierarchy levels (default per kind)
+    multi_parent_ratio  share of pages with a second `Parent item`
+    general_ratio       share of categories with a `*General` child
+    crossref_ratio      share of pages linking Rotation / Question Banks
+    override_ratio      share of pages with `Subtag override` ticked
+    """
+    rng = random.Random(f"{kind}:{scale}:{seed}")
+    n = max(10, int(BASE_SIZES[kind] * scale))
+    qb = make_qb_pages(rng, max(5, int(BASE_SIZES["qb"] * scale)))
+    rot = make_rotation_pages(rng, BASE_SIZES["rotation"])
+
+    if kind == "subjects":
+        pages = _layered_graph(rng, "subjects", n, depth or 5,
+                               multi_parent_ratio, general_ratio)
+        _sprinkle_relations(rng, pages, "Rotation", rot, crossref_ratio)
+        _sprinkle_relations(rng, pages, "eMedici", qb, crossref_ratio)
+        _sprinkle_relations(rng, pages, "Remove Rotation Tags", rot, crossref_ratio / 10, 1)
+        for p in pages:
+            props = p["properties"]
+            props["Subtag override"] = _checkbox(rng.random() < override_ratio)
+            props["Manual search alias"] = _rich(rng.choice(_WORDS) if rng.random() < 0.2 else "")
+            props["PassMed Included Topics"] = _rich(rng.choice(_WORDS) if rng.random() < 0.1 else "")
+            props["Extra Prefix"] = _rich("")
+        return Dataset(kind, pages, qb, rot)
+
+    if kind == "pharmacology":
+        pages = _layered_graph(rng, "pharmacology", n, depth or 4,
+                               multi_parent_ratio, general_ratio)
+        _sprinkle_relations(rng, pages, "eMedici", qb, crossref_ratio)
+        for p in pages:
+            p["properties"]["Search Alias"] = _rich(rng.choice(_WORDS) if rng.random() < 0.2 else "")
+        return Dataset(kind, pages, qb)
+
+    if kind == "guidelines":
+        pages = _layered_graph(rng, "guidelines", n, depth or 5,
+                               multi_parent_ratio, general_ratio / 3, numbered_levels=0)
+        # Guidelines key on a literal "National" level under each country.
+        by_id = {p["id"]: p for p in pages}
+        roots = [p for p in pages if not p["properties"]["Parent item"]["relation"]]
+        for root in roots[: max(1, len(roots) // 2)]:
+            for child_ref in root["properties"]["Sub-item"]["relation"][:1]:
+                by_id[child_ref["id"]]["properties"]["Name"] = _title("National")
+        for p in pages:
+            props = p["properties"]
+            props["Search Override"] = _checkbox(rng.random() < override_ratio)
+            props["Extra Suffix"] = _rich("")
+            props["URL"] = _rich(f"https://example.org/{p['id'][:8]}")
+            props["Last Updated"] = {"type": "date", "date": {"start": "2024-05-01"}}
+        return Dataset(kind, pages)
+
+    raise ValueError(f"unknown kind: {kind!r}")
@@ -10,7 +10,10 @@ pharmacology_tags / hierarchy_tags).
 Two entry points so both callers can reuse the dispatch:
   * generate_from_pages(kind, all_pages, qb_pages, rotation_pages)
         — pure: given already-fetched pages, return the leaf pages to cache.
-          Used by update_cache.py (which does its own rate-limited CI fetching).
+          Used by update_cache.py (which does its own CI fetching, through the
+          same request scheduler).
+          Optionally fills a GenerationProfile and/or appends it to a JSONL log
+          (see generation_profile.py).
   * fetch_and_generate(kind, token, db_id, qb_id, rotation_id)
         — fetches the full database(s) from Notion (data sources API) then
           generates.  Used by the add-on at runtime (notion_cache.py).
@@ -20,62 +23,113 @@ Dependency-free (only `requests`); safe to import in CI and inside Anki.
 Bump GENERATOR_VERSION whenever the generated tag/search output changes so the
 add-on can detect caches built by older logic and regenerate them.
 """
-import time
-import threading
+import os
 import requests
 
 try:  # standalone (CI) vs add-on package context
-    from subjects_tags import generate_and_inject as _gen_subjects
-    from pharmacology_tags import generate_and_inject as _gen_pharmacology
-    from guidelines_tags import generate_and_inject as _gen_guidelines
+    import subjects_tags, pharmacology_tags, guidelines_tags
+    from generation_profile import GenerationProfile, NULL_PROFILE
+    from request_scheduler import SCHEDULER, RETRY_STATUSES, current_priority, with_priority
+    from sync_state import SyncState, PageSizer, MIN_PAGE_SIZE, property_ids
+    from fetch_checkpoint import FetchCheckpoint
+    from task_executor import check_cancelled
 except ImportError:
-    from .subjects_tags import generate_and_inject as _gen_subjects
-    from .pharmacology_tags import generate_and_inject as _gen_pharmacology
-    from .guidelines_tags import generate_and_inject as _gen_guidelines
+    from . import subjects_tags, pharmacology_tags, guidelines_tags
+    from .generation_profile import GenerationProfile, NULL_PROFILE
+    from .request_scheduler import SCHEDULER, RETRY_STATUSES, current_priority, with_priority
+    from .sync_state import SyncState, PageSizer, MIN_PAGE_SIZE, property_ids
+    from .fetch_checkpoint import FetchCheckpoint
+    from .task_executor import check_cancelled
+
+_gen_subjects = subjects_tags.generate_and_inject
+_gen_pharmacology = pharmacology_tags.generate_and_inject
+_gen_guidelines = guidelines_tags.generate_and_inject
 
 GENERATOR_VERSION = 1
 
 _API_VERSION = "2025-09-03"
-_PAGE_SIZE = 100
+# Base URL of the Notion API.  Overridable (NOTION_API_BASE) so every fetcher —
+# here, update_cache.py and the add-on — can be pointed at the local stand-in
+# in benchmarks/notion_stub.py.
+API_BASE = os.environ.get("NOTION_API_BASE", "https://api.notion.com/v1").rstrip("/")
 _TIMEOUT = 120
+# Page sizes are learned per database (sync_state.PageSizer), not configured:
+# query_page handles 504s / timeouts itself by shrinking the page.
+_RETRY_BUT_504 = tuple(s for s in RETRY_STATUSES if s != 504)
+
+# Every request goes through request_scheduler.SCHEDULER (shared rate budget,
+# priorities, retries) — the token is shared by every add-on install, so runtime
+# fetches must be polite.
 
-# Per-database page-size throttle, mirroring update_cache.py's PAGE_SIZE_OVERRIDE:
-# while the original DBs still carry the heavy legacy Notion formulas, querying
-# them at page_size=100 makes Notion time out (504).  Keyed by dash-less id.
-# Remove once the formula properties are deleted from the Notion databases.
-_PAGE_SIZE_OVERRIDE = {
-    '2674b67cbdf84a11a057a29cc24c524f': 25,   # Subjects (original)
-    '9ff96451736d43909d49e3b9d60971f8': 25,   # Pharmacology (original)
-    '13d5964e68a48056b40de8148dd91a06': 25,   # Guidelines
+# Which properties each consumer fetches (`filter_properties`).  A generated
+# database's own graph: everything except what its generator writes (the Notion
+# formula versions of those are the heavy part of every query).  Cross-ref
+# databases: only what the generators read from them.
+GENERATED_PROPERTIES = {
+    "subjects": subjects_tags.GENERATED_PROPERTIES,
+    "pharmacology": pharmacology_tags.GENERATED_PROPERTIES,
+    "guidelines": guidelines_tags.GENERATED_PROPERTIES,
 }
+CROSSREF_PROPERTIES = {
+    "qb": ("Tag", "Disease Subtag", "Pharm Subtag"),
+    "rotation": ("Tag",),
+}
+
+# Data-source ids and property schemas, persisted between runs (sync_state.py).
+# In memory only until the add-on points it at its cache dir (use_sync_state).
+_sync_state = SyncState()
+
+
+def use_sync_state(state: SyncState):
+    global _sync_state
+    _sync_state = state
+
 
-# Global rate limiter (3 req/s across all threads) — the token is shared by every
-# add-on install, so runtime fetches must be polite.
-_rate_lock = threading.Lock()
-_last_request_time = 0.0
-_MIN_INTERVAL = 1.0 / 3
+# Where interrupted paginated fetches leave their checkpoint (fetch_checkpoint.py)
+# so the next attempt resumes instead of starting over.  None — nothing
+# persisted — until the add-on points it at its cache dir (use_checkpoint_dir).
+_checkpoint_dir = None
 
 
-def _rate_limited_wait():
-    global _last_request_time
-    with _rate_lock:
-        wait = _MIN_INTERVAL - (time.time() - _last_request_time)
-        if wait > 0:
-            time.sleep(wait)
-        _last_request_time = time.time()
+def use_checkpoint_dir(path):
+    global _checkpoint_dir
+    _checkpoint_dir = path
 
 
 # ── pure dispatch ────────────────────────────────────────────────────────────
 def generate_from_pages(kind: str, all_pages: list,
-                        qb_pages: list = None, rotation_pages: list = None) -> list:
-    """Run the right generator over already-fetched pages; return cache pages."""
+                        qb_pages: list = None, rotation_pages: list = None,
+                        profile: GenerationProfile = None,
+                        profile_log: str = None) -> list:
+    """Run the right generator over already-fetched pages; return cache pages.
+
+    Pass a GenerationProfile as `profile` to have it filled in (stage timings,
+    path/fan-out/cycle counts, peak structure sizes), and/or a `profile_log`
+    path to append the profile to as one JSON line (a profile is created for
+    the log if none was passed)."""
+    if profile is None and profile_log:
+        profile = GenerationProfile(kind)
+    prof = profile or NULL_PROFILE
+    prof.count("pages_in", len(all_pages))
+    prof.count("qb_pages", len(qb_pages or []))
+    prof.count("rotation_pages", len(rotation_pages or []))
+
     if kind == "subjects":
-        return _gen_subjects(all_pages, qb_pages or [], rotation_pages or [])
-    if kind == "pharmacology":
-        return _gen_pharmacology(all_pages, qb_pages or [])
-    if kind == "guidelines":
-        return _gen_guidelines(all_pages)
-    raise ValueError(f"unknown generated-database kind: {kind!r}")
+        pages = _gen_subjects(all_pages, qb_pages or [], rotation_pages or [], profile=prof)
+    elif kind == "pharmacology":
+        pages = _gen_pharmacology(all_pages, qb_pages or [], profile=prof)
+    elif kind == "guidelines":
+        pages = _gen_guidelines(all_pages, profile=prof)
+    else:
+        raise ValueError(f"unknown generated-database kind: {kind!r}")
+
+    prof.count("pages_out", len(pages))
+    if profile_log:
+        try:
+            profile.write_jsonl(profile_log)
+        except OSError as e:
+            print(f"Could not write generation profile to {profile_log}: {e}")
+    return pages
 
 
 # ── Notion fetching (runtime) ────────────────────────────────────────────────
@@ -88,60 +142,146 @@ def _headers(token: str) -> dict:
 
 
 def _data_source_id(database_id: str, headers: dict) -> str:
-    _rate_limited_wait()
-    r = requests.get(f"https://api.notion.com/v1/databases/{database_id}",
-                     headers=headers, timeout=_TIMEOUT)
+    ds_id = _sync_state.get(database_id, "data_source_id")
+    if ds_id:
+        return ds_id
+    r = SCHEDULER.send(None, "GET", f"{API_BASE}/databases/{database_id}",
+                       headers=headers, timeout=_TIMEOUT)
     r.raise_for_status()
     sources = r.json().get("data_sources", [])
-    return sources[0]["id"] if sources else database_id
+    ds_id = sources[0]["id"] if sources else database_id
+    _sync_state.update(database_id, data_source_id=ds_id)
+    return ds_id
+
+
+def _schema(database_id: str, ds_id: str, headers: dict, wanted=()) -> dict:
+    """{property name: property id} of the database's data source."""
+    def fetch():
+        r = SCHEDULER.send(None, "GET", f"{API_BASE}/data_sources/{ds_id}",
+                           headers=headers, timeout=_TIMEOUT)
+        r.raise_for_status()
+        return {name: prop.get("id", name)
+                for name, prop in r.json().get("properties", {}).items()}
+    return _sync_state.schema(database_id, fetch, wanted)
 
 
-def fetch_all_pages(database_id: str, token: str, filter_: dict = None) -> list:
-    """Fetch every page of a database via the data sources query API (paginated,
-    rate-limited, with retry/backoff honouring Retry-After on transient errors).
+def fetch_all_pages(database_id: str, token: str, filter_: dict = None,
+                    properties=None, exclude_properties=()) -> list:
+    """Fetch every page of a database via the data sources query API (paginated;
+    rate limiting and retries by the request scheduler).
     An optional Notion `filter` object narrows the query (e.g. only pages edited
-    since a timestamp)."""
+    since a timestamp).  `properties` / `exclude_properties` (names) limit the
+    properties returned, via `filter_properties` and the stored schema.
+
+    A 400/404 may mean the stored data-source id or schema is out of date (a
+    property renamed or deleted): they are forgotten and the fetch restarts
+    once from fresh ones, then once more without a property filter."""
     headers = _headers(token)
-    ds_id = _data_source_id(database_id, headers)
-    url = f"https://api.notion.com/v1/data_sources/{ds_id}/query"
-    page_size = _PAGE_SIZE_OVERRIDE.get(database_id.replace('-', ''), _PAGE_SIZE)
-    pages, cursor, has_more = [], None, True
+    narrowed = properties is not None or bool(exclude_properties)
+    for attempt in ("stored", "refreshed", "unfiltered"):
+        ds_id = _data_source_id(database_id, headers)
+        prop_ids = None
+        if narrowed and attempt != "unfiltered":
+            prop_ids = property_ids(_schema(database_id, ds_id, headers, properties or ()),
+                                    properties, exclude_properties)
+        try:
+            return _query_all(database_id, f"{API_BASE}/data_sources/{ds_id}/query",
+                              headers, PageSizer(_sync_state, database_id), filter_, prop_ids)
+        except requests.HTTPError as e:
+            if e.response is None or e.response.status_code not in (400, 404) \
+                    or attempt == "unfiltered" or (attempt == "refreshed" and not prop_ids):
+                raise
+            print(f"Query of {database_id} failed ({e.response.status_code}) — "
+                  f"retrying with {'a refreshed schema' if attempt == 'stored' else 'every property'}")
+            _sync_state.forget(database_id, "data_source_id", "schema", "schema_at")
+
+
+def query_page(session, url: str, payload: dict, sizer: PageSizer, **kwargs):
+    """POST one page of a query at the sizer's current page size (set in
+    `payload`).  A 504 or a timeout halves the page size and re-sends; once at
+    the minimum, 504s get the scheduler's normal retries.  Successful response
+    times feed back into the sizer."""
+    while True:
+        payload["page_size"] = sizer.size
+        adaptive = sizer.size > MIN_PAGE_SIZE
+        try:
+            resp = SCHEDULER.send(session, "POST", url, json=payload,
+                                  retry_on=_RETRY_BUT_504 if adaptive else RETRY_STATUSES,
+                                  retry_timeouts=not adaptive, **kwargs)
+        except requests.Timeout:
+            if not (adaptive and sizer.shrink()):
+                raise       # at the minimum: the scheduler's retries are spent
+            continue
+        if resp.status_code == 504 and adaptive and sizer.shrink():
+            continue
+        if resp.ok:
+            sizer.observe(resp.elapsed.total_seconds())
+        return resp
+
+
+def paginate(send, checkpoint: FetchCheckpoint, label: str) -> list:
+    """Every result of a paginated query; `send(cursor)` returns one page's
+    JSON (raising on HTTP errors).  Each page is checkpointed as it arrives and
+    an earlier attempt's checkpoint is resumed from its last cursor; the
+    checkpoint is discarded once the last page is in, so callers still get all
+    or nothing.  A resumed cursor Notion rejects (400) restarts from scratch.
+    Between pages the running task's cancellation is checked (task_executor);
+    a cancelled fetch keeps its checkpoint, so the next attempt resumes it."""
+    pages, cursor = checkpoint.load()
+    resumed = cursor is not None
+    if resumed:
+        print(f"Resuming {label} after {len(pages)} checkpointed pages")
+    has_more = True
     while has_more:
-        payload = {"page_size": page_size}
-        if filter_:
-            payload["filter"] = filter_
-        if cursor:
-            payload["start_cursor"] = cursor
-        data = None
-        for attempt in range(6):
-            _rate_limited_wait()
-            resp = requests.post(url, headers=headers, json=payload, timeout=_TIMEOUT)
-            if resp.status_code in (429, 500, 502, 503, 504):
-                retry_after = resp.headers.get("Retry-After")
-                try:
-                    wait = float(retry_after) if retry_after else min(2 ** attempt, 30)
-                except ValueError:
-                    wait = min(2 ** attempt, 30)
-                time.sleep(wait)
+        check_cancelled()
+        try:
+            data = send(cursor)
+        except Exception as e:
+            if resumed and isinstance(e, requests.HTTPError) and e.response is not None \
+                    and e.response.status_code == 400:
+                print(f"Checkpoint for {label} no longer valid — starting over")
+                checkpoint.discard()
+                pages, cursor, resumed = [], None, False
                 continue
-            resp.raise_for_status()
-            data = resp.json()
-            break
-        if data is None:
-            raise RuntimeError(f"repeated server errors fetching {database_id}")
+            if pages and checkpoint.path is not None:
+                print(f"{label}: stopped after {len(pages)} pages (checkpointed)")
+            raise
         pages.extend(data["results"])
         has_more = data.get("has_more", False)
         cursor = data.get("next_cursor")
+        if has_more:
+            checkpoint.append(data["results"], cursor)
+    checkpoint.discard()
     return pages
 
 
-def fetch_edited_since(database_id: str, token: str, since_iso: str) -> list:
+def _query_all(database_id: str, url: str, headers: dict, sizer: PageSizer,
+               filter_: dict = None, prop_ids: list = None) -> list:
+    params = {"filter_properties[]": prop_ids} if prop_ids else None
+
+    def send(cursor):
+        payload = {}
+        if filter_:
+            payload["filter"] = filter_
+        if cursor:
+            payload["start_cursor"] = cursor
+        resp = query_page(None, url, payload, sizer, headers=headers, params=params,
+                          timeout=_TIMEOUT)
+        resp.raise_for_status()
+        return resp.json()
+
+    checkpoint = FetchCheckpoint(_checkpoint_dir, "query", url, filter_, prop_ids)
+    return paginate(send, checkpoint, database_id)
+
+
+def fetch_edited_since(database_id: str, token: str, since_iso: str,
+                       properties=None, exclude_properties=()) -> list:
     """Every page of the database whose last_edited_time is on or after
     `since_iso` (full page objects).  Used for incremental graph updates."""
     return fetch_all_pages(database_id, token, filter_={
         "timestamp": "last_edited_time",
         "last_edited_time": {"on_or_after": since_iso},
-    })
+    }, properties=properties, exclude_properties=exclude_properties)
 
 
 def any_edits_since(database_id: str, token: str, since_iso: str) -> bool:
@@ -149,24 +289,117 @@ def any_edits_since(database_id: str, token: str, since_iso: str) -> bool:
     last_edited_time is on or after `since_iso`?  One page_size=1 query."""
     headers = _headers(token)
     ds_id = _data_source_id(database_id, headers)
-    url = f"https://api.notion.com/v1/data_sources/{ds_id}/query"
+    url = f"{API_BASE}/data_sources/{ds_id}/query"
     payload = {
         "page_size": 1,
         "filter": {"timestamp": "last_edited_time",
                    "last_edited_time": {"on_or_after": since_iso}},
     }
-    _rate_limited_wait()
-    resp = requests.post(url, headers=headers, json=payload, timeout=_TIMEOUT)
+    resp = SCHEDULER.send(None, "POST", url, headers=headers, json=payload, timeout=_TIMEOUT)
     resp.raise_for_status()
     return bool(resp.json().get("results"))
 
 
+_FOR_SEARCH_FILTER = {"property": "For Search", "formula": {"checkbox": {"equals": True}}}
+
+
+def fetch_live_ids(database_id: str, token: str, for_search: bool = False) -> set:
+    """Ids of every live page of the database (only `For Search` pages with
+    `for_search`; falls back to every page when the database lacks that
+    property).  Archived/trashed pages are never returned by a query, so this
+    membership scan is how incremental syncs — which only see edits — learn
+    which cached pages were deleted.  Requests just the title property (id
+    "title" in every database), so pages are small and the scan cheap; its page
+    size is learned separately from the full-property queries'."""
+    headers = _headers(token)
+    ds_id = _data_source_id(database_id, headers)
+    url = f"{API_BASE}/data_sources/{ds_id}/query"
+    sizer = PageSizer(_sync_state, f"{database_id}:ids")
+    try:
+        pages = _query_all(database_id, url, headers, sizer,
+                           _FOR_SEARCH_FILTER if for_search else None, ["title"])
+    except requests.HTTPError as e:
+        if not for_search or e.response is None or e.response.status_code != 400:
+            raise
+        pages = _query_all(database_id, url, headers, sizer, None, ["title"])
+    return {p["id"] for p in pages}
+
+
+# ── Incremental sync of ordinary databases (runtime) ─────────────────────────
+# The add-on's incremental sync still uses the older database-query endpoint.
+_LEGACY_API_VERSION = "2022-06-28"
+
+
+def _edited_query_payload(since: str, use_for_search: bool, start_cursor: str = None) -> dict:
+    """Database query payload: pages edited on/after `since` (optionally only
+    `For Search` pages)."""
+    edited = {"timestamp": "last_edited_time",
+              "last_edited_time": {"on_or_after": since}}
+    if use_for_search:
+        filter_ = {"and": [_FOR_SEARCH_FILTER, edited]}
+    else:
+        filter_ = edited
+    payload = {"filter": filter_}
+    if start_cursor:
+        payload["start_cursor"] = start_cursor
+    return payload
+
+
+def fetch_updated_pages(database_id: str, token: str, since: str,
+                        use_for_search: bool = False, timeout: float = _TIMEOUT) -> list:
+    """Every page edited on/after `since` via the database query endpoint.
+
+    With `use_for_search`, first tries the "For Search" formula filter; a 400
+    (database lacks that property, e.g. Synced Extra / Additional Resources)
+    restarts the query with only the last_edited_time filter.  Raises on any
+    other failure rather than returning a partial list: saving partial results
+    would stamp the cache "fresh as of now" and the pages never fetched would be
+    skipped by every future incremental sync.  The pages fetched so far are
+    checkpointed, so the next sync with the same `since` picks up from there."""
+    headers = {**_headers(token), "Notion-Version": _LEGACY_API_VERSION}
+    url = f"{API_BASE}/databases/{database_id}/query"
+    sizer = PageSizer(_sync_state, database_id)
+
+    def fetch(for_search: bool) -> list:
+        def send(cursor):
+            payload = _edited_query_payload(since, for_search, cursor)
+            resp = query_page(None, url, payload, sizer, headers=headers, timeout=timeout)
+            resp.raise_for_status()
+            return resp.json()
+        checkpoint = FetchCheckpoint(_checkpoint_dir, "updated", database_id, since, for_search)
+        return paginate(send, checkpoint, database_id)
+
+    try:
+        if use_for_search:
+            try:
+                return fetch(True)
+            except requests.HTTPError as e:
+                if e.response is None or e.response.status_code != 400:
+                    raise
+                print(f"Database {database_id} returned 400 with 'For Search' filter — "
+                      f"retrying without it (database may not have that property)")
+        return fetch(False)
+    except Exception as e:
+        print(f"Error fetching {database_id} from Notion: {type(e).__name__}: {e}")
+        raise
+
+
+def fetch_properties(kind: str, role: str) -> dict:
+    """fetch_all_pages keyword arguments for one input of a `kind` build:
+    role 'main' (the database's own graph), 'qb' or 'rotation'."""
+    if role == "main":
+        return {"exclude_properties": GENERATED_PROPERTIES[kind]}
+    return {"properties": CROSSREF_PROPERTIES[role]}
+
+
 def fetch_and_generate(kind: str, token: str, db_id: str,
-                       qb_id: str = None, rotation_id: str = None) -> list:
+                       qb_id: str = None, rotation_id: str = None,
+                       profile: GenerationProfile = None) -> list:
     """Fetch the database (+ cross-ref databases) from Notion and generate the
     cache pages.  The main DB and its cross-ref DBs are fetched concurrently so
     the (smaller) Question Banks / Rotation fetches overlap the main one rather
-    than adding to it.  Raises on network/Notion failure (caller keeps old cache)."""
+    than adding to it.  Raises on network/Notion failure (caller keeps old cache).
+    With a `profile`, the fetch wall-time is recorded as its `fetch` stage."""
     import concurrent.futures
 
     targets = {'main': db_id}
@@ -176,12 +409,15 @@ def fetch_and_generate(kind: str, token: str, db_id: str,
         targets['rotation'] = rotation_id
 
     results = {}
-    with concurrent.futures.ThreadPoolExecutor(max_workers=len(targets)) as ex:
-        futures = {ex.submit(fetch_all_pages, dbid, token): key
-                   for key, dbid in targets.items()}
-        for fut in concurrent.futures.as_completed(futures):
-            results[futures[fut]] = fut.result()   # re-raises any fetch error
+    with (profile or NULL_PROFILE).stage("fetch"):
+        with concurrent.futures.ThreadPoolExecutor(max_workers=len(targets)) as ex:
+            fetch = with_priority(current_priority(), fetch_all_pages)
+            futures = {ex.submit(fetch, dbid, token, **fetch_properties(kind, key)): key
+                       for key, dbid in targets.items()}
+            for fut in concurrent.futures.as_completed(futures):
+                results[futures[fut]] = fut.result()   # re-raises any fetch error
 
     return generate_from_pages(
-        kind, results['main'], results.get('qb'), results.get('rotation')
+        kind, results['main'], results.get('qb'), results.get('rotation'),
+        profile=profile,
     )
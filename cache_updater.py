@@ -9,18 +9,21 @@ len(DATABASES) so adding or removing databases never breaks the bar:
   Phase 2 — Notion sync     : steps N … 2N-1
   Done                      : step 2N  →  dialog closes
 
-During the async Notion phase the bar briefly goes indeterminate (pulse)
-while waiting for the network response, then snaps to the next integer
-step when the callback fires.
+Phase 1 downloads every outdated seed at once and fills its half of the bar
+by bytes received (steps may be fractional).  Phase 2 runs up to
+NOTION_CONCURRENCY database syncs at a time — every request still goes
+through the shared request scheduler, so together they keep to the token's
+rate limit — and advances one step per database finished.
 """
 
-import time
 import threading
+import time
 from aqt.qt import (
     QDialog, QVBoxLayout, QHBoxLayout, QLabel, QProgressBar, Qt, QTimer
 )
 from .utils import malleus_tooltip
 from .config import DATABASES, GENERATED_DATABASES
+from .request_scheduler import PRIORITY_INTERACTIVE
 
 try:
     from .ui.styles import apply_malleus_style, make_header, COLORS
@@ -34,6 +37,11 @@ except Exception:
             return QWidget()
         COLORS = {"accent": "#4a82cc"}
 
+# Database syncs in flight at once during Phase 2.  They are network-bound and
+# share the request scheduler's rate limit, so a few in parallel finish in about
+# the time of the slowest one; more would only queue on the limiter.
+NOTION_CONCURRENCY = 3
+
 
 class _MalleusProgressDialog(QDialog):
     """
@@ -46,8 +54,13 @@ class _MalleusProgressDialog(QDialog):
     -------------
     pulse()   – switch bar to indeterminate (busy) mode
     unset_pulse(value) – snap out of pulse and set a concrete value
+
+    Values are steps out of `maximum` and may be fractional (byte progress
+    within a step); the bar itself counts in 1/_RESOLUTION steps.
     """
 
+    _RESOLUTION = 100
+
     def __init__(self, parent, maximum: int):
         super().__init__(parent)
         self.setWindowTitle("Malleus — Update Database Cache")
@@ -93,7 +106,7 @@ class _MalleusProgressDialog(QDialog):
         # Progress bar
         self._bar = QProgressBar()
         self._bar.setMinimum(0)
-        self._bar.setMaximum(maximum)
+        self._bar.setMaximum(maximum * self._RESOLUTION)
         self._bar.setValue(0)
         self._bar.setTextVisible(False)
         self._bar.setFixedHeight(10)
@@ -106,11 +119,11 @@ class _MalleusProgressDialog(QDialog):
 
     # ── Public interface ──────────────────────────────────────────────────────
 
-    def setValue(self, value: int):
+    def setValue(self, value: float):
         """Set a concrete progress value and update the percentage label."""
         if self._bar.maximum() == 0:          # snap out of indeterminate mode
-            self._bar.setMaximum(self._maximum)
-        self._bar.setValue(value)
+            self._bar.setMaximum(self._maximum * self._RESOLUTION)
+        self._bar.setValue(int(value * self._RESOLUTION))
         pct = int(round(value / self._maximum * 100)) if self._maximum else 0
         self._pct.setText(f"{pct} %")
 
@@ -127,9 +140,9 @@ class _MalleusProgressDialog(QDialog):
         self._bar.setMaximum(0)
         self._pct.setText(pct_text)
 
-    def unset_pulse(self, value: int):
+    def unset_pulse(self, value: float):
         """Leave indeterminate mode and show a concrete value."""
-        self._bar.setMaximum(self._maximum)
+        self._bar.setMaximum(self._maximum * self._RESOLUTION)
         self.setValue(value)
 
     def close(self):
@@ -151,10 +164,11 @@ def perform_cache_update(notion_cache, main_window, full=False, on_complete=None
     ``on_complete`` is invoked on the main thread once the whole update chain
     finishes (success or error)."""
 
+    notion_cache.begin_refresh_cycle()   # cross-ref DBs fetched once for this update
+
     n = len(DATABASES)          # number of databases
     total_steps = n * 2         # phase 1: n GitHub DLs  + phase 2: n Notion syncs
 
-    current_notion_update = [0]
     progress = [None]
     failed_downloads = set()    # DBs whose GitHub seed was missing → rebuild from Notion
 
@@ -168,7 +182,7 @@ def perform_cache_update(notion_cache, main_window, full=False, on_complete=None
 
     # ── Helpers ───────────────────────────────────────────────────────────────
 
-    def update_progress(step: int, message: str):
+    def update_progress(step: float, message: str):
         def _update():
             if progress[0] is None:
                 return
@@ -176,82 +190,77 @@ def perform_cache_update(notion_cache, main_window, full=False, on_complete=None
             progress[0].setLabelText(message)
         main_window.taskman.run_on_main(_update)
 
-    def start_pulse(notion_idx: int, message: str):
-        """Go indeterminate while an async Notion request is in-flight.
-        Shows 'DB x/n · y%' in the percentage label so the user can see progress."""
-        step     = n + notion_idx          # absolute step at start of this DB sync
-        pct      = int(round(step / total_steps * 100))
-        pct_text = f"DB {notion_idx + 1}/{n} · {pct} %"
-        def _pulse():
-            if progress[0] is None:
-                return
-            progress[0].pulse(pct_text)
-            progress[0].setLabelText(message)
-        main_window.taskman.run_on_main(_pulse)
-
-    def stop_pulse(step: int, message: str):
-        """Snap out of indeterminate mode once the callback fires."""
-        def _stop():
-            if progress[0] is None:
-                return
-            progress[0].unset_pulse(step)
-            progress[0].setLabelText(message)
-        main_window.taskman.run_on_main(_stop)
-
-    # ── Phase 2: Notion sync chain ────────────────────────────────────────────
-
-    def process_next_notion_update():
-        idx = current_notion_update[0]
-        if idx < n:
-            db_id, name = DATABASES[idx]
-            # Phase-2 step = n + idx  (picks up right after all GitHub downloads)
-            notion_step = n + idx
+    # ── Phase 2: Notion sync, a bounded concurrent batch ─────────────────────
+    #
+    # Runs on the main thread: update_cache_async only starts a worker, and its
+    # callback comes back here.  A generated DB waits for the databases of the
+    # batch it cross-references (Rotation before Subjects), so the two never
+    # query the same Notion database at once.
+
+    def depends_on(db_id):
+        cfg = GENERATED_DATABASES.get(db_id, {})
+        return {cfg.get('qb'), cfg.get('rotation')} & batch_ids
+
+    batch_ids = {db_id for db_id, _ in DATABASES if db_id}
+    # Cross-referenced databases first, so their dependants aren't held back.
+    needed = set().union(*(depends_on(db_id) for db_id in batch_ids))
+    pending = sorted(((db_id, name) for db_id, name in DATABASES if db_id),
+                     key=lambda item: item[0] not in needed)
+    running = {}                # db_id → name
+    finished = set()
+
+    def show_phase2(message: str):
+        # The executor knows which of ours are actually running and which
+        # still wait for a worker (e.g. behind a startup check).
+        tasks = [t for t in notion_cache.tasks() if t["key"] in running]
+        names = ", ".join(t["label"] for t in tasks if t["state"] == "running")
+        waiting = sum(t["state"] == "queued" for t in tasks)
+        if names:
+            message += f"  ·  syncing {names}…"
+        if waiting:
+            message += f" ({waiting} queued)"
+        update_progress(n + len(finished) + (n - len(batch_ids)), message)
+
+    def start_notion_updates():
+        for db_id, name in list(pending):
+            if len(running) >= NOTION_CONCURRENCY:
+                break
+            if not depends_on(db_id) <= finished:
+                continue
+            pending.remove((db_id, name))
+            running[db_id] = name
             # Full Notion rebuilds apply to GENERATED databases only — when
             # explicitly asked (Shift+click) or when their GitHub seed failed in
             # Phase 1.  Ordinary DBs always sync incrementally on top of the seed.
             needs_rebuild = (db_id in GENERATED_DATABASES
                              and (full or db_id in failed_downloads))
-            if not db_id:
-                on_notion_update_complete()
-            else:
-                if needs_rebuild:
-                    msg = f"Rebuilding {name} from Notion…"
-                elif db_id in GENERATED_DATABASES:
-                    # Smart refresh: regenerate only if Notion changed since the seed.
-                    msg = f"Checking {name} for changes…"
-                else:
-                    msg = f"Syncing new {name} pages from Notion…"
-                start_pulse(idx, msg)
-                notion_cache.update_cache_async(
-                    db_id, force=True, full=needs_rebuild,
-                    callback=on_notion_update_complete
-                )
+            notion_cache.update_cache_async(
+                db_id, force=True, full=needs_rebuild,
+                callback=lambda db_id=db_id: on_notion_update_complete(db_id),
+                priority=PRIORITY_INTERACTIVE,
+            )
+        if not running and not pending:
+            finish()
         else:
-            def complete():
-                if progress[0] is not None:
-                    progress[0].unset_pulse(total_steps)
-                    progress[0].setLabelText("Done!")
-                    # Brief pause so the user sees 100 % before the window closes
-                    QTimer.singleShot(600, progress[0].close)
-                    QTimer.singleShot(700, lambda: malleus_tooltip(
-                        "Cache successfully downloaded and updated"
-                    ))
-                if on_complete:
-                    on_complete()
-            main_window.taskman.run_on_main(complete)
-
-    def on_notion_update_complete():
-        idx = current_notion_update[0]
-        notion_step = n + idx + 1   # +1 because this callback fires after completion
-        db_name = DATABASES[idx][1] if idx < n else ""
-        stop_pulse(notion_step, f"{db_name} synced ✓" if db_name else "Synced ✓")
-        current_notion_update[0] += 1
-        # Small breathing room so the step is visible before the next starts —
-        # scheduled via QTimer (this callback runs on the main thread; sleeping
-        # here would freeze the UI).
-        def _next():
-            main_window.taskman.run_on_main(process_next_notion_update)
-        QTimer.singleShot(150, _next)
+            show_phase2(f"{len(finished)}/{len(batch_ids)} databases synced")
+
+    def on_notion_update_complete(db_id):
+        name = running.pop(db_id, "")
+        finished.add(db_id)
+        print(f"{name} synced ({len(finished)}/{len(batch_ids)})")
+        start_notion_updates()
+
+    def finish():
+        if progress[0] is not None:
+            progress[0].unset_pulse(total_steps)
+            progress[0].setLabelText("Done!")
+            # Brief pause so the user sees 100 % before the window closes
+            QTimer.singleShot(600, progress[0].close)
+            QTimer.singleShot(700, lambda: malleus_tooltip(
+                "Cache successfully downloaded and updated"
+            ))
+        if on_complete:
+            on_complete()
 
     # ── Phase 1: GitHub downloads (blocking, runs in background thread) ───────
 
@@ -266,29 +275,46 @@ def perform_cache_update(notion_cache, main_window, full=False, on_complete=None
         main_window.taskman.run_on_main(_err)
 
     def download_thread():
-        for idx, (db_id, name) in enumerate(DATABASES):
-            # Full (Shift+click) rebuilds from Notion apply to generated DBs only;
-            # ordinary DBs still seed from GitHub below (a full Notion re-fetch
-            # of them is too expensive — seed + incremental sync is the model).
-            if full and db_id in GENERATED_DATABASES:
-                update_progress(idx, f"{name}: will rebuild from Notion…")
-                time.sleep(0.1)
-                continue
-            # Generated DBs included: their seed download is ETag-conditional
-            # (304 = no transfer) and never touches the local raw graph, and on a
-            # first run after an add-on update it's what makes Phase 2 cheap —
-            # without it the missing raw graph would force a slow Notion rebuild.
-            update_progress(idx, f"Downloading {name} from GitHub…")
-            success = notion_cache.download_cache_from_github(db_id)
-            if not success:
+        # One conditional request says which seeds changed; current ones then
+        # cost nothing below.
+        update_progress(0, "Checking GitHub for new seeds…")
+        manifest = notion_cache.fetch_seed_manifest()
+        # Full (Shift+click) rebuilds from Notion apply to generated DBs only;
+        # ordinary DBs still seed from GitHub below (a full Notion re-fetch
+        # of them is too expensive — seed + incremental sync is the model).
+        # Generated DBs included otherwise: their seed download is conditional
+        # and never touches the local raw graph, and on a first run after an
+        # add-on update it's what makes Phase 2 cheap — without it the missing
+        # raw graph would force a slow Notion rebuild.
+        to_download = [(db_id, name) for db_id, name in DATABASES
+                       if db_id and not (full and db_id in GENERATED_DATABASES)]
+        update_progress(0, f"Downloading {len(to_download)} seeds from GitHub…")
+
+        last_shown = [0.0]
+
+        def on_bytes(done, total):
+            # Called per chunk from the download workers: repaint ~10×/s at most.
+            now = time.monotonic()
+            if now - last_shown[0] < 0.1:
+                return
+            last_shown[0] = now
+            # Bytes map onto Phase 1's steps 0 … n (total unknown: no movement).
+            step = n * done / total if total else 0
+            update_progress(step, f"Downloading seeds from GitHub… "
+                                  f"{done / 1e6:.1f} / {total / 1e6:.1f} MB")
+
+        results = notion_cache.download_caches_from_github(
+            [db_id for db_id, _ in to_download], manifest, progress=on_bytes)
+        for db_id, name in to_download:
+            if not results.get(db_id):
                 # Missing seed (e.g. not yet committed) — don't abort the whole
                 # update; generated DBs get rebuilt from Notion in Phase 2.
                 print(f"No GitHub seed for {name}.")
                 failed_downloads.add(db_id)
-            time.sleep(0.2)   # brief pause makes each step visible
+        update_progress(n, "Seeds downloaded ✓")
 
         # Hand off to Phase 2
-        process_next_notion_update()
+        main_window.taskman.run_on_main(start_notion_updates)
 
     thread = threading.Thread(target=download_thread, daemon=True)
     thread.start()
@@ -173,6 +173,22 @@ def load_config():
         config['remember_subtag_selection'] = False  # pre-select last subtag on result rows
         mw.addonManager.writeConfig(__name__.split('.')[0], config)
 
+    if 'warmup' not in config:
+        config['warmup'] = True  # load caches + build indexes in the background after startup
+        mw.addonManager.writeConfig(__name__.split('.')[0], config)
+
+    if 'warmup_memory_mb' not in config:
+        config['warmup_memory_mb'] = 256  # stop warming up beyond roughly this much memory
+        mw.addonManager.writeConfig(__name__.split('.')[0], config)
+
+    if 'profile_generation' not in config:
+        config['profile_generation'] = False  # diagnostic stage profiles of local rebuilds
+        mw.addonManager.writeConfig(__name__.split('.')[0], config)
+
+    if 'log_dialog_open' not in config:
+        config['log_dialog_open'] = False  # log page selector open latency (benchmarks)
+        mw.addonManager.writeConfig(__name__.split('.')[0], config)
+
     return config
 
 def get_database_id(database_name):
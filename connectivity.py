@@ -0,0 +1,126 @@
+"""
+Per-endpoint connectivity state, learnt from real requests.
+
+Instead of probing a third-party host before every sync (a blocking HEAD that
+costs up to its timeout when offline, and a round-trip when online), each
+endpoint the add-on talks to has a circuit breaker fed by the outcome of the
+requests it actually makes:
+
+  closed     requests go out; a connection failure opens the breaker
+  open       requests fail at once (requests.ConnectionError) without touching
+             the network, until the re-probe time
+  half-open  the re-probe time has come: one request is let through as the
+             probe — success closes the breaker, failure re-opens it with the
+             re-probe interval doubled (BASE_INTERVAL … MAX_INTERVAL)
+
+So an offline user pays one quick failure per endpoint, after which every
+update fails fast; an online user pays nothing extra.  Only connection-level
+failures count — an HTTP error status proves the endpoint is reachable.
+
+    if not NOTION.allow():
+        raise requests.ConnectionError(NOTION.describe())
+    try:
+        response = session.get(...)
+    except requests.ConnectionError:
+        NOTION.record_failure(); raise
+    NOTION.record_success()
+
+`guard(breaker)` wraps exactly that around a block.
+
+Dependency-free (only `requests`); safe to import in CI and inside Anki.
+"""
+import threading
+import time
+from contextlib import contextmanager
+
+import requests
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+BASE_INTERVAL = 5.0
+MAX_INTERVAL = 300.0
+
+
+class CircuitBreaker:
+    def __init__(self, name: str, base_interval: float = BASE_INTERVAL,
+                 max_interval: float = MAX_INTERVAL, clock=time.monotonic):
+        self.name = name
+        self.base_interval = base_interval
+        self.max_interval = max_interval
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._retry_at = 0.0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state
+
+    def available(self) -> bool:
+        """Whether a request would be let through now — without claiming the
+        half-open probe (for cheap "are we offline?" checks)."""
+        with self._lock:
+            return self._state == CLOSED or self._clock() >= self._retry_at
+
+    def allow(self) -> bool:
+        """Whether to send a request now.  When the re-probe time has come this
+        caller becomes the probe; others keep failing fast until it reports
+        (or, if it never does, until the next re-probe time)."""
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+            now = self._clock()
+            if now < self._retry_at:
+                return False
+            self._state = HALF_OPEN
+            self._retry_at = now + self._interval()
+            return True
+
+    def record_success(self):
+        with self._lock:
+            if self._state != CLOSED:
+                print(f"{self.name} reachable again")
+            self._state = CLOSED
+            self._failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state != OPEN:
+                print(f"{self.name} unreachable — failing fast for {self._interval():.0f}s")
+            self._state = OPEN
+            self._retry_at = self._clock() + self._interval()
+
+    def _interval(self) -> float:
+        return min(self.max_interval, self.base_interval * 2 ** max(0, self._failures - 1))
+
+    def describe(self) -> str:
+        with self._lock:
+            wait = max(0.0, self._retry_at - self._clock())
+            return f"{self.name} unreachable (retrying in {wait:.0f}s)"
+
+
+@contextmanager
+def guard(breaker):
+    """Run a request under `breaker` (None: no-op): fail fast while it is
+    open, and record whether the request reached the endpoint."""
+    if breaker is None:
+        yield
+        return
+    if not breaker.allow():
+        raise requests.ConnectionError(breaker.describe())
+    try:
+        yield
+    except requests.ConnectionError:
+        breaker.record_failure()
+        raise
+    breaker.record_success()
+
+
+# Process-wide breakers, one per endpoint.
+GITHUB = CircuitBreaker("GitHub")
+NOTION = CircuitBreaker("Notion API")
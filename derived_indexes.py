@@ -0,0 +1,106 @@
+"""
+Named indexes derived from a database's cache snapshot, shared process-wide.
+
+Dialogs and background jobs used to rebuild the same lookups over and over —
+id → page maps per dialog instance, title scans per tag, a token index keyed
+by page count.  Instead they ask the registry:
+
+    by_id = registry.get(database_id, BY_ID)            # built-in index
+    by_name = registry.get(database_id, "extra_sync.title", keyed(title_of))
+
+An index is built lazily from the database's current Snapshot (snapshots.py)
+the first time it is asked for, then served to every caller until that
+database's snapshot changes: each entry remembers the snapshot version it was
+built from, so a publish (sync, download, regenerate) invalidates every index
+over that database without anyone having to remember to do it, and leaves the
+indexes over other databases alone.
+
+A builder is `builder(pages) -> index` over the snapshot's (read-only) pages;
+the index is shared, so callers must not modify it either.  The name is the
+cache key — one name, one builder.  Missing cache → `{}`.
+
+Dependency-free (no aqt); safe to import in CI and inside Anki.
+"""
+import threading
+
+BY_ID = "by_id"          # page id (dashed and dash-less) → page
+BY_TITLE = "by_title"    # exact title text → first page with it
+
+
+def page_title(page: dict) -> str:
+    return "".join(t.get("plain_text", "")
+                   for t in page.get("properties", {}).get("Name", {}).get("title", []))
+
+
+def by_id(pages) -> dict:
+    index = {}
+    for p in pages:
+        pid = p.get("id")
+        if pid:
+            index[pid] = p
+            index[pid.replace("-", "")] = p
+    return index
+
+
+def keyed(key_fn):
+    """Builder mapping `key_fn(page)` → the first page with that key (pages
+    whose key is empty or cannot be computed are left out)."""
+    def build(pages) -> dict:
+        index = {}
+        for p in pages:
+            try:
+                key = key_fn(p)
+            except (KeyError, IndexError, TypeError, AttributeError):
+                continue
+            if key:
+                index.setdefault(key, p)
+        return index
+    return build
+
+
+def reverse_relation(prop: str):
+    """Builder mapping a related page id (dash-less) → the pages whose
+    relation property `prop` points at it, in cache order."""
+    def build(pages) -> dict:
+        index = {}
+        for p in pages:
+            for rel in p.get("properties", {}).get(prop, {}).get("relation", []):
+                rid = rel.get("id", "").replace("-", "")
+                if not rid:
+                    continue
+                pages_for = index.setdefault(rid, [])
+                if not pages_for or pages_for[-1] is not p:    # listed twice
+                    pages_for.append(p)
+        return index
+    return build
+
+
+BUILTINS = {BY_ID: by_id, BY_TITLE: keyed(page_title)}
+
+
+class IndexRegistry:
+    def __init__(self, snapshots):
+        self._snapshots = snapshots
+        self._lock = threading.Lock()
+        self._built = {}           # (database_id, name) → (snapshot version, index)
+        self._building = {}        # (database_id, name) → Lock held while building
+
+    def get(self, database_id: str, name: str, builder=None):
+        """The `name` index over `database_id`'s current snapshot, building it
+        if that snapshot has not been indexed yet."""
+        snapshot = self._snapshots.get(database_id)
+        if snapshot is None:
+            return {}
+        key = (database_id, name)
+        entry = self._built.get(key)
+        if entry is not None and entry[0] == snapshot.version:
+            return entry[1]
+        with self._lock:
+            building = self._building.setdefault(key, threading.Lock())
+        with building:             # one build per index; others wait for it
+            entry = self._built.get(key)
+            if entry is not None and entry[0] >= snapshot.version:
+                return entry[1]
+            index = (builder or BUILTINS[name])(snapshot.pages)
+            self._built[key] = (snapshot.version, index)
+            return index
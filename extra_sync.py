@@ -36,6 +36,7 @@ from typing import List, Optional, Dict, Tuple, Set
 from .config import (get_database_id, SYNCED_EXTRA_DATABASE_ID,
                      SYNCED_ADDITIONAL_RESOURCES_DATABASE_ID, DATABASE_PROPERTIES)
 from .tag_utils import parse_tag, normalize_subtag_for_matching
+from .derived_indexes import BY_ID, keyed, reverse_relation
 
 EXTRA_FIELD                = "Extra (Synced)"
 ADDITIONAL_RESOURCES_FIELD = "Additional Resources (Synced)"
@@ -62,24 +63,27 @@ def _norm(text: str) -> str:
     return text.replace('_', ' ').lower().strip()
 
 
-# ── Cache loading & indexing ──────────────────────────────────────────────────
+# ── Cache indexes ─────────────────────────────────────────────────────────────
+# Served by the cache's derived-index registry (built once per cache version,
+# shared with the dialogs), never rebuilt per note.
 
-def _load_db_cache(notion_cache, database_id: str) -> List[Dict]:
-    """Load all pages from a local cache by database ID."""
+def _subject_title_key(page: Dict) -> str:
+    return _norm(page['properties']['Name']['title'][0]['text']['content'])
+
+
+SUBJECT_TITLE_INDEX = "extra_sync.subject_title"   # _norm(title) → Subjects page
+SE_BY_SUBJECT_INDEX = "extra_sync.by_subject"      # Subject relation id → SE/AR pages
+_by_subject_title = keyed(_subject_title_key)
+_se_by_subject = reverse_relation('Subject')
+
+
+def _index(notion_cache, database_id: str, name: str, builder=None) -> Dict:
+    """A derived index over a local cache; {} when it can't be loaded."""
     try:
-        pages, _ = notion_cache.load_from_cache(database_id, warn_if_expired=False)
-        return pages or []
+        return notion_cache.index(database_id, name, builder)
     except Exception as e:
         print(f"[ExtraSync] Cache load error for {database_id}: {e}")
-        return []
-
-
-def _build_id_index(pages: List[Dict]) -> Dict[str, Dict]:
-    """
-    Build a dict mapping normalised Notion page ID → page dict.
-    Allows O(1) lookup when we have an ID from a relation property.
-    """
-    return {p.get('id', '').replace('-', ''): p for p in pages if p.get('id')}
+        return {}
 
 
 def _find_subject_page(notion_cache, page_name: str) -> Optional[Dict]:
@@ -88,22 +92,9 @@ def _find_subject_page(notion_cache, page_name: str) -> Optional[Dict]:
     We return the full page so callers can read any property from it
     (including the Synced Extra / Synced Additional Resources relations).
     """
-    database_id = get_database_id("Subjects")
-    try:
-        cached_pages, _ = notion_cache.load_from_cache(database_id, warn_if_expired=False)
-        if not cached_pages:
-            return None
-        target = _norm(page_name)
-        for page in cached_pages:
-            try:
-                title_list = page['properties']['Name']['title']
-                if title_list and _norm(title_list[0]['text']['content']) == target:
-                    return page
-            except Exception:
-                continue
-    except Exception as e:
-        print(f"[ExtraSync] Subjects cache error: {e}")
-    return None
+    titles = _index(notion_cache, get_database_id("Subjects"),
+                    SUBJECT_TITLE_INDEX, _by_subject_title)
+    return titles.get(_norm(page_name))
 
 
 # ── Relation-based lookup (primary path) ─────────────────────────────────────
@@ -155,23 +146,18 @@ def _normalised_subtag_label(raw_subtag: str) -> str:
 
 
 def _fallback_se_pages(
-    se_pages: List[Dict],
+    se_by_subject: Dict[str, List[Dict]],
     target_id: str,
     nl: str,
 ) -> List[Dict]:
     """
-    Fallback: scan se_pages for entries whose Subject relation contains
-    target_id AND whose Subtag matches the normalised subtag label nl.
+    Fallback: the SE/AR pages whose Subject relation contains target_id (via the
+    reverse-relation index) AND whose Subtag matches the normalised subtag
+    label nl.
     """
     results = []
-    for page in se_pages:
+    for page in se_by_subject.get(target_id, []):
         props = page.get('properties', {})
-        relation_ids = [
-            r.get('id', '').replace('-', '')
-            for r in props.get('Subject', {}).get('relation', [])
-        ]
-        if target_id not in relation_ids:
-            continue
         raw_se_subtag = (props.get('Subtag', {}).get('select') or {}).get('name', '').strip()
         parsed = [s.lower() for s in _parse_compound_subtag(raw_se_subtag)]
         if nl not in parsed:
@@ -225,7 +211,7 @@ def build_field_from_selected_entries(selected: List[Dict]) -> str:
 def _entries_for_subject_page(
     subject_page: Dict,
     se_id_index: Dict[str, Dict],   # id → page dict for the SE/AR database
-    all_se_pages: List[Dict],       # flat list, for fallback scan
+    se_by_subject: Dict[str, List[Dict]],   # Subject id → SE/AR pages, for fallback
     relation_prop: str,             # "Synced Extra" or "Synced Additional Resources"
     raw_subtag: str,                # from the Anki tag, used only in fallback
 ) -> List[Dict]:
@@ -256,7 +242,7 @@ def _entries_for_subject_page(
     # ── Fallback: scan by subject ID + subtag ────────────────────────────────
     page_id   = subject_page.get('id', '').replace('-', '')
     nl        = _normalised_subtag_label(raw_subtag)
-    for page in _fallback_se_pages(all_se_pages, page_id, nl):
+    for page in _fallback_se_pages(se_by_subject, page_id, nl):
         entry = _page_to_entry(page)
         if entry:
             entries.append(entry)
@@ -283,11 +269,11 @@ def get_matching_se_entries(
     if not subject_tags:
         return []
 
-    se_pages = _load_db_cache(notion_cache, database_id)
-    if not se_pages:
+    se_id_index = _index(notion_cache, database_id, BY_ID)
+    if not se_id_index:
         return []
+    se_by_subject = _index(notion_cache, database_id, SE_BY_SUBJECT_INDEX, _se_by_subject)
 
-    se_id_index   = _build_id_index(se_pages)
     seen_se_ids   = set()
     seen_page_names = set()
     results       = []
@@ -307,7 +293,7 @@ def get_matching_se_entries(
             continue
 
         for entry in _entries_for_subject_page(
-            subject_page, se_id_index, se_pages,
+            subject_page, se_id_index, se_by_subject,
             SUBJECTS_SE_RELATION_PROP, raw_subtag
         ):
             se_id = entry['se_id']
@@ -339,12 +325,12 @@ def _build_synced_content(
     if not subject_tags:
         return ""
 
-    se_pages = _load_db_cache(notion_cache, database_id)
-    if not se_pages:
+    se_id_index = _index(notion_cache, database_id, BY_ID)
+    if not se_id_index:
         print(f"[ExtraSync] {label} cache is empty — run 'Update Database Cache'")
         return ""
+    se_by_subject = _index(notion_cache, database_id, SE_BY_SUBJECT_INDEX, _se_by_subject)
 
-    se_id_index     = _build_id_index(se_pages)
     seen_se_ids     = set()
     seen_content    = set()
     seen_page_names = set()
@@ -365,7 +351,7 @@ def _build_synced_content(
             continue
 
         for entry in _entries_for_subject_page(
-            subject_page, se_id_index, se_pages,
+            subject_page, se_id_index, se_by_subject,
             relation_prop, raw_subtag
         ):
             se_id   = entry['se_id']
@@ -0,0 +1,81 @@
+"""
+Resumable pagination for long Notion fetches.
+
+A paginated fetch appends each page of results, with the cursor for the next
+one, to a checkpoint file as it goes.  If the fetch dies part-way (retries
+exhausted, CI job retry, Anki closed), the next attempt at the *same* query
+loads the pages so far and carries on from the last good cursor instead of
+starting over.  The checkpoint is deleted when the fetch completes, so callers
+still see all-or-nothing results and only ever write complete caches.
+
+Format: JSON lines of {"cursor": next_cursor, "pages": [...]}, appended — a
+write costs one batch, not the whole accumulated list.  A torn last line (crash
+mid-write) is ignored, which just re-fetches that batch.  Checkpoints older than
+MAX_AGE are discarded rather than resumed (the cursor may have expired and the
+database moved on).
+
+    cp = FetchCheckpoint(directory, database_id, filter_, prop_ids)
+    pages, cursor = cp.load()
+    ... per batch: cp.append(batch, next_cursor) ...
+    cp.discard()
+
+With directory=None every method is a no-op (nothing persisted).
+
+Dependency-free (no aqt); safe to import in CI and inside Anki.
+"""
+import hashlib
+import json
+import time
+from pathlib import Path
+
+MAX_AGE = 6 * 3600
+
+
+class FetchCheckpoint:
+    def __init__(self, directory, *query):
+        """`query` — everything that identifies the fetch (database id, filter,
+        property selection …); a checkpoint only resumes the identical query."""
+        self.path = None
+        if directory is not None:
+            digest = hashlib.sha1(json.dumps(query, sort_keys=True, default=str)
+                                  .encode("utf-8")).hexdigest()[:20]
+            self.path = Path(directory) / f"fetch_{digest}.jsonl"
+
+    def load(self):
+        """(pages, cursor) saved by an earlier attempt, or ([], None)."""
+        if self.path is None or not self.path.exists():
+            return [], None
+        try:
+            if time.time() - self.path.stat().st_mtime > MAX_AGE:
+                self.discard()
+                return [], None
+            pages, cursor = [], None
+            with self.path.open("r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        break          # torn final write
+                    pages.extend(entry["pages"])
+                    cursor = entry["cursor"]
+            return (pages, cursor) if cursor else ([], None)
+        except OSError:
+            return [], None
+
+    def append(self, pages: list, cursor: str):
+        if self.path is None:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open("a", encoding="utf-8") as f:
+                f.write(json.dumps({"cursor": cursor, "pages": pages}) + "\n")
+        except OSError as e:
+            print(f"Could not write fetch checkpoint {self.path}: {e}")
+
+    def discard(self):
+        if self.path is None:
+            return
+        try:
+            self.path.unlink()
+        except OSError:
+            pass
@@ -0,0 +1,173 @@
+"""
+Stage-level profiling for the locally-generated databases.
+
+`cache_generation.generate_from_pages` can fill in a GenerationProfile while the
+generators (subjects_tags / pharmacology_tags / guidelines_tags) run: page and
+path counts, the widest multi-parent fan-out, the deepest path, cycles in the
+`Parent item` graph, the time spent in each generation stage and the peak size
+of the big intermediate structures (id index, cross-ref lookups, memo tables).
+
+The generators take a profile argument that defaults to NULL_PROFILE, whose
+methods are no-ops, so an unprofiled build pays only a few empty `with` blocks
+per page.
+
+Stages (seconds, summed over every page):
+    graph_build         id index + cross-ref lookups + output-set selection
+    path_enumeration    root-to-leaf paths → base hierarchy tags
+    search_terms        Search Term / Suffix / Prefix (and Guidelines Source)
+    cross_refs          Rotation / Question Bank (eMedici) resolution
+    property_injection  writing the formula-shaped properties into each page
+
+A profile serialises to one JSON object (as_dict / write_jsonl) so CI and the
+add-on can append it to a JSONL log and compare slow runs after the fact.
+
+Dependency-free (no aqt); safe to import in CI and inside Anki.
+"""
+import json
+import os
+import time
+from contextlib import contextmanager, nullcontext
+
+try:  # standalone (CI) vs add-on package context
+    from hierarchy_tags import parent_ids, _norm_id
+except ImportError:
+    from .hierarchy_tags import parent_ids, _norm_id
+
+STAGES = ("graph_build", "path_enumeration", "search_terms",
+          "cross_refs", "property_injection")
+
+
+class GenerationProfile:
+    """Collects counters, stage timings and peak sizes for one generation run."""
+    enabled = True
+
+    def __init__(self, kind: str):
+        self.kind = kind
+        self.started = time.time()
+        self.stages = {name: 0.0 for name in STAGES}
+        self.counts = {}
+        self.peaks = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + (time.perf_counter() - t0)
+
+    def count(self, name: str, n: int = 1):
+        self.counts[name] = self.counts.get(name, 0) + n
+
+    def peak(self, name: str, size: int):
+        if size > self.peaks.get(name, 0):
+            self.peaks[name] = size
+
+    def record_paths(self, paths: list):
+        """Account one output page's root-to-leaf paths."""
+        self.count("paths", len(paths))
+        self.peak("max_paths_per_page", len(paths))
+        if paths:
+            self.peak("max_depth", max(len(p) for p in paths))
+
+    def record_graph(self, pages: list, index: dict):
+        """Fan-out and cycle statistics for the `Parent item` graph.  Only run
+        when profiling (it walks the whole graph once more)."""
+        t0 = time.perf_counter()
+        fan_out = 0
+        parents_of = {}
+        for p in pages:
+            pid = _norm_id(p["id"])
+            resolved = []
+            for raw in parent_ids(p):
+                parent = index.get(raw) or index.get(_norm_id(raw))
+                if parent is not None:
+                    resolved.append(_norm_id(parent["id"]))
+            parents_of[pid] = resolved
+            fan_out = max(fan_out, len(resolved))
+        self.peak("max_fan_out", fan_out)
+        self.counts["cycles"] = _count_back_edges(parents_of)
+        self.stages["graph_stats"] = time.perf_counter() - t0
+
+    def as_dict(self) -> dict:
+        return {
+            "kind": self.kind,
+            "started": self.started,
+            "generation_s": round(sum(v for k, v in self.stages.items() if k in STAGES), 4),
+            "stages_s": {k: round(v, 4) for k, v in self.stages.items()},
+            "counts": dict(self.counts),
+            "peaks": dict(self.peaks),
+        }
+
+    def summary(self) -> str:
+        """One line for console / CI logs."""
+        d = self.as_dict()
+        stages = ", ".join(f"{k} {v:.2f}s" for k, v in d["stages_s"].items() if v)
+        counts = ", ".join(f"{k}={v}" for k, v in {**d["counts"], **d["peaks"]}.items())
+        return f"[profile {self.kind}] generation {d['generation_s']:.2f}s ({stages}) {counts}"
+
+    def write_jsonl(self, path, max_bytes: int = None, **extra):
+        """Append this profile as one JSON line.  With `max_bytes`, a log that
+        has grown past the cap is started afresh rather than growing forever."""
+        record = self.as_dict()
+        record.update(extra)
+        mode = "a"
+        if max_bytes:
+            try:
+                if os.path.getsize(path) > max_bytes:
+                    mode = "w"
+            except OSError:
+                pass
+        with open(path, mode, encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+
+
+class _NullProfile:
+    """Stand-in used when nobody asked for a profile — every call is a no-op."""
+    enabled = False
+    _null_stage = nullcontext()
+
+    def stage(self, name):
+        return self._null_stage
+
+    def count(self, name, n=1):
+        pass
+
+    def peak(self, name, size):
+        pass
+
+    def record_paths(self, paths):
+        pass
+
+    def record_graph(self, pages, index):
+        pass
+
+
+NULL_PROFILE = _NullProfile()
+
+
+def _count_back_edges(parents_of: dict) -> int:
+    """Number of `Parent item` edges that close a cycle (iterative DFS, so deep
+    hierarchies can't hit the recursion limit)."""
+    WHITE, GREY, BLACK = 0, 1, 2
+    colour = dict.fromkeys(parents_of, WHITE)
+    cycles = 0
+    for root in parents_of:
+        if colour[root] != WHITE:
+            continue
+        colour[root] = GREY
+        stack = [(root, iter(parents_of[root]))]
+        while stack:
+            node, it = stack[-1]
+            nxt = next(it, None)
+            if nxt is None:
+                colour[node] = BLACK
+                stack.pop()
+                continue
+            state = colour.get(nxt, BLACK)
+            if state == GREY:
+                cycles += 1
+            elif state == WHITE:
+                colour[nxt] = GREY
+                stack.append((nxt, iter(parents_of[nxt])))
+    return cycles
@@ -20,12 +20,18 @@ import datetime
 try:  # standalone (CI) vs add-on package context
     from hierarchy_tags import (build_index, enumerate_paths, page_name,
                                 tags_for_page, GUIDELINES_PREFIX_SEGMENTS)
+    from generation_profile import NULL_PROFILE
 except ImportError:
     from .hierarchy_tags import (build_index, enumerate_paths, page_name,
                                  tags_for_page, GUIDELINES_PREFIX_SEGMENTS)
+    from .generation_profile import NULL_PROFILE
 
 PREFIX = GUIDELINES_PREFIX_SEGMENTS   # ['#Malleus_CM', '#Guidelines']
 
+# Every property generate_and_inject writes (left out of fetches, see
+# subjects_tags.GENERATED_PROPERTIES).
+GENERATED_PROPERTIES = ("Tag", "Search Term", "Search Suffix", "Source")
+
 
 # ── accessors ────────────────────────────────────────────────────────────────
 def _rich(p, k):
@@ -128,16 +134,33 @@ def _accessed_today() -> str:
 
 
 # ── main entry point ─────────────────────────────────────────────────────────
-def generate_and_inject(all_pages: list) -> list:
-    index = build_index(all_pages)
-    accessed = _accessed_today()
-    leaves = [p for p in all_pages if for_search(p)]
-
+def generate_and_inject(all_pages: list, profile=NULL_PROFILE) -> list:
+    with profile.stage("graph_build"):
+        index = build_index(all_pages)
+        accessed = _accessed_today()
+        leaves = [p for p in all_pages if for_search(p)]
+    if profile.enabled:
+        profile.record_graph(all_pages, index)
+        profile.peak("index", len(index))
+
+    out_pages = []
     for page in leaves:
-        props = page.setdefault("properties", {})
-        props["Tag"] = _formula_prop(" ".join(tags_for_page(page, index, PREFIX)))
-        props["Search Term"] = _formula_prop(search_term(page, index))
-        props["Search Suffix"] = _formula_prop(search_suffix(page, index))
-        props["Source"] = _formula_prop(source(page, index, accessed))
-
-    return leaves
+        with profile.stage("path_enumeration"):
+            tag = " ".join(tags_for_page(page, index, PREFIX))
+        if profile.enabled:     # statistics only — timed apart from the real work
+            with profile.stage("path_stats"):
+                profile.record_paths(enumerate_paths(page, index))
+        with profile.stage("search_terms"):
+            term = search_term(page, index)
+            suffix = search_suffix(page, index)
+            src = source(page, index, accessed)
+
+        with profile.stage("property_injection"):
+            props = dict(page.get("properties", {}))
+            out_pages.append({**page, "properties": props})
+            props["Tag"] = _formula_prop(tag)
+            props["Search Term"] = _formula_prop(term)
+            props["Search Suffix"] = _formula_prop(suffix)
+            props["Source"] = _formula_prop(src)
+
+    return out_pages
@@ -2,26 +2,138 @@
 Notion Cache Management
 Handles caching of Notion database content with GitHub fallback
 """
+import itertools
 import json
 import os
+import re
 import time
 import threading
 import requests
+from functools import lru_cache
 from pathlib import Path
 from typing import List, Dict, Tuple
 from datetime import datetime
 from aqt import mw
 from .utils import malleus_tooltip
-from .config import NOTION_TOKEN, get_database_name, GENERATED_DATABASES, FOR_SEARCH_DATABASES
+from .config import (NOTION_TOKEN, get_database_name, DATABASES, GENERATED_DATABASES,
+                     FOR_SEARCH_DATABASES)
+from .shared_fetch import SharedFetchRegistry
+from .sync_state import SyncState
+from .page_store import PageStore
+from .seed_download import SeedDownloader, IntegrityError
+from .connectivity import CircuitBreaker, GITHUB, NOTION
+from .task_executor import TaskExecutor, Cancelled, bind
+from .warmup import Warmup, estimate_bytes
+from .recents import RecentsStore
+from .snapshots import SnapshotRegistry
+from .derived_indexes import IndexRegistry
+from .request_scheduler import SCHEDULER, PRIORITY_BACKGROUND, current_priority, with_priority
+
+# ── Search vocabulary ────────────────────────────────────────────────────────
+# filter_pages matches a query term against every variation of every word of a
+# page's Search Term.  Expanding those variations is the expensive part, and it
+# only depends on the page, so it is done once per cache snapshot: the
+# SEARCH_INDEX derived index maps page id → (page, (search term, vocabulary)).
+SEARCH_INDEX = "search_terms"
+
+# Executor key of the idle-time warm-up task (see NotionCache.warm_up).
+WARMUP_KEY = "_warmup"
+
+# Executor key prefix of the recent-pages writes — (RECENTS_KEY, n), unique per
+# write: the store coalesces writes itself, and a write must never join one
+# that has already finished writing (see recents.py) — and the most a page's
+# frecency adds to its search score: enough to order ties and near-ties,
+# never to lift a weak match over a good one.
+RECENTS_KEY = "_recents"
+RECENT_BOOST = 0.05
+
+MEDICAL_VARIATIONS = {
+    'paed': {'paediatric', 'paediatrics'},
+    'paeds': {'paediatric', 'paediatrics'},
+    'emergency': {'emergencies'},
+    'emergencies': {'emergency'},
+    'cardio': {'cardiac', 'cardiovascular'},
+    'cardiac': {'cardiovascular'},
+    'cardiology': {'cardio', 'cardiac', 'cardiovascular'},
+    'gastro': {'gastrointestinal', 'gastroenterology'},
+    'neuro': {'neurological', 'neurology'},
+    'rheum': {'rheumatology', 'rheumatological'},
+    'haem': {'haematology', 'haematological'},
+    'onc': {'oncology', 'oncological'},
+    'endo': {'endocrinology', 'endocrinological'},
+    'pulm': {'pulmonary', 'respiratory'},
+    'resp': {'respiratory', 'pulmonary'},
+    'gyn': {'gynecology', 'gynaecology'},
+    'gynae': {'gynecology', 'gynaecology'},
+    'obs': {'obstetrics', 'obstetrical'},
+    'obgyn': {'obstetrics', 'obstetrical'},
+    'psych': {'psychiatry'},
+    'surg': {'surgical', 'surgery'},
+    'pall': {'palliative'},
+    'uro': {'urological', 'urology'}
+}
+
+
+@lru_cache(maxsize=8192)
+def _normalize_text(text: str) -> frozenset:
+    words = re.sub(r'[^\w\s]', ' ', text.lower()).split()
+    normalized = set()
+
+    for word in words:
+        normalized.add(word)
+
+        if word.endswith('y'):
+            normalized.add(word[:-1] + 'ies')
+        elif word.endswith('s') and not word.endswith('ss'):
+            normalized.add(word[:-1])
+
+        for key, variations in MEDICAL_VARIATIONS.items():
+            if word == key or word in variations:
+                normalized.update(variations)
+                normalized.add(key)
+
+    return frozenset(normalized)
+
+
+def _search_entry(page: Dict):
+    """(lower-cased Search Term, every variation of its words) for a
+    searchable page, else None."""
+    if not page.get('properties'):
+        return None
+    prop = page['properties'].get('Search Term', {})
+    if not prop or prop.get('type') != 'formula':
+        return None
+    search_term = prop.get('formula', {}).get('string', '').lower()
+    if not search_term:
+        return None
+    vocabulary = set()
+    for word in _normalize_text(search_term):
+        vocabulary.update(_normalize_text(word))
+    return search_term, tuple(sorted(vocabulary))
+
+
+def _build_search_index(pages) -> dict:
+    index = {}
+    for page in pages:
+        entry = _search_entry(page)
+        if entry is not None:
+            index[page.get('id')] = (page, entry)
+    return index
+
 
 class NotionCache:
     """Handles caching of Notion database content"""
     CACHE_VERSION = 1
-    # How old a generated DB's local raw graph may get before a normal-click
-    # refresh does a *full* rebuild instead of incremental (to purge deleted/
-    # archived pages).  Decoupled from cache_expiry so a short expiry doesn't
-    # turn every click into a slow rebuild.
-    GENERATED_GRAPH_MAX_AGE = 7 * 24 * 60 * 60
+    # "Edited since" queries can't report deleted/archived pages, so at most
+    # this often a refresh also runs an id-only membership scan of the database
+    # (cache_generation.fetch_live_ids) and drops cached pages that are gone —
+    # instead of a full rebuild / seed re-download once the graph got old.
+    MEMBERSHIP_SCAN_INTERVAL = 24 * 60 * 60
+    # Cross-ref databases (Question Banks, Rotation) feed more than one generated
+    # DB.  Within a refresh cycle each is fetched once and shared by every
+    # generated DB (see begin_refresh_cycle); the age cap covers refreshes that
+    # aren't part of a cycle, e.g. the startup check of a single database.
+    SHARED_FETCH_MAX_AGE = 10 * 60
 
     def __init__(self, addon_dir: str, config: dict):
         self.addon_dir = Path(addon_dir)
@@ -31,29 +143,58 @@ class NotionCache:
         # database update after upgrading stays on the fast incremental path.
         self.cache_dir = self.addon_dir / "user_files" / "cache"
         self.cache_dir.mkdir(parents=True, exist_ok=True)
-        self._migrate_legacy_cache()
+        # Data-source ids / property schemas survive restarts, so a fetch
+        # doesn't start with a GET to rediscover them.
+        from . import cache_generation
+        self.sync_state = SyncState(self.cache_dir / "_sync_state.json")
+        cache_generation.use_sync_state(self.sync_state)
+        # An interrupted fetch (network drop, Anki closed mid-sync) resumes from
+        # its last page on the next update instead of starting over.
+        cache_generation.use_checkpoint_dir(self.cache_dir / "_checkpoints")
+        # Offline, the first failed Notion request opens the breaker and the
+        # rest of the update fails fast instead of each retrying.
+        SCHEDULER.use_breaker(NOTION)
         self.cache_lock = threading.Lock()
-        self._sync_thread = None
+        # What searches read: one immutable snapshot per database, swapped by
+        # writers after each write (see snapshots.py) — loaded once, not per
+        # keystroke, and never mutated under a running search.
+        self.snapshots = SnapshotRegistry(lambda database_id: self._cache_store(database_id).load())
+        # Lookups derived from those snapshots (id → page, title → page, …),
+        # shared by every dialog and job and rebuilt only when the database's
+        # snapshot changes (see derived_indexes.py).
+        self.indexes = IndexRegistry(self.snapshots)
         # Stale-cache warning is shown at most once per session (typing in the
         # search box loads every database and would otherwise fire it repeatedly).
         self._expiry_warning_shown = False
-        # Per-database guard so the startup check and a manual 'Update Database'
-        # click can't run the same update concurrently.
-        self._inflight_lock = threading.Lock()
-        self._updates_in_progress = set()
-        self.headers = {
-            "Authorization": f"Bearer {NOTION_TOKEN}",
-            "Notion-Version": "2022-06-28",
-            "Content-Type": "application/json"
-        }
+        # Every update runs on this executor, keyed by database: the startup
+        # check and a manual 'Update Database' click coalesce instead of racing,
+        # the click's priority wins, and closing the profile cancels the lot.
+        self.executor = TaskExecutor(max_workers=3, dispatch=mw.taskman.run_on_main)
+        # Pages picked in the page selector: small id records written off the
+        # UI thread, resolved against the snapshots when shown, and ranked by
+        # frecency — which also nudges search results (see recents.py).
+        self._recents_writes = itertools.count()
+        self.recents = RecentsStore(
+            self.addon_dir / "user_files" / "recent_tags.json",
+            legacy_path=self.addon_dir / "recent_tags.json",
+            database_ids={name: db_id for db_id, name in DATABASES},
+            schedule=lambda write: self.executor.submit(
+                (RECENTS_KEY, next(self._recents_writes)), write,
+                priority=PRIORITY_BACKGROUND, label="Recent pages"))
+        self._shared_fetches = SharedFetchRegistry(max_age=self.SHARED_FETCH_MAX_AGE)
         self.config = config
         self.CACHE_EXPIRY = config['cache_expiry'] * 24 * 60 * 60 + 1 * 60 * 60
         self.REQUEST_TIMEOUT = config.get('request_timeout', 30)  # Use config value
         self.github_repo = "Sabicool/Malleus-Anki-Addon"
         self.github_branch = "main"
+        # Every GitHub request (manifest, deltas, seeds) shares one pooled
+        # keep-alive session; seeds download concurrently on its bounded pool.
+        self.downloader = SeedDownloader(timeout=self.REQUEST_TIMEOUT, breaker=GITHUB)
+        self._github_meta_lock = threading.Lock()
 
-    def _migrate_legacy_cache(self):
+    def migrate_legacy_cache(self):
         """One-time migration from the pre-user_files layout (<addon>/cache/).
+        Run by the deferred startup check, off the main thread.
 
         Copies (never moves) any cache file the new location doesn't have yet:
         copying is idempotent, and in a development checkout the old cache/ is
@@ -79,6 +220,12 @@ class NotionCache:
         """Get the path for a specific database's cache file"""
         return self.cache_dir / f"{database_id}.json"
 
+    # Caches, raw graphs and cross-ref caches are page stores (page_store.py):
+    # the JSON file as before plus a journal, so an incremental refresh writes
+    # only the pages it changed.  Always read them through the store.
+    def _cache_store(self, database_id: str) -> PageStore:
+        return PageStore(self.get_cache_path(database_id))
+
     @staticmethod
     def _atomic_write_json(path: Path, obj):
         """Write JSON via a temp file + os.replace so a crash/force-quit mid-write
@@ -88,37 +235,43 @@ class NotionCache:
             json.dump(obj, f)
         os.replace(tmp, path)
 
-    def _begin_update(self, database_id: str) -> bool:
-        """Claim a database for updating.  False if an update is already running."""
-        with self._inflight_lock:
-            if database_id in self._updates_in_progress:
-                return False
-            self._updates_in_progress.add(database_id)
-            return True
-
-    def _end_update(self, database_id: str):
-        with self._inflight_lock:
-            self._updates_in_progress.discard(database_id)
-
-    def is_online(self) -> bool:
-        """Check if internet connection is available"""
-        try:
-            requests.head("https://www.google.com", timeout=3)
-            return True
-        except (requests.ConnectionError, requests.Timeout, Exception):
-            return False
+    def is_online(self, endpoint: CircuitBreaker = NOTION) -> bool:
+        """Whether `endpoint` (connectivity.NOTION / GITHUB) is worth trying.
+        Free: answered from the outcomes of earlier requests, never a probe —
+        a request that finds the network down opens the endpoint's breaker."""
+        return endpoint.available()
+
+    def snapshot(self, database_id: str):
+        """The database's current read-only Snapshot, or None without a cache."""
+        return self.snapshots.get(database_id)
+
+    def index(self, database_id: str, name: str, builder=None):
+        """A named derived index over the database's current snapshot ({}
+        without a cache) — see derived_indexes.py.  Shared: don't modify it."""
+        return self.indexes.get(database_id, name, builder)
+
+    def _publish_snapshot(self, database_id: str, doc: dict = None):
+        """After writing a search cache: make what was written (re-read from
+        the store when `doc` isn't at hand) the current snapshot.  Runs on the
+        writer's thread."""
+        if doc is None:
+            doc = self._cache_store(database_id).load()
+        if doc is None:
+            self.snapshots.invalidate(database_id)
+        else:
+            self.snapshots.publish(database_id, doc)
 
     def load_from_cache(self, database_id: str, warn_if_expired: bool = True) -> Tuple[List[Dict], float]:
         """Load cached data if it exists, even if expired (for offline use).
-        Returns ([], 0.0) when there is no usable cache file (missing/corrupt)."""
-        cache_path = self.get_cache_path(database_id)
-        if not cache_path.exists():
+        Returns ([], 0.0) when there is no usable cache file (missing/corrupt).
+        The pages are the current snapshot's — shared, so treat them as
+        read-only (copy a page before annotating it)."""
+        snapshot = self.snapshots.get(database_id)
+        if snapshot is None:
             return [], 0.0
+        cache_data = snapshot.meta
 
         try:
-            with cache_path.open('r', encoding='utf-8') as f:
-                cache_data = json.load(f)
-
             current_time = time.time()
             cache_timestamp = float(cache_data.get('timestamp', current_time))
 
@@ -136,62 +289,64 @@ class NotionCache:
                 )
 
             # Return cached data even if expired (better than crashing)
-            return cache_data.get('pages', []), cache_timestamp
+            return list(snapshot.pages), cache_timestamp
 
         except Exception as e:
             print(f"Error loading cache: {e}")
             return [], 0.0
 
-    def save_to_cache(self, database_id: str, pages: List[Dict]):
-        """Save pages to cache file and update timestamp"""
-        cache_path = self.get_cache_path(database_id)
-        current_time = time.time()
-
-        try:
-            # Try to load existing cache data
-            with cache_path.open('r', encoding='utf-8') as f:
-                cache_data = json.load(f)
-                existing_pages = cache_data.get('pages', [])
-        except (FileNotFoundError, json.JSONDecodeError):
+    def save_to_cache(self, database_id: str, pages: List[Dict], live_ids: set = None):
+        """Save pages to cache file and update timestamp.  With `live_ids` (a
+        membership scan), cached pages not in it are dropped.  Only the changed
+        pages are written (see page_store.py)."""
+        store = self._cache_store(database_id)
+        cache_data = store.load()
+        new_file = cache_data is None   # missing or corrupt
+        if new_file:
             cache_data = {
                 'version': self.CACHE_VERSION,
                 'pages': []
             }
-            existing_pages = []
-
-        # Always update the timestamp
-        cache_data['timestamp'] = current_time
+        existing_dict = {page['id']: page for page in cache_data.get('pages', [])}
 
-        # Only merge pages if there are new ones
-        if pages:
-            existing_dict = {page['id']: page for page in existing_pages}
-            # The incremental Notion sync returns pages WITHOUT block content;
-            # keep the seed's embedded _block_html (Synced Extra) rather than
-            # losing it — the daily GitHub seed refresh will bring it current.
-            for page in pages:
-                old = existing_dict.get(page['id'])
-                if old and '_block_html' in old and '_block_html' not in page:
-                    page['_block_html'] = old['_block_html']
-            new_dict = {page['id']: page for page in pages}
-            merged_dict = {**existing_dict, **new_dict}
-            cache_data['pages'] = list(merged_dict.values())
-
-        # Save with lock
+        # The incremental Notion sync returns pages WITHOUT block content;
+        # keep the seed's embedded _block_html (Synced Extra) rather than
+        # losing it — the daily GitHub seed refresh will bring it current.
+        for page in pages:
+            old = existing_dict.get(page['id'])
+            if old and '_block_html' in old and '_block_html' not in page:
+                page['_block_html'] = old['_block_html']
+        deleted = []
+        if live_ids is not None:
+            deleted = [page_id for page_id in existing_dict if page_id not in live_ids]
+
+        # Save with lock (always updating the timestamp).  The snapshot gets
+        # the merged pages in the order replaying the store would give.
         with self.cache_lock:
-            self._atomic_write_json(cache_path, cache_data)
+            timestamp = time.time()
+            if new_file:
+                store.replace({**cache_data, 'timestamp': timestamp, 'pages': pages})
+                merged = pages
+            else:
+                store.apply(upserts=pages, deletes=deleted, timestamp=timestamp)
+                for page in pages:
+                    existing_dict[page['id']] = page
+                for page_id in deleted:
+                    del existing_dict[page_id]
+                merged = list(existing_dict.values())
+            self._publish_snapshot(database_id, {**cache_data, 'timestamp': timestamp,
+                                                 'pages': merged})
 
     def is_cache_expired(self, database_id: str) -> bool:
         """Check if cache is expired (time-based, plus generator-version mismatch
         for locally-generated databases so an add-on update that changes the tag
         logic forces a regeneration)."""
-        cache_path = self.get_cache_path(database_id)
-        if not cache_path.exists():
+        snapshot = self.snapshots.get(database_id)
+        if snapshot is None:
             return True
+        cache_data = snapshot.meta
 
         try:
-            with cache_path.open('r', encoding='utf-8') as f:
-                cache_data = json.load(f)
-
             if database_id in GENERATED_DATABASES:
                 from . import cache_generation
                 if cache_data.get('generator_version') != cache_generation.GENERATOR_VERSION:
@@ -206,14 +361,19 @@ class NotionCache:
             return True
 
     def update_cache_async(self, database_id: str, force: bool = False,
-                           callback: callable = None, full: bool = False):
+                           callback: callable = None, full: bool = False,
+                           priority: int = PRIORITY_BACKGROUND):
         """Update cache asynchronously with optional callback.
 
         ``full=True`` forces a complete rebuild directly from Notion (Shift+click
         on 'Update Database'): for locally-generated DBs this fetches the whole
         graph and regenerates the tags; for ordinary DBs it re-fetches every page.
         Without it, generated DBs are served from the committed GitHub seed (kept
-        fresh by the daily CI build) and ordinary DBs do an incremental sync."""
+        fresh by the daily CI build) and ordinary DBs do an incremental sync.
+
+        ``priority`` is the request-scheduler priority of the update's Notion
+        requests: PRIORITY_INTERACTIVE when the user is waiting on it, so it
+        overtakes any background check sharing the token."""
         database_name = get_database_name(database_id)
 
         if not force and not self.is_cache_expired(database_id):
@@ -221,19 +381,6 @@ class NotionCache:
                 callback()
             return
 
-        # One update per database at a time — the startup check and a manual
-        # 'Update Database' click would otherwise race each other.
-        # (Offline detection happens inside the worker threads, never here:
-        # this method may be called from the main thread.)
-        if not self._begin_update(database_id):
-            print(f"{database_name} update already in progress — skipping")
-            mw.taskman.run_on_main(
-                lambda: malleus_tooltip(f"{database_name} update already in progress")
-            )
-            if callback:
-                mw.taskman.run_on_main(callback)
-            return
-
         # Locally-generated databases.  full=True (Shift+click) → unconditional full
         # regenerate.  Otherwise a "smart" refresh: regenerate from Notion only if
         # something changed since the cache timestamp, else keep the current cache.
@@ -241,72 +388,101 @@ class NotionCache:
         # tags, which depend on the whole graph).
         if database_id in GENERATED_DATABASES:
             if full:
-                self._regenerate_generated_db(database_id, database_name, callback)
+                work = lambda: self._regenerate_generated_db(database_id, database_name)
             else:
-                self._incremental_refresh_generated_db(database_id, database_name, callback)
-            return
-
-        if force:
+                work = lambda: self._incremental_refresh_generated_db(database_id, database_name)
+        elif force:
             # Direct update from Notion (incremental, or full re-fetch when full=True)
-            self._update_cache_thread(database_id, database_name, callback, full=full)
+            work = lambda: self._sync_database(database_id, database_name, full=full)
         else:
             # Download from GitHub
-            def download_thread():
-                try:
-                    success = self.download_all_caches_from_github()
-                    if not success:
-                        print(f"Failed to download cache from GitHub for {database_name}")
-                except Exception as e:
-                    print(f"Error during GitHub cache download: {e}")
-                finally:
-                    self._end_update(database_id)
-                    if callback:
-                        mw.taskman.run_on_main(callback)
-
-            self._sync_thread = threading.Thread(target=download_thread, daemon=True)
-            self._sync_thread.start()
-
-    def _update_cache_thread(self, database_id: str, database_name: str,
-                             callback: callable = None, full: bool = False):
-        """Internal method to update cache in a thread.  ``full=True`` ignores the
-        last-sync timestamp and re-fetches every page from Notion."""
-        def sync_thread():
-            try:
-                # Check online status
-                if not self.is_online():
-                    print(f"Offline: Cannot update {database_name}")
-                    if callback:
-                        mw.taskman.run_on_main(callback)
-                    return
+            work = lambda: self._download_for(database_name)
+
+        # One update per database at a time: a request for a database already
+        # queued or updating joins that update (and its callback fires when it
+        # ends); a full rebuild replaces a queued lighter one.
+        task = self.executor.submit(database_id, work, priority=priority, label=database_name,
+                                    callback=callback, supersede=full)
+        if task.started_at is not None:
+            print(f"{database_name} update already in progress — joined it")
+
+    def tasks(self) -> list:
+        """Queued and running database updates — and the warm-up, keyed
+        WARMUP_KEY (see TaskExecutor.tasks)."""
+        return self.executor.tasks()
+
+    def warm_up(self, budget_mb: float, extra_steps=()):
+        """Once startup has settled: load every cache's snapshot and build its
+        search index in the background, then run `extra_steps` ((label, fn)
+        pairs, e.g. the suggestion index), within `budget_mb` — so the first
+        search is as fast as the later ones (see warmup.py)."""
+        warmup = Warmup(budget_mb)
+        for database_id, name in DATABASES:
+            if not database_id:
+                continue
+            warmup.add(f"{name} cache", lambda db=database_id: self._warm_snapshot(db))
+            warmup.add(f"{name} search index", lambda db=database_id: estimate_bytes(
+                [entry for _, entry in self.index(db, SEARCH_INDEX, _build_search_index).values()]))
+        for label, fn in extra_steps:
+            warmup.add(label, fn)
+        self.executor.submit(WARMUP_KEY, warmup.run, priority=PRIORITY_BACKGROUND,
+                             label="Warm-up")
+
+    def _warm_snapshot(self, database_id: str) -> int:
+        snapshot = self.snapshots.get(database_id)
+        return estimate_bytes(snapshot.pages) if snapshot is not None else 0
+
+    def cancel_updates(self):
+        """Stop all queued and running updates (profile closing): running ones
+        stop before their next Notion request, keeping the existing caches."""
+        self.executor.cancel_all()
+        self.recents.flush()     # a cancelled queued write would be lost
+
+    def _download_for(self, database_name: str):
+        try:
+            success = self.download_all_caches_from_github()
+            if not success:
+                print(f"Failed to download cache from GitHub for {database_name}")
+        except Exception as e:
+            print(f"Error during GitHub cache download: {e}")
 
-                cached_pages, last_sync_timestamp = self.load_from_cache(database_id, warn_if_expired=False)
-                if full:
-                    last_sync_timestamp = 0
-                pages = self.fetch_updated_pages(database_id, last_sync_timestamp)
-                
-                if pages:
-                    self.save_to_cache(database_id, pages)
-                    mw.taskman.run_on_main(lambda: malleus_tooltip(f"{database_name} database updated"))
-                
-                if callback:
-                    mw.taskman.run_on_main(callback)
-                    
-            except requests.exceptions.RequestException as e:
-                print(f"Network error during {database_name} sync: {e}")
-                mw.taskman.run_on_main(
-                    lambda: malleus_tooltip(f"Offline: Using cached {database_name} data")
-                )
-                if callback:
-                    mw.taskman.run_on_main(callback)
-            except Exception as e:
-                print(f"Error during {database_name} sync: {e}")
-                if callback:
-                    mw.taskman.run_on_main(callback)
-            finally:
-                self._end_update(database_id)
-
-        self._sync_thread = threading.Thread(target=sync_thread, daemon=True)
-        self._sync_thread.start()
+    def _sync_database(self, database_id: str, database_name: str, full: bool = False):
+        """Sync an ordinary database from Notion (an executor task).
+        ``full=True`` ignores the last-sync timestamp and re-fetches every page."""
+        try:
+            # Check online status
+            if not self.is_online():
+                print(f"Offline: Cannot update {database_name}")
+                return
+
+            cached_pages, last_sync_timestamp = self.load_from_cache(database_id, warn_if_expired=False)
+            if full:
+                last_sync_timestamp = 0
+            watermark = self.sync_state.get(database_id, 'watermark', 0)
+            pages = self._drop_refetched(
+                self.fetch_updated_pages(database_id, last_sync_timestamp),
+                cached_pages, watermark)
+            live_ids = self._live_ids_if_due(database_id, database_id in FOR_SEARCH_DATABASES)
+            dropped = live_ids is not None and any(
+                p['id'] not in live_ids for p in cached_pages)
+
+            if pages or dropped:
+                self.save_to_cache(database_id, pages, live_ids if dropped else None)
+                mw.taskman.run_on_main(lambda: malleus_tooltip(f"{database_name} database updated"))
+            else:
+                # Nothing new: record the check so the cache stops counting as
+                # expired, without rewriting it (see the generated-DB refresh).
+                self._mark_verified(database_id)
+
+        except Cancelled:
+            print(f"{database_name} sync cancelled")
+        except requests.exceptions.RequestException as e:
+            print(f"Network error during {database_name} sync: {e}")
+            mw.taskman.run_on_main(
+                lambda: malleus_tooltip(f"Offline: Using cached {database_name} data")
+            )
+        except Exception as e:
+            print(f"Error during {database_name} sync: {e}")
 
     # ── Locally-generated databases ──────────────────────────────────────────
     #
@@ -318,10 +494,11 @@ class NotionCache:
     # tags) and Rotation (rotation tags) — in cache/_xref_<id>.json.
     #
     # A normal refresh fetches only pages edited since the last sync, merges them
-    # into the stored graph, and re-runs generation in memory (fast).  A full
-    # rebuild (Shift+click, first run, or a graph older than the expiry window)
-    # refetches everything — that's also what drops deleted/archived pages, which
-    # a "last_edited_time >= X" query can't report.
+    # into the stored graph, and re-runs generation in memory (fast).  Deleted/
+    # archived pages, which a "last_edited_time >= X" query can't report, are
+    # dropped by a daily id-only membership scan (MEMBERSHIP_SCAN_INTERVAL).  A
+    # full rebuild (Shift+click, or first run without a GitHub seed) refetches
+    # everything.
 
     @staticmethod
     def _iso(ts: float) -> str:
@@ -344,77 +521,134 @@ class NotionCache:
         """Write the generated leaves (seed-shaped) and stamp the generator
         version.  The raw graph lives separately (see _write_raw_graph)."""
         from . import cache_generation
-        cache_data = {
-            'version': self.CACHE_VERSION,
-            'generator_version': cache_generation.GENERATOR_VERSION,
-            'timestamp': time.time(),
-            'pages': pages,
-        }
         with self.cache_lock:
-            self._atomic_write_json(self.get_cache_path(database_id), cache_data)
+            store = self._cache_store(database_id)
+            store.save(pages, version=self.CACHE_VERSION,
+                       generator_version=cache_generation.GENERATOR_VERSION,
+                       timestamp=time.time())
+            self._publish_snapshot(database_id)
 
     def _write_raw_graph(self, database_id: str, raw_pages: List[Dict]):
         with self.cache_lock:
-            self._atomic_write_json(self._raw_graph_path(database_id),
-                                    {'timestamp': time.time(), 'pages': raw_pages})
+            PageStore(self._raw_graph_path(database_id)).save(raw_pages, timestamp=time.time())
 
-    def _load_raw_graph(self, database_id: str):
-        """(raw_pages, timestamp) for a generated DB's local graph, or ([], 0)."""
-        path = self._raw_graph_path(database_id)
-        if not path.exists():
+    @staticmethod
+    def _load_pages(path: Path):
+        """(pages, timestamp) of a page store, or ([], 0) if none."""
+        data = PageStore(path).load()
+        if data is None:
             return [], 0.0
         try:
-            with path.open('r', encoding='utf-8') as f:
-                data = json.load(f)
             return data.get('pages', []), float(data.get('timestamp', 0))
         except Exception:
             return [], 0.0
 
+    def _load_raw_graph(self, database_id: str):
+        """(raw_pages, timestamp) for a generated DB's local graph, or ([], 0)."""
+        return self._load_pages(self._raw_graph_path(database_id))
+
     def _load_xref(self, db_id: str):
         """(pages, timestamp) for a cross-ref raw cache, or ([], 0) if none."""
-        path = self._xref_path(db_id)
-        if not path.exists():
-            return [], 0.0
-        try:
-            with path.open('r', encoding='utf-8') as f:
-                data = json.load(f)
-            return data.get('pages', []), float(data.get('timestamp', 0))
-        except Exception:
-            return [], 0.0
+        return self._load_pages(self._xref_path(db_id))
 
     def _write_xref(self, db_id: str, pages: List[Dict]):
         with self.cache_lock:
-            self._atomic_write_json(self._xref_path(db_id),
-                                    {'timestamp': time.time(), 'pages': pages})
+            PageStore(self._xref_path(db_id)).save(pages, timestamp=time.time())
+
+    def _live_ids_if_due(self, db_id: str, for_search: bool = False):
+        """The database's live page ids (see MEMBERSHIP_SCAN_INTERVAL), or None
+        when it was scanned recently.  Run *after* the edited-pages fetch, so
+        every page that fetch returned is either in the result or really gone.
 
-    def _refresh_xref(self, db_id: str):
+        Timed per scan kind: the Rotation DB has both a search cache (For
+        Search pages) and a cross-ref cache (every page), and each needs its
+        own scan."""
+        from . import cache_generation
+        stamp = f"members_checked_at:{'search' if for_search else 'all'}"
+        if time.time() - self.sync_state.get(db_id, stamp, 0) < self.MEMBERSHIP_SCAN_INTERVAL:
+            return None
+        live_ids = cache_generation.fetch_live_ids(db_id, NOTION_TOKEN, for_search=for_search)
+        self.sync_state.update(db_id, **{stamp: time.time()})
+        return live_ids
+
+    @staticmethod
+    def _drop_vanished(pages: List[Dict], live_ids) -> List[Dict]:
+        if live_ids is None:
+            return pages
+        return [p for p in pages if p['id'] in live_ids]
+
+    def _refresh_xref(self, db_id: str, role: str):
         """Bring a cross-ref raw cache up to date.  Returns (pages, changed).
         First time (no cache) it full-fetches a baseline and reports changed=False
-        (the seed leaves already reflect the build-time cross-ref state)."""
+        (the seed leaves already reflect the build-time cross-ref state).
+        `role` ('qb' / 'rotation') picks the properties fetched."""
         from . import cache_generation
+        props = cache_generation.CROSSREF_PROPERTIES[role]
         pages, ts = self._load_xref(db_id)
         if not pages:
-            pages = cache_generation.fetch_all_pages(db_id, NOTION_TOKEN)
+            pages = cache_generation.fetch_all_pages(db_id, NOTION_TOKEN, properties=props)
             self._write_xref(db_id, pages)
             return pages, False
-        edited = cache_generation.fetch_edited_since(db_id, NOTION_TOKEN, self._iso(ts))
-        if edited:
-            pages = self._merge_by_id(pages, edited)
-            self._write_xref(db_id, pages)
-        return pages, bool(edited)
+        edited = cache_generation.fetch_edited_since(db_id, NOTION_TOKEN, self._iso(ts),
+                                                     properties=props)
+        merged = self._merge_by_id(pages, edited)
+        kept = self._drop_vanished(merged, self._live_ids_if_due(db_id))
+        changed = bool(edited) or len(kept) < len(merged)
+        if changed:
+            self._write_xref(db_id, kept)
+        return kept, changed
+
+    def _shared_xref(self, db_id: str, role: str):
+        """_refresh_xref, run at most once per refresh cycle per cross-ref DB —
+        concurrent and later callers in the cycle get the same (pages, changed),
+        so every generated DB sees a cross-ref change, not just the first."""
+        return self._shared_fetches.get(('xref', db_id), lambda: self._refresh_xref(db_id, role))
 
     def _crossref_pages_for(self, cfg: dict):
-        """(qb_pages, rotation_pages, changed) — incrementally refreshed."""
+        """(qb_pages, rotation_pages, changed) — incrementally refreshed.
+        The page lists are shared between generated DBs: read-only."""
         changed = False
         qb_pages = rotation_pages = None
         if cfg.get('qb'):
-            qb_pages, c = self._refresh_xref(cfg['qb'])
+            qb_pages, c = self._shared_xref(cfg['qb'], 'qb')
             changed = changed or c
         if cfg.get('rotation'):
-            rotation_pages, c = self._refresh_xref(cfg['rotation'])
+            rotation_pages, c = self._shared_xref(cfg['rotation'], 'rotation')
             changed = changed or c
         return qb_pages, rotation_pages, changed
 
+    def begin_refresh_cycle(self):
+        """Start a new update cycle: forget the cross-ref fetches shared by the
+        previous one so this cycle sees current Notion data."""
+        self._shared_fetches.clear()
+
+    # With the `profile_generation` config flag on, generation profiles (stage
+    # timings, graph stats) of runtime rebuilds are appended here so a slow
+    # refresh on a user's machine can be diagnosed from the file rather than
+    # guessed at.  Off by default: the statistics cost time on every refresh.
+    # Capped: restarted once past the limit.
+    PROFILE_LOG_MAX_BYTES = 256 * 1024
+
+    def _profile_log_path(self) -> Path:
+        return self.cache_dir / "_generation_profile.jsonl"
+
+    def _generation_profile(self, kind: str):
+        from .generation_profile import GenerationProfile, NULL_PROFILE
+        if self.config.get('profile_generation', False):
+            return GenerationProfile(kind)
+        return NULL_PROFILE
+
+    def _log_generation_profile(self, profile, database_name: str, mode: str):
+        if not profile.enabled:
+            return
+        print(f"{database_name}: {profile.summary()}")
+        try:
+            profile.write_jsonl(self._profile_log_path(),
+                                max_bytes=self.PROFILE_LOG_MAX_BYTES,
+                                database=database_name, mode=mode)
+        except OSError as e:
+            print(f"Could not write generation profile: {e}")
+
     def _regenerate_generated_db_work(self, database_id: str, database_name: str):
         """Full rebuild: fetch the whole DB + cross-refs from Notion, regenerate,
         and store leaves + raw graph + cross-ref baselines.  Raises on failure
@@ -422,16 +656,30 @@ class NotionCache:
         import concurrent.futures
         cfg = GENERATED_DATABASES[database_id]
         from . import cache_generation
-        with concurrent.futures.ThreadPoolExecutor(max_workers=3) as ex:
-            main_f = ex.submit(cache_generation.fetch_all_pages, database_id, NOTION_TOKEN)
-            qb_f = ex.submit(cache_generation.fetch_all_pages, cfg['qb'], NOTION_TOKEN) if cfg.get('qb') else None
-            rot_f = ex.submit(cache_generation.fetch_all_pages, cfg['rotation'], NOTION_TOKEN) if cfg.get('rotation') else None
-            main_pages = main_f.result()
-            qb_pages = qb_f.result() if qb_f else None
-            rotation_pages = rot_f.result() if rot_f else None
+        profile = self._generation_profile(cfg['kind'])
+        def fetch_shared(db_id, role):
+            return self._shared_fetches.get(
+                ('all', db_id), lambda: cache_generation.fetch_all_pages(
+                    db_id, NOTION_TOKEN, **cache_generation.fetch_properties(cfg['kind'], role)))
+
+        # Pool threads don't inherit this task's request priority or cancel
+        # token — pass them on.
+        priority = current_priority()
+        fetch_all = bind(with_priority(priority, cache_generation.fetch_all_pages))
+        fetch_shared = bind(with_priority(priority, fetch_shared))
+        with profile.stage('fetch'):
+            with concurrent.futures.ThreadPoolExecutor(max_workers=3) as ex:
+                main_f = ex.submit(fetch_all, database_id, NOTION_TOKEN,
+                                   **cache_generation.fetch_properties(cfg['kind'], 'main'))
+                qb_f = ex.submit(fetch_shared, cfg['qb'], 'qb') if cfg.get('qb') else None
+                rot_f = ex.submit(fetch_shared, cfg['rotation'], 'rotation') if cfg.get('rotation') else None
+                main_pages = main_f.result()
+                qb_pages = qb_f.result() if qb_f else None
+                rotation_pages = rot_f.result() if rot_f else None
         pages = cache_generation.generate_from_pages(
-            cfg['kind'], main_pages, qb_pages, rotation_pages
+            cfg['kind'], main_pages, qb_pages, rotation_pages, profile=profile
         )
+        self._log_generation_profile(profile, database_name, 'full')
         if pages:
             self._write_generated_cache(database_id, pages)
             self._write_raw_graph(database_id, main_pages)
@@ -443,266 +691,175 @@ class NotionCache:
                 lambda: malleus_tooltip(f"{database_name} database updated")
             )
 
-    def _regenerate_generated_db(self, database_id: str, database_name: str,
-                                 callback: callable = None):
-        """Full rebuild from Notion (Shift+click / fallback)."""
-        def worker():
-            try:
-                if not self.is_online():
-                    print(f"Offline: keeping cached {database_name}")
-                    return
-                self._regenerate_generated_db_work(database_id, database_name)
-            except Exception as e:
-                # Never wipe — keep whatever is cached.
-                print(f"Error regenerating {database_name}; keeping existing cache: {e}")
-            finally:
-                self._end_update(database_id)
-                if callback:
-                    mw.taskman.run_on_main(callback)
-
-        self._sync_thread = threading.Thread(target=worker, daemon=True)
-        self._sync_thread.start()
-
-    def _incremental_refresh_generated_db(self, database_id: str, database_name: str,
-                                          callback: callable = None):
-        """Normal-click refresh: fetch only pages edited since the cache timestamp
-        (main DB + cross-refs), merge into the stored raw graph, and regenerate in
-        memory.  When no usable raw graph is stored (first run after an add-on
-        update wipes the addon dir, or a stale graph), the daily-rebuilt GitHub
-        seed is downloaded instead — a full runtime rebuild from Notion is the
-        last resort (slow, and hard on the shared token)."""
+    def _regenerate_generated_db(self, database_id: str, database_name: str):
+        """Full rebuild from Notion (Shift+click / fallback; an executor task)."""
+        try:
+            if not self.is_online():
+                print(f"Offline: keeping cached {database_name}")
+                return
+            self._regenerate_generated_db_work(database_id, database_name)
+        except Cancelled:
+            print(f"{database_name} rebuild cancelled; keeping existing cache")
+        except Exception as e:
+            # Never wipe — keep whatever is cached.
+            print(f"Error regenerating {database_name}; keeping existing cache: {e}")
+
+    def _incremental_refresh_generated_db(self, database_id: str, database_name: str):
+        """Normal-click refresh (an executor task): fetch only pages edited since
+        the cache timestamp (main DB + cross-refs), merge into the stored raw
+        graph, drop pages a membership scan finds deleted (when due), and
+        regenerate in memory.  When no raw graph is stored (first run after an
+        add-on update wipes the addon dir), the daily-rebuilt GitHub seed is
+        downloaded instead — a full runtime rebuild from Notion is the last
+        resort (slow, and hard on the shared token)."""
         cfg = GENERATED_DATABASES[database_id]
-
-        def worker():
-            try:
-                if not self.is_online():
-                    print(f"Offline: keeping cached {database_name}")
-                    return
-                from . import cache_generation
-                raw_pages, ts = self._load_raw_graph(database_id)
-                graph_stale = bool(raw_pages) and (time.time() - ts) > self.GENERATED_GRAPH_MAX_AGE
-                # No stored graph (first run after add-on update) or a stale one
-                # (needs deleted/archived pages purged, which incremental can't do).
-                if not raw_pages or graph_stale:
-                    reason = "no raw graph cached" if not raw_pages else "raw graph stale"
-                    # Prefer the GitHub seed: the daily CI build regenerates it
-                    # from the full graph, so it is at most ~24h old and the
-                    # ETag-conditional download is nearly free.
-                    if self.download_cache_from_github(database_id):
-                        print(f"{database_name}: {reason} — refreshed from GitHub seed")
-                        if graph_stale:
-                            # Drop the stale graph so we don't merge edits into
-                            # a snapshot that still contains deleted pages.
-                            try:
-                                self._raw_graph_path(database_id).unlink()
-                            except OSError:
-                                pass
-                        return
-                    print(f"{database_name}: {reason}, GitHub unavailable — full rebuild")
-                    self._regenerate_generated_db_work(database_id, database_name)
+        try:
+            if not self.is_online():
+                print(f"Offline: keeping cached {database_name}")
+                return
+            from . import cache_generation
+            raw_pages, ts = self._load_raw_graph(database_id)
+            # No stored graph (first run after add-on update): nothing to
+            # merge edits into.
+            if not raw_pages:
+                # Prefer the GitHub seed: the daily CI build regenerates it
+                # from the full graph, so it is at most ~24h old and the
+                # ETag-conditional download is nearly free.
+                if self.download_cache_from_github(database_id):
+                    print(f"{database_name}: no raw graph cached — refreshed from GitHub seed")
                     return
+                print(f"{database_name}: no raw graph cached, GitHub unavailable — full rebuild")
+                self._regenerate_generated_db_work(database_id, database_name)
+                return
 
+            profile = self._generation_profile(cfg['kind'])
+            with profile.stage('fetch'):
                 edited_main = cache_generation.fetch_edited_since(
-                    database_id, NOTION_TOKEN, self._iso(ts))
+                    database_id, NOTION_TOKEN, self._iso(ts),
+                    **cache_generation.fetch_properties(cfg['kind'], 'main'))
                 qb_pages, rotation_pages, xref_changed = self._crossref_pages_for(cfg)
+                merged = self._merge_by_id(raw_pages, edited_main)
+                graph = self._drop_vanished(merged, self._live_ids_if_due(database_id))
+            removed = len(merged) - len(graph)
+
+            if not edited_main and not removed and not xref_changed:
+                print(f"{database_name}: no edits since cache — up to date")
+                # Record the successful freshness check so the cache stops
+                # counting as expired (otherwise the user keeps seeing the
+                # "Newer database version available" warning after updating).
+                self._mark_verified(database_id)
+                return
 
-                if not edited_main and not xref_changed:
-                    print(f"{database_name}: no edits since cache — up to date")
-                    # Record the successful freshness check so the cache stops
-                    # counting as expired (otherwise the user keeps seeing the
-                    # "Newer database version available" warning after updating).
-                    self._mark_verified(database_id)
-                    return
+            print(f"{database_name}: {len(edited_main)} edited page(s)"
+                  f"{f', {removed} deleted' if removed else ''}"
+                  f"{' + cross-ref changes' if xref_changed else ''} — regenerating in memory")
+            pages = cache_generation.generate_from_pages(
+                cfg['kind'], graph, qb_pages, rotation_pages, profile=profile)
+            self._log_generation_profile(profile, database_name, 'incremental')
+            if pages:
+                self._write_generated_cache(database_id, pages)
+                self._write_raw_graph(database_id, graph)
+                mw.taskman.run_on_main(
+                    lambda: malleus_tooltip(f"{database_name} database updated"))
+        except Cancelled:
+            print(f"{database_name} refresh cancelled; keeping existing cache")
+        except Exception as e:
+            print(f"Error refreshing {database_name}; keeping existing cache: {e}")
 
-                graph = self._merge_by_id(raw_pages, edited_main)
-                print(f"{database_name}: {len(edited_main)} edited page(s)"
-                      f"{' + cross-ref changes' if xref_changed else ''} — regenerating in memory")
-                pages = cache_generation.generate_from_pages(
-                    cfg['kind'], graph, qb_pages, rotation_pages)
-                if pages:
-                    self._write_generated_cache(database_id, pages)
-                    self._write_raw_graph(database_id, graph)
-                    mw.taskman.run_on_main(
-                        lambda: malleus_tooltip(f"{database_name} database updated"))
-            except Exception as e:
-                print(f"Error refreshing {database_name}; keeping existing cache: {e}")
-            finally:
-                self._end_update(database_id)
-                if callback:
-                    mw.taskman.run_on_main(callback)
-
-        self._sync_thread = threading.Thread(target=worker, daemon=True)
-        self._sync_thread.start()
-
-    def _build_query_payload(
-        self, last_sync_date: str, use_for_search_filter: bool, start_cursor: str = None
-    ) -> dict:
-        """Build the Notion database query payload."""
-        if use_for_search_filter:
-            payload = {
-                "filter": {
-                    "and": [
-                        {
-                            "property": "For Search",
-                            "formula": {"checkbox": {"equals": True}}
-                        },
-                        {
-                            "timestamp": "last_edited_time",
-                            "last_edited_time": {"on_or_after": last_sync_date}
-                        }
-                    ]
-                },
-                "page_size": 100
-            }
-        else:
-            payload = {
-                "filter": {
-                    "timestamp": "last_edited_time",
-                    "last_edited_time": {"on_or_after": last_sync_date}
-                },
-                "page_size": 100
-            }
-        if start_cursor:
-            payload["start_cursor"] = start_cursor
-        return payload
+    # Incremental syncs of ordinary databases ask for pages edited on/after a
+    # per-database watermark — the newest last_edited_time seen so far, kept in
+    # the sync state — rather than midnight of the last sync day.  It is Notion's
+    # clock, so local clock skew doesn't matter; the overlap covers Notion
+    # rounding last_edited_time to the minute and edits saved while a sync was in
+    # flight (re-fetched pages that have not changed are dropped before saving —
+    # see _drop_refetched).
+    WATERMARK_OVERLAP = 5 * 60
+
+    @staticmethod
+    def _edited_ts(page: Dict) -> float:
+        try:
+            return datetime.fromisoformat(page['last_edited_time'].replace('Z', '+00:00')).timestamp()
+        except (KeyError, AttributeError, ValueError):
+            return 0.0
+
+    @classmethod
+    def _drop_refetched(cls, pages: List[Dict], cached_pages: List[Dict],
+                        watermark: float) -> List[Dict]:
+        """`pages` without those the overlap merely fetched again: edited at or
+        before `watermark` and the same as the cached copy (ignoring the
+        seed-only _block_html).  The query always returns at least the
+        watermark page itself, so without this every sync would look like an
+        update."""
+        cached = {p['id']: p for p in cached_pages}
+
+        def refetched(page):
+            old = cached.get(page['id'])
+            if old is None or cls._edited_ts(page) > watermark:
+                return False
+            return {k: v for k, v in old.items() if k != '_block_html'} == \
+                {k: v for k, v in page.items() if k != '_block_html'}
+        return [p for p in pages if not refetched(p)]
 
     def fetch_updated_pages(self, database_id: str, last_sync_timestamp: float) -> List[Dict]:
         """
-        Fetch all pages from a Notion database updated since last_sync_timestamp.
+        Fetch all pages from a Notion database updated since last_sync_timestamp
+        (or since the database's watermark, if older — see WATERMARK_OVERLAP).
 
         Tries with the "For Search" formula filter first (used by main content
         databases).  If the database returns a 400 (e.g. Synced Extra /
         Additional Resources which lack that property), automatically retries
-        with only the last_edited_time filter.
+        with only the last_edited_time filter (see
+        cache_generation.fetch_updated_pages).
         """
-        pages = []
-        has_more = True
-        start_cursor = None
+        from . import cache_generation
         # Only attempt the "For Search" filter on databases that have that property
-        # (others would 400); the 400 fallback below remains as a safety net.
+        # (others would 400); the 400 fallback remains as a safety net.
         use_for_search_filter = database_id in FOR_SEARCH_DATABASES
 
         if last_sync_timestamp <= 0:
-            last_sync_timestamp = time.time() - self.CACHE_EXPIRY
-
-        last_sync_date = datetime.fromtimestamp(last_sync_timestamp).strftime('%Y-%m-%d')
-
-        while has_more:
-            payload = self._build_query_payload(
-                last_sync_date, use_for_search_filter, start_cursor
-            )
-
-            try:
-                response = requests.post(
-                    f"https://api.notion.com/v1/databases/{database_id}/query",
-                    headers=self.headers,
-                    json=payload,
-                    timeout=self.REQUEST_TIMEOUT
-                )
-
-                # If the "For Search" property doesn't exist on this database,
-                # Notion returns 400.  Retry without that filter.
-                if response.status_code == 400 and use_for_search_filter:
-                    print(
-                        f"Database {database_id} returned 400 with 'For Search' filter — "
-                        f"retrying without it (database may not have that property)"
-                    )
-                    use_for_search_filter = False
-                    start_cursor = None   # reset pagination for the retry
-                    pages = []
-                    continue
-
-                response.raise_for_status()
-                data = response.json()
-
-                pages.extend(data['results'])
-                has_more = data.get('has_more', False)
-                start_cursor = data.get('next_cursor')
-
-            except Exception as e:
-                # Propagate instead of returning a partial list: saving partial
-                # results would stamp the cache "fresh as of now" and the pages
-                # never fetched would be skipped by every future incremental
-                # sync (until a GitHub seed download happens to overwrite them).
-                print(f"Error fetching from Notion after {len(pages)} pages: "
-                      f"{type(e).__name__}: {e}")
-                raise
-
-        print(f"Found {len(pages)} updated pages")
+            since = time.time() - self.CACHE_EXPIRY
+        else:
+            # The watermark only describes the cache it was recorded against: if
+            # that was replaced by an older one (a downloaded seed), fall back to
+            # the cache's own timestamp so nothing edited in between is skipped.
+            since = min(last_sync_timestamp,
+                        self.sync_state.get(database_id, 'watermark', last_sync_timestamp))
+            since -= self.WATERMARK_OVERLAP
+
+        pages = cache_generation.fetch_updated_pages(
+            database_id, NOTION_TOKEN, self._iso(since),
+            use_for_search=use_for_search_filter, timeout=self.REQUEST_TIMEOUT)
+        print(f"Found {len(pages)} updated pages since {self._iso(since)}")
+        if pages:
+            newest = max(self._edited_ts(p) for p in pages)
+            if newest > self.sync_state.get(database_id, 'watermark', 0):
+                self.sync_state.update(database_id, watermark=newest)
         return pages
 
-    def filter_pages(self, pages: List[Dict], search_term: str) -> List[Dict]:
-        """Filter pages based on search term using fuzzy matching with multi-tier sorting"""
+    def filter_pages(self, pages: List[Dict], search_term: str,
+                     database_id: str = None) -> List[Dict]:
+        """Filter pages based on search term using fuzzy matching with multi-tier
+        sorting.  Returns lightweight hits — shallow copies of the matching
+        pages carrying `_composite_score` / `_title` / `_exact_match` — so the
+        (snapshot) pages searched are never modified.
+
+        With the pages' `database_id`, each page's expanded search vocabulary
+        comes from that database's search index (built once per snapshot, see
+        SEARCH_INDEX) instead of being re-derived on every keystroke, and pages
+        the user picks often get a small frecency boost (RECENT_BOOST)."""
         from difflib import SequenceMatcher
         import re
-        from functools import lru_cache
 
         if len(search_term.replace(' ', '')) < 3:
             return []
 
-        MEDICAL_VARIATIONS = {
-            'paed': {'paediatric', 'paediatrics'},
-            'paeds': {'paediatric', 'paediatrics'},
-            'emergency': {'emergencies'},
-            'emergencies': {'emergency'},
-            'cardio': {'cardiac', 'cardiovascular'},
-            'cardiac': {'cardiovascular'},
-            'cardiology': {'cardio', 'cardiac', 'cardiovascular'},
-            'gastro': {'gastrointestinal', 'gastroenterology'},
-            'neuro': {'neurological', 'neurology'},
-            'rheum': {'rheumatology', 'rheumatological'},
-            'haem': {'haematology', 'haematological'},
-            'onc': {'oncology', 'oncological'},
-            'endo': {'endocrinology', 'endocrinological'},
-            'pulm': {'pulmonary', 'respiratory'},
-            'resp': {'respiratory', 'pulmonary'},
-            'gyn': {'gynecology', 'gynaecology'},
-            'gynae': {'gynecology', 'gynaecology'},
-            'obs': {'obstetrics', 'obstetrical'},
-            'obgyn': {'obstetrics', 'obstetrical'},
-            'psych': {'psychiatry'},
-            'surg': {'surgical', 'surgery'},
-            'pall': {'palliative'},
-            'uro': {'urological', 'urology'}
-        }
-
-        @lru_cache(maxsize=1000)
-        def normalize_text(text: str) -> set:
-            words = re.sub(r'[^\w\s]', ' ', text.lower()).split()
-            normalized = set()
-            
-            for word in words:
-                normalized.add(word)
-                normalized.add(word.lower())
-
-                if word.endswith('y'):
-                    normalized.add(word[:-1] + 'ies')
-                elif word.endswith('s') and not word.endswith('ss'):
-                    normalized.add(word[:-1])
-
-                for key, variations in MEDICAL_VARIATIONS.items():
-                    if word.lower() == key or word.lower() in variations:
-                        normalized.update(variations)
-                        normalized.add(key)
-
-            return normalized
-
-        def page_matches_all_terms(page_words: list, search_terms: set) -> bool:
-            for search_term in search_terms:
-                term_matched = False
-                for page_word in page_words:
-                    page_variations = normalize_text(page_word)
-                    if any(var.startswith(search_term) for var in page_variations):
-                        term_matched = True
-                        break
-                if not term_matched:
-                    return False
-            return True
+        prepared = self.index(database_id, SEARCH_INDEX, _build_search_index) if database_id else {}
+        boosts = self.recents.boosts(database_id) if database_id else {}
 
-        # Normalise the query to mirror what normalize_text does to page words:
+        # Normalise the query to mirror what _normalize_text does to page words:
         #   • & is removed (not a word char, can never match any page token)
         #   • apostrophes become spaces so "Barrett's" → ["barrett", "s"],
-        #     matching the page-word split produced by normalize_text
+        #     matching the page-word split produced by _normalize_text
         #   • remaining punctuation is stripped per-token
         _query_lower = re.sub(r'\s*&\s*', ' ', search_term.lower())
         _query_lower = re.sub(r"['\u2019\u2018\u02bc]", ' ', _query_lower).strip()
@@ -712,20 +869,14 @@ class NotionCache:
 
         filtered_pages = []
         for page in pages:
-            if not page.get('properties'):
+            hit = prepared.get(page.get('id'))
+            entry = hit[1] if hit is not None and hit[0] is page else _search_entry(page)
+            if entry is None:
                 continue
+            page_search_term, vocabulary = entry
 
-            page_search_terms_prop = page['properties'].get('Search Term', {})
-            if not page_search_terms_prop or page_search_terms_prop.get('type') != 'formula':
-                continue
-
-            page_search_term = page_search_terms_prop.get('formula', {}).get('string', '').lower()
-            if not page_search_term:
-                continue
-
-            page_terms = normalize_text(page_search_term)
-
-            if page_matches_all_terms(page_terms, search_terms):
+            if all(any(word.startswith(term) for word in vocabulary)
+                   for term in search_terms):
                 title_prop = page['properties'].get('Name', {})
                 title = title_prop['title'][0]['text']['content'] if title_prop.get('title') else ""
                 title_lower = title.lower()
@@ -745,14 +896,14 @@ class NotionCache:
                     exact_match_score * 0.4 +
                     title_match_score * 0.3 +
                     term_freq_score * 0.2 +
-                    sequence_similarity * 0.1
+                    sequence_similarity * 0.1 +
+                    boosts.get(page.get('id'), 0.0) * RECENT_BOOST
                 )
 
-                page['_composite_score'] = composite_score
-                page['_title'] = title_lower
-                page['_exact_match'] = exact_match_score
-
-                filtered_pages.append(page)
+                filtered_pages.append({**page,
+                                       '_composite_score': composite_score,
+                                       '_title': title_lower,
+                                       '_exact_match': exact_match_score})
 
         filtered_pages.sort(
             key=lambda x: (
@@ -783,7 +934,7 @@ class NotionCache:
 
     def github_verified_at(self, database_id: str) -> float:
         """When this cache was last confirmed current (GitHub 200/304, or a
-        no-change Notion freshness check for a generated database)."""
+        no-change Notion freshness check)."""
         try:
             return float(self._load_github_meta().get(database_id, {}).get('verified', 0))
         except Exception:
@@ -792,45 +943,178 @@ class NotionCache:
     def _mark_verified(self, database_id: str):
         """Record that the cache was just confirmed current without rewriting
         the (potentially multi-MB) cache file itself."""
-        meta = self._load_github_meta()
-        entry = meta.get(database_id, {})
+        entry = self._load_github_meta().get(database_id, {})
+        self._store_github_entry(database_id, entry)
+
+    def _store_github_entry(self, database_id: str, entry: dict):
+        """Save one database's entry (stamped verified now).  Re-reads the file
+        under a lock so concurrent downloads don't drop each other's entries."""
         entry['verified'] = time.time()
-        meta[database_id] = entry
-        self._save_github_meta(meta)
+        with self._github_meta_lock:
+            meta = self._load_github_meta()
+            meta[database_id] = entry
+            self._save_github_meta(meta)
+
+    def _github_url(self, path: str) -> str:
+        return f"https://raw.githubusercontent.com/{self.github_repo}/{self.github_branch}/{path}"
+
+    # ── Seed manifest (cache/manifest.json, written by CI) ────────────────────
+    # Every seed's content hash, size, page count and delta chain in one file:
+    # one conditional GET tells which seeds changed, instead of a request per
+    # database.  The last copy (and its ETag) is kept in _manifest.json.
+    def _manifest_path(self) -> Path:
+        return self.cache_dir / "_manifest.json"
 
-    def download_cache_from_github(self, database_id: str) -> bool:
-        """Download a cache file from GitHub, conditionally.  Sends the stored
-        ETag so an unchanged file returns 304 (no transfer) — the daily re-check
-        is then nearly free and only changed seeds are actually downloaded.
+    def fetch_seed_manifest(self):
+        """The published seed manifest, or None when it can't be had (callers
+        then fall back to per-seed conditional requests)."""
+        from . import seed_delta
+        try:
+            with self._manifest_path().open('r', encoding='utf-8') as f:
+                stored = json.load(f)
+        except Exception:
+            stored = {}
+        headers = {}
+        if stored.get('etag') and stored.get('manifest'):
+            headers['If-None-Match'] = stored['etag']
+        try:
+            response = self.downloader.get(self._github_url(f"cache/{seed_delta.MANIFEST}"),
+                                           headers=headers)
+            if response.status_code == 304:
+                return stored['manifest']
+            response.raise_for_status()
+            manifest = response.json()
+        except (requests.exceptions.RequestException, ValueError) as e:
+            print(f"Seed manifest unavailable: {e}")
+            return None
+        try:
+            self._atomic_write_json(self._manifest_path(),
+                                    {'etag': response.headers.get('ETag', ''), 'manifest': manifest})
+        except OSError as e:
+            print(f"Could not save seed manifest: {e}")
+        return manifest
+
+    def seed_outdated(self, database_id: str, manifest) -> bool:
+        """Whether the manifest lists a different seed than the one installed —
+        exact, and free once the manifest is fetched.  False when the manifest
+        doesn't cover the database."""
+        seed = (manifest or {}).get('seeds', {}).get(database_id)
+        if not seed:
+            return False
+        installed = self._load_github_meta().get(database_id, {}).get('seed_hash')
+        return installed != seed.get('hash') or not self.get_cache_path(database_id).exists()
+
+    def _patch_from_github_deltas(self, database_id: str, entry: dict, index: dict = None) -> bool:
+        """Bring the local seed up to date with the delta chain CI publishes next
+        to it (seed_delta.py) instead of re-downloading the whole file.  `index`
+        — head hash + chain — comes from the manifest when there is one, else
+        from the per-database index.json.  True if the cache is now current —
+        patched, or the chain says it already was; False (caller downloads the
+        full seed) on a gap in the chain, a local seed that is no longer the one
+        its hash describes, or a mismatch."""
+        from . import seed_delta
+        local_hash = entry.get('seed_hash')
+        store = self._cache_store(database_id)
+        if not local_hash or not store.exists():
+            return False
+        base = f"cache/{seed_delta.DELTA_DIR}/{database_id}"
+        response = None
+        try:
+            if index is None:
+                headers = {'If-None-Match': entry['delta_etag']} if entry.get('delta_etag') else {}
+                response = self.downloader.get(self._github_url(f"{base}/index.json"),
+                                               headers=headers)
+                if response.status_code == 304:
+                    return True    # nothing published since we were last at the head
+                response.raise_for_status()
+                index = response.json()
+            chain = seed_delta.chain_from(index, local_hash)
+            if chain is None:
+                return False
+            if chain:
+                # Deltas patch the seed as downloaded: the page store's base.
+                # (Local Notion syncs since then live in its journal and are
+                # dropped, as a full download would.)
+                doc = store.load(base_only=True)
+                if doc is None or seed_delta.content_hash(doc) != local_hash:
+                    return False
+                transferred = 0
+                for link in chain:
+                    r = self.downloader.get(self._github_url(f"{base}/{link['file']}"))
+                    r.raise_for_status()
+                    transferred += len(r.content)
+                    doc = seed_delta.apply_delta(doc, r.json())
+                if seed_delta.content_hash(doc) != index.get('head'):
+                    print(f"Delta chain for {database_id} did not reproduce the seed — full download")
+                    return False
+                with self.cache_lock:
+                    store.replace(doc)
+                    self._publish_snapshot(database_id, doc)
+                entry['etag'] = ''   # the seed's ETag no longer describes our copy
+                print(f"Patched {database_id} with {len(chain)} delta(s) ({transferred} bytes)")
+        except (requests.exceptions.RequestException, ValueError, KeyError) as e:
+            print(f"Delta update of {database_id} unavailable ({e}) — full download")
+            return False
+        entry['seed_hash'] = index.get('head')
+        if response is not None:
+            entry['delta_etag'] = response.headers.get('ETag', '')
+        return True
+
+    def download_cache_from_github(self, database_id: str, manifest: dict = None,
+                                   progress=None) -> bool:
+        """Download a cache file from GitHub, conditionally.  With the seed
+        `manifest` (fetch_seed_manifest), a seed whose hash we already have costs
+        no request at all.  Otherwise tries the published delta chain first
+        (only the pages that changed), then sends the stored ETag so an
+        unchanged file returns 304 (no transfer).  A full download — compressed
+        when the manifest offers it — streams to a temp file, is checked against
+        the manifest's size / sha256 and only then replaces the cache.  `progress(n)` is called per chunk received.
         Returns True on success (downloaded OR already current), False on error."""
-        cache_filename = f"{database_id}.json"
-        url = f"https://raw.githubusercontent.com/{self.github_repo}/{self.github_branch}/cache/{cache_filename}"
+        from . import seed_codec, seed_delta
+        url = self._github_url(f"cache/{database_id}.json")
         cache_path = self.get_cache_path(database_id)
 
-        meta = self._load_github_meta()
-        entry = meta.get(database_id, {})
+        entry = self._load_github_meta().get(database_id, {})
+        seed = (manifest or {}).get('seeds', {}).get(database_id)
+        if seed and entry.get('seed_hash') == seed.get('hash') and cache_path.exists():
+            self._store_github_entry(database_id, entry)
+            return True
+        index = {'head': seed.get('hash'), 'deltas': seed.get('deltas', [])} if seed else None
+        if self._patch_from_github_deltas(database_id, entry, index):
+            self._store_github_entry(database_id, entry)
+            return True
+
         headers = {}
         # Only trust the stored ETag if we still have the file it described.
         if entry.get('etag') and cache_path.exists():
             headers['If-None-Match'] = entry['etag']
 
+        # The smallest copy of the seed we can decode; stored compressed, the
+        # page store decompresses it on load.
+        suffix, expected = self._seed_file(seed)
+        store = self._cache_store(database_id)
+        tmp = cache_path.with_name(f"{cache_path.name}.download")
         try:
-            response = requests.get(url, headers=headers, timeout=self.REQUEST_TIMEOUT)
-
-            if response.status_code == 304:
-                entry['verified'] = time.time()
-                meta[database_id] = entry
-                self._save_github_meta(meta)
+            result = self.downloader.fetch(
+                url + suffix, tmp, headers=headers, progress=progress,
+                expected_sha256=expected.get('sha256'),
+                expected_size=expected.get('size'))
+            if result.status == 304:
+                self._store_github_entry(database_id, entry)
                 return True
-
-            response.raise_for_status()
-            cache_data = response.json()
+            if seed:
+                seed_hash = seed.get('hash')
+            else:
+                # No manifest to vouch for the file: it must at least parse.
+                with seed_codec.open_text(tmp) as f:
+                    seed_hash = seed_delta.content_hash(json.load(f))
             with self.cache_lock:
-                self._atomic_write_json(cache_path, cache_data)
-            entry['etag'] = response.headers.get('ETag', '')
-            entry['verified'] = time.time()
-            meta[database_id] = entry
-            self._save_github_meta(meta)
+                store.install(tmp)
+                self._publish_snapshot(database_id)
+            entry['etag'] = result.etag
+            entry['seed_hash'] = seed_hash
+            entry.pop('delta_etag', None)
+            self._store_github_entry(database_id, entry)
             return True
         except requests.exceptions.Timeout:
             print(f"Timeout downloading cache from GitHub: {database_id} (waited {self.REQUEST_TIMEOUT}s)")
@@ -838,23 +1122,67 @@ class NotionCache:
         except requests.exceptions.ConnectionError:
             print(f"Connection error downloading cache from GitHub: {database_id}")
             return False
+        except IntegrityError as e:
+            print(f"Discarded corrupt download: {e}")
+            return False
         except Exception as e:
             print(f"Error downloading cache from GitHub: {e}")
             return False
+        finally:
+            try:
+                tmp.unlink()
+            except OSError:
+                pass
+
+    @staticmethod
+    def _seed_file(seed):
+        """(suffix, {size, sha256}) of the seed file to download for a manifest
+        entry: a compressed variant when there is one we can decode (see
+        seed_codec.py), else the plain JSON ('' suffix)."""
+        from . import seed_codec
+        if not seed:
+            return '', {}
+        suffix = seed_codec.preferred(seed.get('variants'))
+        if suffix:
+            return suffix, seed['variants'][suffix]
+        return '', seed
+
+    def download_caches_from_github(self, database_ids, manifest: dict = None,
+                                    progress=None) -> Dict[str, bool]:
+        """download_cache_from_github for several databases at once, on the
+        downloader's bounded pool.  `progress(done, total)` reports bytes across
+        all of them (total from the manifest's sizes of the seeds that will be
+        fetched in full; 0 when unknown).  Returns {database_id: success}."""
+        seeds = (manifest or {}).get('seeds', {})
+        meta = self._load_github_meta()
+        total = sum(self._seed_file(seeds[db])[1].get('size', 0) for db in database_ids
+                    if db in seeds and meta.get(db, {}).get('seed_hash') != seeds[db].get('hash'))
+        done = [0]
+        lock = threading.Lock()
+
+        def received(nbytes):
+            with lock:
+                done[0] += nbytes
+                current = done[0]
+            if progress:
+                progress(current, max(total, current))
+
+        results = self.downloader.map(
+            lambda db: self.download_cache_from_github(db, manifest, progress=received),
+            database_ids)
+        return {db: result is True for db, result in results.items()}
 
     def download_all_caches_from_github(self) -> bool:
         """Download all cache files from GitHub"""
         from .config import DATABASES
         
-        if not self.is_online():
+        if not self.is_online(GITHUB):
             print("Offline: Cannot download caches from GitHub")
             return False
 
-        success = True
-        for database_id, _ in DATABASES:
-            # Generated DBs are committed to GitHub by the daily CI build too, so
-            # they download like any other (full regenerate is Shift+click only).
-            if not self.download_cache_from_github(database_id):
-                success = False
-
-        return success
+        manifest = self.fetch_seed_manifest()
+        # Generated DBs are committed to GitHub by the daily CI build too, so
+        # they download like any other (full regenerate is Shift+click only).
+        results = self.download_caches_from_github(
+            [database_id for database_id, _ in DATABASES if database_id], manifest)
+        return all(results.values())
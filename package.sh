@@ -38,14 +38,29 @@ PY_MODULES=(
   notion_cache.py
   cache_generation.py
   cache_updater.py
+  connectivity.py
+  derived_indexes.py
   extra_sync.py
+  fetch_checkpoint.py
+  generation_profile.py
   guidelines_tags.py
   hierarchy_tags.py
+  page_store.py
   pharmacology_tags.py
+  recents.py
+  request_scheduler.py
+  seed_codec.py
+  seed_delta.py
+  seed_download.py
+  shared_fetch.py
+  snapshots.py
   subjects_tags.py
+  sync_state.py
   suggest_tags.py
   tag_utils.py
+  task_executor.py
   utils.py
+  warmup.py
 )
 DATA_FILES=(
   config.json          # Anki add-on default config
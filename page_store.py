@@ -0,0 +1,191 @@
+"""
+Page-keyed persistence for the add-on's local caches.
+
+A store is one document — a base JSON file shaped exactly like before
+(`{"timestamp": …, "pages": [...], …}`; a downloaded seed's may be gzip
+compressed, see seed_codec.py) — plus an append-only journal next to
+it (`<file>.journal`).  An incremental refresh appends one line with just the
+pages it upserted, the ids it deleted and any top-level fields it changed, so
+writing costs O(changed pages), not a re-serialisation of the whole cache.
+`load()` reads the base and replays the journal; once the journal grows past
+COMPACT_RATIO of the base it is folded back into a new base.
+
+Crash safety (at least that of a temp-file + os.replace write):
+  * the base is only ever replaced atomically;
+  * each journal line is one complete JSON entry, written with a single write;
+    a torn line (crash mid-append) is skipped on load, and the next append
+    starts on a fresh line;
+  * the journal's header line records the identity (inode, size, mtime) of the
+    base it extends.  Replacing the base (compaction, a downloaded seed) then
+    deleting the journal isn't atomic, but a journal left behind by a crash in
+    between no longer matches the new base and is ignored, never replayed onto
+    a document it wasn't written against.
+
+    store = PageStore(cache_dir / "<id>.json")
+    doc = store.load()                        # None if there is no base yet
+    store.save(pages, timestamp=time.time())  # diffed against the stored pages
+    store.apply(upserts=edited, deletes=gone, timestamp=time.time())
+    store.replace(doc)                        # whole document
+    store.install(store.temp_path())          # a file written elsewhere (a download)
+
+Callers serialise writes to one store themselves (NotionCache.cache_lock).
+
+Dependency-free (no aqt); safe to import in CI and inside Anki.
+"""
+import json
+import os
+from pathlib import Path
+
+try:  # standalone (CI) vs add-on package context
+    from seed_codec import text_stream
+except ImportError:
+    from .seed_codec import text_stream
+
+COMPACT_RATIO = 0.5
+
+
+def _signature(st) -> list:
+    return [st.st_ino, st.st_size, st.st_mtime_ns]
+
+
+class PageStore:
+    def __init__(self, path):
+        self.path = Path(path)
+        self.journal = self.path.with_name(self.path.name + ".journal")
+
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    # ── reading ──────────────────────────────────────────────────────────────
+    def load(self, base_only: bool = False):
+        """The document with the journal applied (just the base with
+        `base_only`), or None if there is no readable base."""
+        try:
+            with self.path.open("rb") as f:
+                signature = _signature(os.fstat(f.fileno()))
+                doc = json.load(text_stream(f))
+        except (OSError, ValueError, EOFError):     # EOFError: truncated gzip
+            return None
+        entries = [] if base_only else self._journal_entries(signature)
+        if entries:
+            pages = {p["id"]: p for p in doc.get("pages", [])}
+            for entry in entries:
+                for page_id in entry.get("delete", ()):
+                    pages.pop(page_id, None)
+                for page in entry.get("upsert", ()):
+                    pages[page["id"]] = page
+                doc.update(entry.get("meta", {}))
+            doc["pages"] = list(pages.values())
+        return doc
+
+    def _journal_entries(self, signature) -> list:
+        try:
+            with self.journal.open("r", encoding="utf-8") as f:
+                lines = f.read().splitlines()
+        except OSError:
+            return []
+        entries = []
+        for i, line in enumerate(lines):
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue           # torn append
+            if i == 0:
+                if entry.get("base") != signature:
+                    return []      # journal of a base that has since been replaced
+                continue
+            entries.append(entry)
+        return entries
+
+    # ── writing ──────────────────────────────────────────────────────────────
+    def replace(self, doc: dict):
+        """Write the whole document as the new base and drop the journal."""
+        tmp = self.temp_path()
+        with tmp.open("w", encoding="utf-8") as f:
+            json.dump(doc, f)
+        self.install(tmp)
+
+    def temp_path(self) -> Path:
+        """Where a new base is written before install()."""
+        return self.path.with_suffix(self.path.suffix + ".tmp")
+
+    def install(self, tmp):
+        """Move a complete document file (e.g. a streamed download) into place
+        as the new base and drop the journal."""
+        os.replace(tmp, self.path)
+        try:
+            self.journal.unlink()
+        except OSError:
+            pass
+
+    def apply(self, upserts=(), deletes=(), **meta):
+        """Record changed pages / deleted ids / top-level fields.  Needs an
+        existing base (see save)."""
+        entry = {}
+        if upserts:
+            entry["upsert"] = list(upserts)
+        if deletes:
+            entry["delete"] = list(deletes)
+        if meta:
+            entry["meta"] = meta
+        if not entry:
+            return
+        try:
+            base_size = self.path.stat().st_size
+            journal_size = self.journal.stat().st_size if self.journal.exists() else 0
+        except OSError:
+            base_size, journal_size = 0, 0
+        if journal_size > COMPACT_RATIO * base_size:
+            self.compact(entry)
+            return
+        self._append(entry)
+
+    def save(self, pages: list, **meta):
+        """Make the stored pages equal `pages` (in that order), writing only the
+        difference against what is stored.  Creates the base if missing."""
+        doc = self.load()
+        if doc is None:
+            self.replace({**meta, "pages": pages})
+            return
+        stored = {p["id"]: p for p in doc.get("pages", [])}
+        current = {p["id"] for p in pages}
+        upserts = [p for p in pages if stored.get(p["id"]) != p]
+        deletes = [page_id for page_id in stored if page_id not in current]
+        meta = {k: v for k, v in meta.items() if doc.get(k) != v}
+        # Replaying keeps stored pages in place and appends new ones; if that
+        # wouldn't reproduce the caller's order, write the document out whole.
+        replayed = [i for i in stored if i in current] + \
+                   [p["id"] for p in pages if p["id"] not in stored]
+        if replayed != [p["id"] for p in pages]:
+            self.replace({**doc, **meta, "pages": pages})
+            return
+        self.apply(upserts=upserts, deletes=deletes, **meta)
+
+    def compact(self, entry: dict = None):
+        """Fold the journal (and `entry`) into a new base."""
+        doc = self.load()
+        if doc is None:
+            return
+        if entry:
+            pages = {p["id"]: p for p in doc.get("pages", [])}
+            for page_id in entry.get("delete", ()):
+                pages.pop(page_id, None)
+            for page in entry.get("upsert", ()):
+                pages[page["id"]] = page
+            doc.update(entry.get("meta", {}))
+            doc["pages"] = list(pages.values())
+        self.replace(doc)
+
+    def _append(self, entry: dict):
+        with self.journal.open("ab") as f:
+            if f.tell() == 0:
+                header = {"base": _signature(self.path.stat())}
+                f.write((json.dumps(header) + "\n").encode("utf-8"))
+            else:
+                # A crash mid-append can leave a partial last line; start ours
+                # on a fresh one so only the torn entry is lost.
+                with self.journal.open("rb") as r:
+                    r.seek(-1, os.SEEK_END)
+                    if r.read(1) != b"\n":
+                        f.write(b"\n")
+            f.write((json.dumps(entry) + "\n").encode("utf-8"))
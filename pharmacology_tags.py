@@ -28,8 +28,10 @@ from typing import Dict, List
 
 try:  # standalone (CI) vs add-on package context
     from hierarchy_tags import build_index, enumerate_paths, page_name, _norm_id
+    from generation_profile import NULL_PROFILE
 except ImportError:
     from .hierarchy_tags import build_index, enumerate_paths, page_name, _norm_id
+    from .generation_profile import NULL_PROFILE
 
 PREFIX = ["#Malleus_CM", "#Pharmacology"]
 
@@ -40,6 +42,10 @@ SUBTAGS = ["Generic Names", "Mechanism of Action", "Indications",
 SUBTAG_SUFFIX = {name: f"{i:02d}_" + name.replace(" ", "_")
                  for i, name in enumerate(SUBTAGS, start=1)}
 
+# Every property generate_and_inject writes (left out of fetches, see
+# subjects_tags.GENERATED_PROPERTIES).
+GENERATED_PROPERTIES = ("Tag", "Search Term", "Search Suffix", "Search Prefix", *SUBTAGS)
+
 
 # ── accessors ────────────────────────────────────────────────────────────────
 def _rich(page, key):
@@ -199,42 +205,61 @@ def _index_by_id(pages):
     return d
 
 
-def generate_and_inject(all_pages: List[dict], qb_pages: List[dict]) -> List[dict]:
+def generate_and_inject(all_pages: List[dict], qb_pages: List[dict],
+                        profile=NULL_PROFILE) -> List[dict]:
     """
     Inject generated tag/search properties into the For-Search pages (leaf drugs
     + one-level-above-leaf categories) and return that set (the add-on cache).
     """
-    index = build_index(all_pages)
-    qb_lookup = _index_by_id(qb_pages)
+    with profile.stage("graph_build"):
+        index = build_index(all_pages)
+        qb_lookup = _index_by_id(qb_pages)
 
-    searchable = [p for p in all_pages if is_for_search(p, index)]
+        searchable = [p for p in all_pages if is_for_search(p, index)]
+    if profile.enabled:
+        profile.record_graph(all_pages, index)
+        profile.peak("index", len(index))
+        profile.peak("qb_lookup", len(qb_lookup))
 
+    out_pages = []
     for page in searchable:
-        base = base_tags(page, index)
-        links = _emedici_links(page, index, qb_lookup)
-        general = _hierarchy_has_general(page, index)
-        leaf = not sub_items(page)
-        child_bases = [] if leaf else [bt for c in _children(page, index)
-                                       for bt in base_tags(c, index)]
-
-        props = page.setdefault("properties", {})
-        props["Tag"] = _formula_prop(" ".join(base))
-        props["Search Term"] = _formula_prop(search_term(page, index))
-        props["Search Suffix"] = _formula_prop(search_suffix(page, index))
-        props["Search Prefix"] = _formula_prop(search_prefix(page, index))
-
-        for human, suffix in SUBTAG_SUFFIX.items():
-            if general:
-                props[human] = _formula_prop("")
-                continue
-            roots = base if leaf else child_bases
-            tokens = [t + "::" + suffix for t in roots] + _emedici_for_suffix(links, suffix)
-            # de-dupe preserve order
-            seen, out = set(), []
-            for t in tokens:
-                if t not in seen:
-                    seen.add(t)
-                    out.append(t)
-            props[human] = _formula_prop(" ".join(out))
-
-    return searchable
+        with profile.stage("path_enumeration"):
+            base = base_tags(page, index)
+            general = _hierarchy_has_general(page, index)
+            leaf = not sub_items(page)
+            child_bases = [] if leaf else [bt for c in _children(page, index)
+                                           for bt in base_tags(c, index)]
+        if profile.enabled:     # statistics only — timed apart from the real work
+            with profile.stage("path_stats"):
+                profile.record_paths(enumerate_paths(page, index))
+        with profile.stage("cross_refs"):
+            links = _emedici_links(page, index, qb_lookup)
+        with profile.stage("search_terms"):
+            term = search_term(page, index)
+            suffix_ = search_suffix(page, index)
+            prefix_ = search_prefix(page, index)
+
+        with profile.stage("property_injection"):
+            # copy, never modify the input graph (see subjects_tags)
+            props = dict(page.get("properties", {}))
+            out_pages.append({**page, "properties": props})
+            props["Tag"] = _formula_prop(" ".join(base))
+            props["Search Term"] = _formula_prop(term)
+            props["Search Suffix"] = _formula_prop(suffix_)
+            props["Search Prefix"] = _formula_prop(prefix_)
+
+            for human, suffix in SUBTAG_SUFFIX.items():
+                if general:
+                    props[human] = _formula_prop("")
+                    continue
+                roots = base if leaf else child_bases
+                tokens = [t + "::" + suffix for t in roots] + _emedici_for_suffix(links, suffix)
+                # de-dupe preserve order
+                seen, out = set(), []
+                for t in tokens:
+                    if t not in seen:
+                        seen.add(t)
+                        out.append(t)
+                props[human] = _formula_prop(" ".join(out))
+
+    return out_pages
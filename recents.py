@@ -0,0 +1,185 @@
+"""
+The page selector's recently used pages, ranked by "frecency".
+
+recent_tags.json used to hold the last 8 picks as whole page dicts (7–13 KB
+each), rewritten on the UI thread on every Find/Add and re-read every time the
+results were cleared.  The store keeps one small record per page instead,
+
+    {"db": database id, "id": page id, "subtag": last subtag picked or null,
+     "count": times used, "last_used": unix time}
+
+in memory, and resolves it against the database's cache snapshot when it is
+shown — a page that has left the cache simply drops out.
+
+Ranking (`ranked`) is MRU + frequency: the page used last comes first, the
+rest by frecency — the use count decayed with a half-life of HALF_LIFE_DAYS
+since the last use — so a page picked every day outranks one picked once a
+month ago.  `boosts(database_id)` turns that into a 0–1 bonus per page id,
+which filter_pages adds (scaled) to a hit's score: frequent pages win ties
+and near-ties for the cost of one dict lookup per hit.
+
+Writes are asynchronous and coalesced: `record` changes memory and asks
+`schedule(fn)` (the add-on's executor) for one write; records landing while
+that write is queued or running are picked up by it, never lost.  The store
+does the coalescing, so `schedule` must run `fn` once per call — it must not
+fold the call into a run that is already under way (the executor is given a
+fresh key per write), or a record made just after that run's last check
+would wait for the next one.  Without a `schedule` the store writes
+synchronously.
+
+The pre-compact format (a list of {page_id, database_name, page_data, …}) is
+converted on load, keeping its order; `legacy_path` (<addon>/recent_tags.json,
+from before recents moved to user_files/) is read if `path` does not exist.
+
+Dependency-free (no aqt); safe to import in CI and inside Anki.
+"""
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+FORMAT_VERSION = 2
+MAX_RECORDS = 64           # kept (lowest frecency dropped); SHOWN are displayed
+SHOWN = 8
+HALF_LIFE_DAYS = 14
+BOOST_SCALE = 2.0          # frecency giving half the maximum boost
+
+
+def frecency(record: dict, now: float = None) -> float:
+    age_days = max(0.0, ((now or time.time()) - record.get("last_used", 0)) / 86400)
+    return record.get("count", 1) * 0.5 ** (age_days / HALF_LIFE_DAYS)
+
+
+class RecentsStore:
+    def __init__(self, path, legacy_path=None, database_ids=None, schedule=None):
+        self.path = Path(path)
+        self.legacy_path = Path(legacy_path) if legacy_path else None
+        self._database_ids = database_ids or {}    # legacy database name → id
+        self._schedule = schedule
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()    # one write at a time
+        self._records = None       # loaded on first use
+        self._version = 0          # bumped on every change (boost cache key)
+        self._boosts = {}          # database_id → (version, {page id: boost})
+        self._dirty = False
+        self._write_pending = False
+
+    # ── reading ──────────────────────────────────────────────────────────────
+    def _loaded(self) -> list:
+        """The records (caller holds _lock)."""
+        if self._records is None:
+            self._records = self._read()
+        return self._records
+
+    def _read(self) -> list:
+        for path in (self.path, self.legacy_path):
+            if path is None or not path.exists():
+                continue
+            try:
+                with path.open("r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                return []
+            if isinstance(data, dict) and data.get("version") == FORMAT_VERSION:
+                return [r for r in data.get("recents", []) if r.get("db") and r.get("id")]
+            if isinstance(data, list):
+                return self._from_legacy(data)
+            return []
+        return []
+
+    def _from_legacy(self, entries: list) -> list:
+        """[{page_id, database_name, page_data, …}] (newest first) → records."""
+        now = time.time()
+        records = []
+        for i, entry in enumerate(entries):
+            db = self._database_ids.get(entry.get("database_name", ""))
+            page_id = entry.get("page_id") or (entry.get("page_data") or {}).get("id")
+            if db and page_id:
+                records.append({"db": db, "id": page_id, "subtag": None,
+                                "count": 1, "last_used": now - i})
+        if records:
+            self._dirty = True     # rewrite in the compact format
+        return records
+
+    def ranked(self, limit: int = SHOWN) -> list:
+        """The `limit` records to show: the latest first, then by frecency."""
+        with self._lock:
+            records = list(self._loaded())
+        if not records:
+            return []
+        now = time.time()
+        latest = max(records, key=lambda r: r["last_used"])
+        rest = sorted((r for r in records if r is not latest),
+                      key=lambda r: (-frecency(r, now), -r["last_used"]))
+        return [dict(r) for r in [latest] + rest[:limit - 1]]
+
+    def boosts(self, database_id: str) -> dict:
+        """page id → 0–1 (frecency / (frecency + BOOST_SCALE)) for the pages of
+        `database_id` that were used; cached until the next record."""
+        with self._lock:
+            cached = self._boosts.get(database_id)
+            if cached is not None and cached[0] == self._version:
+                return cached[1]
+            now = time.time()
+            boosts = {}
+            for r in self._loaded():
+                if r["db"] == database_id:
+                    f = frecency(r, now)
+                    boosts[r["id"]] = f / (f + BOOST_SCALE)
+            self._boosts[database_id] = (self._version, boosts)
+            return boosts
+
+    # ── writing ──────────────────────────────────────────────────────────────
+    def record(self, database_id: str, page_id: str, subtag: str = None):
+        """Count one use of a page (and remember the subtag picked with it)."""
+        if not (database_id and page_id):
+            return
+        with self._lock:
+            records = self._loaded()
+            for r in records:
+                if r["db"] == database_id and r["id"] == page_id:
+                    r["count"] = r.get("count", 0) + 1
+                    r["last_used"] = time.time()
+                    if subtag:
+                        r["subtag"] = subtag
+                    break
+            else:
+                now = time.time()
+                if len(records) >= MAX_RECORDS:     # make room: drop the weakest
+                    records.remove(min(records, key=lambda r: (frecency(r, now), r["last_used"])))
+                records.append({"db": database_id, "id": page_id, "subtag": subtag or None,
+                                "count": 1, "last_used": now})
+            self._version += 1
+            self._dirty = True
+            if self._write_pending:
+                return         # the queued / running write will pick this up
+            self._write_pending = True
+        if self._schedule is None:
+            self.flush()
+        else:
+            self._schedule(self.flush)
+
+    def flush(self):
+        """Write until nothing is left unsaved.  Runs as the scheduled write;
+        call it directly to save now (e.g. before the scheduler shuts down)."""
+        with self._write_lock:
+            while True:
+                with self._lock:
+                    if not self._dirty:
+                        self._write_pending = False
+                        return
+                    self._dirty = False
+                    data = {"version": FORMAT_VERSION,
+                            "recents": [dict(r) for r in self._records or []]}
+                self._write(data)
+
+    def _write(self, data: dict):
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with tmp.open("w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            print(f"Could not save recent pages to {self.path}: {e}")
@@ -0,0 +1,233 @@
+"""
+One request scheduler for every Notion API call — CI (update_cache.py) and the
+add-on (cache_generation.py / notion_cache.py) alike.
+
+The integration token is shared by the daily CI build and every add-on install,
+and Notion allows an average of ~3 requests/second per integration.  Previously
+each module kept its own limiter (sleeping while holding a global lock, so all
+waiting threads queued behind one sleeper) and retried three different ways.
+Here:
+
+  * a token bucket (`rate` tokens/s, up to `burst` banked) hands out permission
+    to send; waiters block on a condition variable, never while holding it;
+  * the rate adapts AIMD-style — halved on every 429 (and sending paused for the
+    server's Retry-After), then crept back up by `increase` per success, never
+    above `max_rate`;
+  * waiters are served by priority, then arrival: INTERACTIVE (a user clicked
+    'Update Database') before SCHEDULED (CI) before BACKGROUND (startup checks);
+  * `send` is the single retry path: 429 waits for the bucket (rate already
+    cut), 5xx and connection errors back off exponentially with jitter;
+  * `stats()` exposes counters (requests, throttled, retries, time waited …);
+  * optionally (`use_breaker`, the add-on) a connectivity circuit breaker
+    (connectivity.py) sees every outcome: while it is open `send` fails at
+    once.  A connection failure is retried once while the breaker is closed
+    (a reset keep-alive connection is an ordinary hiccup online); if the retry
+    fails too — or a half-open probe fails — the breaker opens and the error
+    is raised instead of backing off through every attempt.
+
+    resp = SCHEDULER.send(session, "POST", url, json=payload, timeout=60)
+
+The priority of the current thread is set with `request_priority(...)`; worker
+pools copy it to their threads with `with_priority`.
+
+Dependency-free (only `requests`); safe to import in CI and inside Anki.
+"""
+import heapq
+import itertools
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+import requests
+
+try:  # standalone (CI) vs add-on package context
+    from connectivity import CLOSED
+except ImportError:
+    from .connectivity import CLOSED
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_SCHEDULED = 1
+PRIORITY_BACKGROUND = 2
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+_local = threading.local()
+
+
+def current_priority() -> int:
+    return getattr(_local, "priority", PRIORITY_SCHEDULED)
+
+
+@contextmanager
+def request_priority(priority: int):
+    """Requests sent by this thread inside the block use `priority`."""
+    previous = current_priority()
+    _local.priority = priority
+    try:
+        yield
+    finally:
+        _local.priority = previous
+
+
+def with_priority(priority: int, fn):
+    """`fn` wrapped to run under `priority` — for handing work to another
+    thread (thread pools don't inherit the submitting thread's priority)."""
+    def run(*args, **kwargs):
+        with request_priority(priority):
+            return fn(*args, **kwargs)
+    return run
+
+
+class RequestScheduler:
+    def __init__(self, rate: float = 3.0, burst: int = 3, min_rate: float = 0.5,
+                 max_rate: float = 3.0, increase: float = 0.25, decrease: float = 0.5,
+                 max_attempts: int = 8, max_backoff: float = 60.0):
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.max_attempts = max_attempts
+        self.max_backoff = max_backoff
+
+        self._cond = threading.Condition()
+        self._tokens = float(burst)
+        self._stamp = time.monotonic()
+        self._paused_until = 0.0
+        self._waiting = []                  # heap of (priority, seq)
+        self._seq = itertools.count()
+        self._counts = {"requests": 0, "throttled": 0, "server_errors": 0,
+                        "transport_errors": 0, "retries": 0, "waited_s": 0.0}
+        self.breaker = None
+
+    def use_breaker(self, breaker):
+        """Feed request outcomes to `breaker` and fail fast while it is open.
+        CI leaves this off: there a failed connection is worth retrying."""
+        self.breaker = breaker
+
+    # ── token bucket ─────────────────────────────────────────────────────────
+    def _refill(self, now: float):
+        self._tokens = min(self.burst, self._tokens + (now - self._stamp) * self.rate)
+        self._stamp = now
+
+    def acquire(self, priority: int = None):
+        """Block until this caller may send one request."""
+        ticket = (current_priority() if priority is None else priority, next(self._seq))
+        t0 = time.monotonic()
+        with self._cond:
+            heapq.heappush(self._waiting, ticket)
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    if self._waiting[0] != ticket:
+                        # Someone ahead of us; they notify when they're through.
+                        self._cond.wait(1.0)
+                        continue
+                    if now < self._paused_until:
+                        self._cond.wait(self._paused_until - now)
+                        continue
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        break
+                    self._cond.wait((1 - self._tokens) / self.rate)
+            finally:
+                self._waiting.remove(ticket)
+                heapq.heapify(self._waiting)
+                self._cond.notify_all()
+            self._counts["requests"] += 1
+            self._counts["waited_s"] += time.monotonic() - t0
+
+    def _throttled(self, retry_after: float):
+        with self._cond:
+            self._counts["throttled"] += 1
+            self.rate = max(self.min_rate, self.rate * self.decrease)
+            self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+            self._tokens = min(self._tokens, 0.0)
+            self._cond.notify_all()
+
+    def _succeeded(self):
+        with self._cond:
+            if self.rate < self.max_rate:
+                self.rate = min(self.max_rate, self.rate + self.increase)
+
+    # ── send with retries ────────────────────────────────────────────────────
+    def _backoff(self, attempt: int) -> float:
+        return min(self.max_backoff, 2 ** attempt) * (0.5 + random.random() / 2)
+
+    def send(self, session, method: str, url: str, priority: int = None,
+             retry_on=RETRY_STATUSES, retry_timeouts: bool = True,
+             **kwargs) -> requests.Response:
+        """Send through the bucket, retrying `retry_on` statuses (429 / 5xx) and
+        connection errors up to `max_attempts` times.  Any other response is
+        returned as-is (callers decide what a 400 means).  When attempts run
+        out, the last response is returned (so `raise_for_status` reports it) or
+        the last error raised.  Callers that handle 504s / timeouts themselves
+        (adaptive page size) drop them from `retry_on` / set retry_timeouts=False."""
+        session = session or requests
+        last_exc = None
+        connection_failed = False
+        for attempt in range(1, self.max_attempts + 1):
+            if attempt > 1:
+                with self._cond:
+                    self._counts["retries"] += 1
+            if self.breaker is not None and not self.breaker.allow():
+                raise requests.ConnectionError(self.breaker.describe())
+            self.acquire(priority)
+            try:
+                resp = session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if self.breaker is not None and isinstance(e, requests.ConnectionError):
+                    if connection_failed or self.breaker.state != CLOSED:
+                        self.breaker.record_failure()
+                        raise    # offline: the breaker now fails every request fast
+                    connection_failed = True     # retried once (below)
+                elif isinstance(e, requests.Timeout) and not retry_timeouts:
+                    raise
+                last_exc = e
+                with self._cond:
+                    self._counts["transport_errors"] += 1
+                print(f"  {method} attempt {attempt}/{self.max_attempts} failed: {type(e).__name__}: {e}")
+                if attempt < self.max_attempts:
+                    time.sleep(self._backoff(attempt))
+                continue
+
+            if self.breaker is not None:
+                self.breaker.record_success()
+            if resp.status_code == 429:
+                self._throttled(_retry_after(resp, default=self._backoff(attempt)))
+                if 429 in retry_on and attempt < self.max_attempts:
+                    continue
+            elif resp.status_code in retry_on:
+                with self._cond:
+                    self._counts["server_errors"] += 1
+                print(f"  {method} attempt {attempt}/{self.max_attempts}: HTTP {resp.status_code}")
+                if attempt < self.max_attempts:
+                    time.sleep(self._backoff(attempt))
+                    continue
+            else:
+                self._succeeded()
+            return resp
+        raise last_exc
+
+    def stats(self) -> dict:
+        with self._cond:
+            out = dict(self._counts)
+            out["waited_s"] = round(out["waited_s"], 2)
+            out["rate"] = round(self.rate, 2)
+            out["queued"] = len(self._waiting)
+            return out
+
+
+def _retry_after(resp, default: float) -> float:
+    try:
+        return max(0.0, float(resp.headers.get("Retry-After")))
+    except (TypeError, ValueError):
+        return default
+
+
+# Process-wide scheduler: CI and the add-on each run one per process, so every
+# fetcher in that process shares one budget for the token.
+SCHEDULER = RequestScheduler()
@@ -0,0 +1,83 @@
+"""
+Compressed seed files.
+
+Seeds are JSON with heavily repetitive property keys and tag prefixes
+(`#Malleus_CM::#Subjects::…`), so they compress several-fold.  CI publishes
+each seed as plain JSON (`<id>.json` — what older add-on versions download)
+plus a compressed copy next to it:
+
+    <id>.json.gz    stdlib gzip
+
+Gzip only: zstd would need the `zstandard` package, which neither the CI
+workflow nor Anki's bundled Python provides, so a zstd variant would never
+be written or picked.  The manifest lists the variants with their size and
+sha256 (a dict, so another codec can be added later without a format
+change), and the add-on downloads the best one it can decode (`preferred`)
+and stores it as is.  Readers never care which it got: `open_text` /
+`text_stream` sniff the magic bytes and decompress while streaming, so a
+plain or gzip file loads the same.
+
+Gzip output is written with a fixed mtime, so re-encoding an unchanged seed
+gives identical bytes and an idle CI build commits nothing.
+
+Dependency-free (no aqt); safe to import in CI and inside Anki.
+"""
+import gzip
+import io
+import os
+from pathlib import Path
+
+GZIP = ".gz"
+
+_GZIP_MAGIC = b"\x1f\x8b"
+
+
+def codecs() -> list:
+    """Compressed suffixes this process can write and read, best first."""
+    return [GZIP]
+
+
+def preferred(variants: dict):
+    """The best suffix among `variants` (a manifest entry's) we can decode,
+    or None to download the plain JSON."""
+    for suffix in codecs():
+        if suffix in (variants or {}):
+            return suffix
+    return None
+
+
+def open_text(path):
+    """Open a plain or gzip JSON file for reading as text."""
+    f = open(path, "rb")
+    try:
+        return text_stream(f)
+    except BaseException:
+        f.close()
+        raise
+
+
+def text_stream(f):
+    """Wrap a binary file positioned at its start (plain or gzip) as a
+    decompressing text stream."""
+    magic = f.read(2)
+    f.seek(0)
+    if magic == _GZIP_MAGIC:
+        stream = gzip.GzipFile(fileobj=f, mode="rb")
+    else:
+        stream = f
+    return io.TextIOWrapper(stream, encoding="utf-8")
+
+
+def write_variants(path, blob: bytes) -> dict:
+    """Write the compressed copies of the plain JSON `blob` stored at `path`
+    (path + suffix).  Returns {suffix: Path}."""
+    path = Path(path)
+    written = {}
+    for suffix in codecs():
+        target = path.with_name(path.name + suffix)
+        data = gzip.compress(blob, compresslevel=9, mtime=0)
+        tmp = target.with_name(target.name + ".tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, target)
+        written[suffix] = target
+    return written
@@ -0,0 +1,187 @@
+"""
+Delta patches between consecutive published seeds.
+
+Each CI build that changes a seed (cache/<id>.json) also publishes the change
+against the previous seed — pages upserted, ids deleted, top-level fields
+changed — under cache/deltas/<id>/, plus an index naming the current seed's
+content hash (`head`) and the chain of recent deltas leading to it:
+
+    cache/deltas/<id>/index.json
+        {"head": "<hash>", "deltas": [{"from": h0, "to": h1, "file": ..., "size": ...}, ...]}
+    cache/deltas/<id>/<from[:12]>_<to[:12]>.json
+        {"from": h0, "to": h1, "created": ts, "upsert": [...], "delete": [...], "meta": {...}}
+
+A client holding seed h0 walks the chain to `head`, applies each delta to its
+copy and checks the result's content hash against `head` — any gap (its hash
+not in the chain, a missing file) or mismatch means it downloads the full seed
+instead.  The chain is capped at CHAIN_LENGTH deltas; a delta bigger than
+MAX_DELTA_RATIO of its seed (e.g. a generator change touching every page)
+restarts the chain rather than being published.
+
+CI also writes cache/manifest.json — for every seed its content hash, size,
+page count, generator version, timestamp and delta chain — so a client makes
+one conditional request for the manifest and only touches the seeds whose hash
+differs from its own (write_manifest; it only changes when a seed does).  Each
+entry also carries the seed file's byte-level `sha256`, which a download is
+checked against before it is installed, and the same for each compressed copy
+(`variants`, see seed_codec.py).
+
+`content_hash` covers the top-level fields and the pages irrespective of their
+order (applying a delta appends new pages, where the seed may list them
+elsewhere).
+
+Dependency-free (no aqt); safe to import in CI and inside Anki.
+"""
+import hashlib
+import json
+import time
+from pathlib import Path
+
+try:  # standalone (CI) vs add-on package context
+    import seed_codec
+except ImportError:
+    from . import seed_codec
+
+DELTA_DIR = "deltas"
+MANIFEST = "manifest.json"
+CHAIN_LENGTH = 14
+MAX_DELTA_RATIO = 0.5
+
+
+def content_hash(doc: dict) -> str:
+    meta = {k: v for k, v in doc.items() if k != "pages"}
+    pages = sorted(doc.get("pages", []), key=lambda p: p.get("id", ""))
+    blob = json.dumps({"meta": meta, "pages": pages}, sort_keys=True,
+                      separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def make_delta(old_doc: dict, new_doc: dict) -> dict:
+    old_pages = {p["id"]: p for p in old_doc.get("pages", [])}
+    new_ids = {p["id"] for p in new_doc.get("pages", [])}
+    return {
+        "from": content_hash(old_doc),
+        "to": content_hash(new_doc),
+        "created": time.time(),
+        "upsert": [p for p in new_doc.get("pages", []) if old_pages.get(p["id"]) != p],
+        "delete": [i for i in old_pages if i not in new_ids],
+        "meta": {k: v for k, v in new_doc.items() if k != "pages"},
+    }
+
+
+def apply_delta(doc: dict, delta: dict) -> dict:
+    pages = {p["id"]: p for p in doc.get("pages", [])}
+    for page_id in delta.get("delete", ()):
+        pages.pop(page_id, None)
+    for page in delta.get("upsert", ()):
+        pages[page["id"]] = page
+    return {**delta.get("meta", {}), "pages": list(pages.values())}
+
+
+def chain_from(index: dict, start_hash: str):
+    """The index entries leading from `start_hash` to the head, in order; []
+    when already at the head; None when the chain doesn't reach `start_hash`."""
+    if start_hash == index.get("head"):
+        return []
+    entries = index.get("deltas", [])
+    for i, entry in enumerate(entries):
+        if entry.get("from") == start_hash:
+            path = entries[i:]
+            if all(a["to"] == b["from"] for a, b in zip(path, path[1:])) \
+                    and path[-1]["to"] == index.get("head"):
+                return path
+            return None
+    return None
+
+
+# ── publishing (CI) ──────────────────────────────────────────────────────────
+def _read_json(path: Path):
+    try:
+        with path.open("r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_json(path: Path, obj):
+    with path.open("w", encoding="utf-8") as f:
+        json.dump(obj, f)
+
+
+def publish(cache_dir, database_id: str, old_doc: dict, new_doc: dict) -> dict:
+    """Record the change old_doc → new_doc of a seed about to be written:
+    writes the delta (unless too big / no previous seed), updates the index and
+    prunes deltas that fell off the chain.  Returns the index."""
+    directory = Path(cache_dir) / DELTA_DIR / database_id
+    directory.mkdir(parents=True, exist_ok=True)
+    index_path = directory / "index.json"
+    index = _read_json(index_path) or {"head": None, "deltas": []}
+    new_hash = content_hash(new_doc)
+    if index.get("head") == new_hash:
+        return index
+
+    deltas = index.get("deltas", [])
+    if old_doc and old_doc.get("pages") is not None:
+        delta = make_delta(old_doc, new_doc)
+        body = json.dumps(delta)
+        seed_size = len(json.dumps(new_doc))
+        if len(body) <= MAX_DELTA_RATIO * seed_size:
+            if deltas and deltas[-1]["to"] != delta["from"]:
+                deltas = []   # index out of step with the seed: restart the chain
+            name = f"{delta['from'][:12]}_{delta['to'][:12]}.json"
+            (directory / name).write_text(body, encoding="utf-8")
+            deltas.append({"from": delta["from"], "to": delta["to"], "file": name,
+                           "size": len(body), "created": delta["created"]})
+        else:
+            print(f"  [{database_id}] Delta is {len(body)} bytes (seed {seed_size}) — chain restarted")
+            deltas = []
+    else:
+        deltas = []
+    deltas = deltas[-CHAIN_LENGTH:]
+
+    index = {"head": new_hash, "deltas": deltas}
+    _write_json(index_path, index)
+    keep = {e["file"] for e in deltas} | {"index.json"}
+    for path in directory.iterdir():
+        if path.name not in keep:
+            path.unlink()
+    return index
+
+
+def _file_entry(path: Path) -> dict:
+    data = path.read_bytes()
+    return {"size": len(data), "sha256": hashlib.sha256(data).hexdigest()}
+
+
+def write_manifest(cache_dir, database_ids) -> dict:
+    """(Re)write cache/manifest.json from the seeds on disk.  Left untouched
+    when nothing changed, so an idle build commits nothing."""
+    cache_dir = Path(cache_dir)
+    seeds = {}
+    for database_id in database_ids:
+        path = cache_dir / f"{database_id}.json"
+        doc = _read_json(path)
+        if doc is None:
+            continue
+        digest = content_hash(doc)
+        index = _read_json(cache_dir / DELTA_DIR / database_id / "index.json") or {}
+        variants = {}
+        for suffix in seed_codec.codecs():
+            compressed = path.with_name(path.name + suffix)
+            if compressed.exists():
+                variants[suffix] = _file_entry(compressed)
+        seeds[database_id] = {
+            "hash": digest,
+            **_file_entry(path),
+            "variants": variants,
+            "pages": len(doc.get("pages", [])),
+            "generator_version": doc.get("generator_version"),
+            "timestamp": doc.get("timestamp"),
+            "deltas": index.get("deltas", []) if index.get("head") == digest else [],
+        }
+    manifest = {"version": 1, "seeds": seeds}
+    path = cache_dir / MANIFEST
+    if _read_json(path) != manifest:
+        with path.open("w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=1, sort_keys=True)
+    return manifest
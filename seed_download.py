@@ -0,0 +1,121 @@
+"""
+Download engine for the GitHub seeds.
+
+One pooled keep-alive `requests.Session` for every GitHub request (manifest,
+delta chains, seeds), so a refresh reuses a handful of connections instead of
+opening one per file.  A seed is streamed straight into a temp file next to its
+destination while being hashed — never held in memory, parsed and re-dumped —
+then checked against the manifest's byte size / sha256 before the caller
+installs it with os.replace.  `map` runs per-seed jobs on a bounded pool.
+
+    downloader = SeedDownloader()
+    result = downloader.fetch(url, tmp_path, headers={"If-None-Match": etag},
+                              expected_sha256=..., expected_size=...,
+                              progress=lambda n: ...)
+    result.status, result.etag, result.sha256
+
+`progress` receives the byte count of each chunk as it lands (from worker
+threads — callers aggregate under their own lock).  With a `breaker`
+(connectivity.py) requests fail fast while GitHub is known to be unreachable.
+
+Dependency-free (only `requests`); safe to import in CI and inside Anki.
+"""
+import concurrent.futures
+import hashlib
+import os
+from typing import NamedTuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+try:  # standalone (CI) vs add-on package context
+    from connectivity import guard
+except ImportError:
+    from .connectivity import guard
+
+MAX_WORKERS = 4
+CHUNK_SIZE = 64 * 1024
+
+
+class IntegrityError(Exception):
+    """A downloaded file doesn't match the size/hash the manifest promised."""
+
+
+class FetchResult(NamedTuple):
+    status: int
+    etag: str
+    sha256: str
+    size: int
+
+
+def file_sha256(path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class SeedDownloader:
+    def __init__(self, max_workers: int = MAX_WORKERS, timeout: float = 30, breaker=None):
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.breaker = breaker
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """A plain (small) GET over the pooled session."""
+        kwargs.setdefault("timeout", self.timeout)
+        with guard(self.breaker):
+            return self.session.get(url, **kwargs)
+
+    def fetch(self, url: str, dest_tmp, headers: dict = None, expected_sha256: str = None,
+              expected_size: int = None, progress=None) -> FetchResult:
+        """Stream `url` into `dest_tmp`.  A 304 writes nothing.  Raises
+        requests.HTTPError for other non-2xx statuses and IntegrityError (temp
+        file removed) when the bytes don't match what was expected."""
+        with guard(self.breaker):
+            response = self.session.get(url, headers=headers or {}, stream=True,
+                                        timeout=self.timeout)
+        with response:
+            if response.status_code == 304:
+                return FetchResult(304, response.headers.get("ETag", ""), "", 0)
+            response.raise_for_status()
+            digest = hashlib.sha256()
+            size = 0
+            try:
+                with open(dest_tmp, "wb") as f:
+                    for chunk in response.iter_content(CHUNK_SIZE):
+                        f.write(chunk)
+                        digest.update(chunk)
+                        size += len(chunk)
+                        if progress:
+                            progress(len(chunk))
+                if expected_size is not None and size != expected_size:
+                    raise IntegrityError(f"{url}: {size} bytes, expected {expected_size}")
+                if expected_sha256 and digest.hexdigest() != expected_sha256:
+                    raise IntegrityError(f"{url}: sha256 mismatch")
+            except BaseException:
+                try:
+                    os.remove(dest_tmp)
+                except OSError:
+                    pass
+                raise
+            return FetchResult(response.status_code, response.headers.get("ETag", ""),
+                               digest.hexdigest(), size)
+
+    def map(self, fn, items) -> dict:
+        """{item: fn(item)} with at most max_workers running at once.  An
+        exception is returned as that item's result rather than raised."""
+        results = {}
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {pool.submit(fn, item): item for item in items}
+            for future in concurrent.futures.as_completed(futures):
+                try:
+                    results[futures[future]] = future.result()
+                except Exception as e:
+                    results[futures[future]] = e
+        return results
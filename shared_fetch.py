@@ -0,0 +1,79 @@
+"""
+Single-flight registry for database fetches shared between consumers.
+
+The Question Banks (eMedici) and Rotation databases feed both the Subjects and
+Pharmacology builds, and Rotation is also a seed of its own.  Without sharing,
+each consumer fetched them independently — in CI once per build, in the add-on
+once per generated database per refresh — all against the same rate-limited
+token.
+
+    shared = SharedFetchRegistry()
+    qb = shared.get(QB_ID, lambda: fetch_all_pages(QB_ID, token))
+
+The first caller for a key runs the fetch; callers arriving while it is in
+flight wait for that result instead of starting their own.  A successful result
+is kept for `max_age` seconds (None: for the registry's lifetime, i.e. one CI
+run); a failure is handed to every waiter of that flight but not remembered, so
+the next caller retries.  Results are shared objects — consumers must treat
+them as read-only.
+
+Dependency-free (no aqt); safe to import in CI and inside Anki.
+"""
+import threading
+import time
+
+
+class _Flight:
+    __slots__ = ("done", "result", "error", "finished")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.finished = 0.0
+
+
+class SharedFetchRegistry:
+    def __init__(self, max_age: float = None):
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._flights = {}
+        self.counts = {"fetches": 0, "shared": 0}
+
+    def get(self, key, fetch):
+        """`fetch()`'s result for `key`, running it at most once per max_age."""
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None and flight.done.is_set() and (
+                    flight.error is not None or self._expired(flight)):
+                flight = None
+            if flight is None:
+                flight = self._flights[key] = _Flight()
+                owner = True
+                self.counts["fetches"] += 1
+            else:
+                owner = False
+                self.counts["shared"] += 1
+
+        if owner:
+            try:
+                flight.result = fetch()
+            except BaseException as e:
+                flight.error = e
+            finally:
+                flight.finished = time.monotonic()
+                flight.done.set()
+        else:
+            flight.done.wait()
+
+        if flight.error is not None:
+            raise flight.error
+        return flight.result
+
+    def _expired(self, flight) -> bool:
+        return self.max_age is not None and time.monotonic() - flight.finished > self.max_age
+
+    def clear(self):
+        """Forget finished results (in-flight fetches still complete)."""
+        with self._lock:
+            self._flights = {k: f for k, f in self._flights.items() if not f.done.is_set()}
@@ -0,0 +1,93 @@
+"""
+Versioned, read-only in-memory snapshots of the search caches.
+
+Every search used to re-read and re-parse a database's cache file, and the
+page dicts it got back were then annotated in place (scores, database name)
+by whoever held them.  Instead each database has one current Snapshot:
+
+    snapshot = registry.get(database_id)      # None if there is no cache
+    snapshot.pages                           # tuple of page dicts — read-only
+    snapshot.version                         # unique, increasing per publish
+    snapshot.meta                            # the other top-level fields
+
+A snapshot never changes once published.  A writer (sync, regenerate,
+download) builds the new document off the main thread, writes it to disk and
+`publish`es it: swapping the registry's reference is atomic, so a search
+running on the old snapshot finishes on it undisturbed and the next search
+sees the new one — no locks on the read path.  Readers must treat the page
+dicts as frozen (copy before annotating: filter_pages returns shallow copies);
+anything derived from a snapshot (an index, a lookup) can be cached under its
+`version`.
+
+A snapshot is loaded lazily on first use (`loader(database_id)` → document or
+None).  A load racing a publish never replaces the newer snapshot.
+
+Dependency-free (no aqt); safe to import in CI and inside Anki.
+"""
+import itertools
+import threading
+from types import MappingProxyType
+
+_versions = itertools.count(1)
+
+
+class Snapshot:
+    __slots__ = ("database_id", "version", "pages", "meta")
+
+    def __init__(self, database_id: str, doc: dict):
+        self.database_id = database_id
+        self.version = next(_versions)
+        self.pages = tuple(doc.get("pages", ()))
+        self.meta = MappingProxyType({k: v for k, v in doc.items() if k != "pages"})
+
+    @property
+    def timestamp(self) -> float:
+        try:
+            return float(self.meta.get("timestamp", 0))
+        except (TypeError, ValueError):
+            return 0.0
+
+    def __repr__(self):
+        return f"<Snapshot {self.database_id} v{self.version}: {len(self.pages)} pages>"
+
+
+class SnapshotRegistry:
+    def __init__(self, loader):
+        self._loader = loader
+        self._lock = threading.Lock()
+        self._current = {}         # database_id → Snapshot (absent: not loaded)
+        self._generation = {}      # database_id → publish/invalidate count
+
+    def get(self, database_id: str):
+        """The current snapshot, loading it on first use; None if there is no
+        readable cache."""
+        snapshot = self._current.get(database_id)
+        if snapshot is not None:
+            return snapshot
+        with self._lock:
+            generation = self._generation.get(database_id, 0)
+        doc = self._loader(database_id)
+        if doc is None:
+            return None
+        with self._lock:
+            if self._generation.get(database_id, 0) != generation:
+                # A writer published while we were reading: theirs is newer.
+                return self._current.get(database_id) or Snapshot(database_id, doc)
+            snapshot = self._current.get(database_id)
+            if snapshot is None:
+                snapshot = self._current[database_id] = Snapshot(database_id, doc)
+            return snapshot
+
+    def publish(self, database_id: str, doc: dict) -> Snapshot:
+        """Make `doc` (just written to disk) the current snapshot."""
+        snapshot = Snapshot(database_id, doc)
+        with self._lock:
+            self._generation[database_id] = self._generation.get(database_id, 0) + 1
+            self._current[database_id] = snapshot
+        return snapshot
+
+    def invalidate(self, database_id: str):
+        """Forget the snapshot; the next get() reloads it from disk."""
+        with self._lock:
+            self._generation[database_id] = self._generation.get(database_id, 0) + 1
+            self._current.pop(database_id, None)
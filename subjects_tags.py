@@ -28,8 +28,10 @@ from typing import Dict, List
 
 try:  # standalone (CI) vs add-on package context
     from hierarchy_tags import build_index, enumerate_paths, page_name, _norm_id
+    from generation_profile import NULL_PROFILE
 except ImportError:
     from .hierarchy_tags import build_index, enumerate_paths, page_name, _norm_id
+    from .generation_profile import NULL_PROFILE
 
 PREFIX = ["#Malleus_CM", "#Subjects"]
 PREFIX_STR = "::".join(PREFIX)
@@ -43,6 +45,12 @@ SUBTAGS = ["Epidemiology", "Aetiology", "Risk Factors", "Physiology/Anatomy",
 SUBTAG_SUFFIX = {name: f"{i:02d}_" + name.replace(" ", "_")
                  for i, name in enumerate(SUBTAGS, start=1)}
 
+# Every property generate_and_inject writes.  Fetches leave these out
+# (filter_properties): their Notion formula versions are never read, and they
+# are the expensive part of a query.
+GENERATED_PROPERTIES = ("Tag", "Search Term", "Search Suffix", "Search Prefix",
+                        "Main Tag", *SUBTAGS)
+
 
 # ── small accessors ────────────────────────────────────────────────────────
 def _rich(page: dict, key: str) -> str:
@@ -264,41 +272,65 @@ def _index_by_id(pages: List[dict]) -> Dict[str, dict]:
 
 def generate_and_inject(all_pages: List[dict],
                         qb_pages: List[dict],
-                        rotation_pages: List[dict]) -> List[dict]:
+                        rotation_pages: List[dict],
+                        profile=NULL_PROFILE) -> List[dict]:
     """
-    Compute every generated property and inject it (formula-shaped) into each
-    leaf page.  Returns the list of leaf pages (those with no `Sub-item`) — the
-    set the add-on cache should contain.
+    Compute every generated property and inject it (formula-shaped) into a
+    copy of each leaf page.  Returns those copies (the leaves are the pages with
+    no `Sub-item`) — the set the add-on cache should contain; `all_pages` is
+    left untouched.  `profile` (see generation_profile)
+    collects stage timings and graph statistics when given.
     """
-    index = build_index(all_pages)
-    qb_lookup = _index_by_id(qb_pages)
-    rotation_lookup = _index_by_id(rotation_pages)
-    alias_memo: Dict[str, str] = {}
-
-    leaves = [p for p in all_pages if not sub_items(p)]
-
+    with profile.stage("graph_build"):
+        index = build_index(all_pages)
+        qb_lookup = _index_by_id(qb_pages)
+        rotation_lookup = _index_by_id(rotation_pages)
+        alias_memo: Dict[str, str] = {}
+
+        leaves = [p for p in all_pages if not sub_items(p)]
+    if profile.enabled:
+        profile.record_graph(all_pages, index)
+        profile.peak("index", len(index))
+        profile.peak("qb_lookup", len(qb_lookup))
+        profile.peak("rotation_lookup", len(rotation_lookup))
+
+    out_pages = []
     for page in leaves:
-        base = base_tags(page, index)
-        rot = rotation_tags(page, index, rotation_lookup)
-        links = _emedici_links(page, index, qb_lookup)
-        disease = gets_subtags(page, base)
-
-        props = page.setdefault("properties", {})
-        props["Tag"] = _formula_prop(" ".join(base))
-        props["Search Term"] = _formula_prop(search_term(page, index, alias_memo))
-        props["Search Suffix"] = _formula_prop(search_suffix(page, index))
-        props["Search Prefix"] = _formula_prop(search_prefix(page, index))
-
-        if disease:
-            props["Main Tag"] = _formula_prop("")
-            for human, suffix in SUBTAG_SUFFIX.items():
-                subject = [t + "::" + suffix for t in base]
-                emed = _emedici_for_suffix(links, suffix)
-                props[human] = _formula_prop(" ".join(subject + rot + emed))
-        else:
-            emed_all = _emedici_for_suffix(links, None)
-            props["Main Tag"] = _formula_prop(" ".join(base + rot + emed_all))
-            for human in SUBTAG_SUFFIX:
-                props[human] = _formula_prop("")
-
-    return leaves
+        with profile.stage("path_enumeration"):
+            base = base_tags(page, index)
+            disease = gets_subtags(page, base)
+        if profile.enabled:     # statistics only — timed apart from the real work
+            with profile.stage("path_stats"):
+                profile.record_paths(enumerate_paths(page, index))
+        with profile.stage("cross_refs"):
+            rot = rotation_tags(page, index, rotation_lookup)
+            links = _emedici_links(page, index, qb_lookup)
+        with profile.stage("search_terms"):
+            term = search_term(page, index, alias_memo)
+            suffix_ = search_suffix(page, index)
+            prefix_ = search_prefix(page, index)
+
+        with profile.stage("property_injection"):
+            # Copy-on-write: the input graph (possibly a cache snapshot) is
+            # never modified; the returned pages are new dicts.
+            props = dict(page.get("properties", {}))
+            out_pages.append({**page, "properties": props})
+            props["Tag"] = _formula_prop(" ".join(base))
+            props["Search Term"] = _formula_prop(term)
+            props["Search Suffix"] = _formula_prop(suffix_)
+            props["Search Prefix"] = _formula_prop(prefix_)
+
+            if disease:
+                props["Main Tag"] = _formula_prop("")
+                for human, suffix in SUBTAG_SUFFIX.items():
+                    subject = [t + "::" + suffix for t in base]
+                    emed = _emedici_for_suffix(links, suffix)
+                    props[human] = _formula_prop(" ".join(subject + rot + emed))
+            else:
+                emed_all = _emedici_for_suffix(links, None)
+                props["Main Tag"] = _formula_prop(" ".join(base + rot + emed_all))
+                for human in SUBTAG_SUFFIX:
+                    props[human] = _formula_prop("")
+
+    profile.peak("alias_memo", len(alias_memo))
+    return out_pages
@@ -41,6 +41,7 @@ from collections import Counter
 from typing import Dict, List, Set, Tuple, Optional
 
 from .config import get_database_id, DATABASE_PROPERTIES
+from .derived_indexes import BY_ID
 
 
 # ── Tuning ─────────────────────────────────────────────────────────────────────
@@ -420,6 +421,7 @@ def _topic_search_scores(
     """
     scores: Dict[str, float] = {}
     matched_by_pid: Dict[str, List[str]] = {}   # pid → readable matched queries
+    subjects_id = get_database_id("Subjects")   # for filter_pages' search index
 
     # Each entry: (query_list, weight_multiplier)
     query_groups: List[Tuple[List[str], float]] = []
@@ -486,7 +488,7 @@ def _topic_search_scores(
         for query in queries:
             if len(query.replace(' ', '')) < 3:
                 continue
-            for page in notion_cache.filter_pages(all_pages, query):
+            for page in notion_cache.filter_pages(all_pages, query, subjects_id):
                 pid = page.get('id', '')
                 if pid:
                     s = page.get('_composite_score', 0.0) * TOPIC_SEARCH_BONUS * weight
@@ -502,8 +504,8 @@ def _topic_search_scores(
 
 # ── Stage 2: Inverted index + body candidate scoring ──────────────────────────
 
-_index_cache: Optional[Dict[str, Set[str]]] = None
-_index_page_count: int = 0
+# Name of the token index in the cache's derived-index registry.
+TOKEN_INDEX = "suggest_tags.tokens"
 
 
 def _tokenise_for_index(text: str) -> Set[str]:
@@ -544,20 +546,23 @@ def _build_index(pages: List[Dict]) -> Dict[str, Set[str]]:
 
 
 def _get_index_and_pages(notion_cache) -> Tuple[Dict[str, Set[str]], List[Dict]]:
-    global _index_cache, _index_page_count
+    """The Subjects token index and pages.  The index lives in the cache's
+    derived-index registry, so it is built once per cache version."""
     database_id = get_database_id("Subjects")
     try:
         pages, _ = notion_cache.load_from_cache(database_id, warn_if_expired=False)
-    except Exception:
-        pages = []
-    if not pages:
+        if not pages:
+            return {}, []
+        return notion_cache.index(database_id, TOKEN_INDEX, _build_index), pages
+    except Exception as e:
+        print(f"[SuggestTags] Could not load the Subjects index: {e}")
         return {}, []
-    if _index_cache is None or len(pages) != _index_page_count:
-        print(f"[SuggestTags] Building inverted index over {len(pages)} pages...")
-        _index_cache = _build_index(pages)
-        _index_page_count = len(pages)
-        print(f"[SuggestTags] Index ready — {len(_index_cache)} unique tokens")
-    return _index_cache, pages
+
+
+def build_index(notion_cache) -> Dict[str, Set[str]]:
+    """The Subjects token index, built now unless it already is (warm-up)."""
+    index, _ = _get_index_and_pages(notion_cache)
+    return index
 
 
 def _is_worth_keeping(word: str) -> bool:
@@ -656,11 +661,12 @@ def _shortlist_and_score(
     shortlist = [page_by_id[pid] for pid in matched_ids if pid in page_by_id]
     if not shortlist:
         return {}
+    subjects_id = get_database_id("Subjects")
 
     print(f"[SuggestTags] Stage 2 shortlist: {len(shortlist)} pages")
     scores: Dict[str, float] = {}
     for phrase, weight in candidates:
-        for page in notion_cache.filter_pages(shortlist, phrase):
+        for page in notion_cache.filter_pages(shortlist, phrase, subjects_id):
             pid = page.get('id', '')
             if pid:
                 scores[pid] = (scores.get(pid, 0.0)
@@ -903,7 +909,7 @@ def suggest_subject_tags(
         print("[SuggestTags] No pages in Subjects cache.")
         return []
 
-    page_by_id: Dict[str, Dict] = {p.get('id', ''): p for p in pages}
+    page_by_id = notion_cache.index(get_database_id("Subjects"), BY_ID)
 
     stage1, stage1_matched = _topic_search_scores(card_text, pages, notion_cache,
                                                    extra=extra, source=source)
@@ -967,10 +973,3 @@ def suggest_subject_tags(
                 'matched_terms':    terms,
             })
     return results
-
-
-def invalidate_index():
-    """Force a full index rebuild on the next call. Call after cache update."""
-    global _index_cache, _index_page_count
-    _index_cache = None
-    _index_page_count = 0
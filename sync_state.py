@@ -0,0 +1,167 @@
+"""
+Persisted per-database fetch metadata ("sync state").
+
+One small JSON file keyed by dash-less database id, holding what the fetchers
+would otherwise re-learn from Notion on every run:
+
+    data_source_id   the database's (first) data source — saves a GET per fetch
+    schema           {property name: property id} of that data source, used to
+                     turn a consumer's property names into `filter_properties`
+    schema_at        when the schema was fetched — re-fetched after
+                     SCHEMA_MAX_AGE, or sooner if a property a consumer wants
+                     is missing from it (renamed in Notion)
+    watermark        (add-on) newest last_edited_time seen by the incremental
+                     sync of an ordinary database — where the next one starts
+    inputs_fetched_at  (CI) when the build behind the committed seed began
+                     fetching — where the next run's edit probes start; kept
+                     out of the seed so advancing it publishes nothing
+
+CI keeps it at cache/_sync_state.json (committed with the seeds, so the next
+run starts warm); the add-on at user_files/cache/_sync_state.json.  Anything
+in it can be rebuilt from Notion, so a missing or corrupt file just means a
+cold start, and callers `forget` an entry when Notion says it's stale.
+
+`SyncState(None)` keeps everything in memory only.
+
+Dependency-free (no aqt); safe to import in CI and inside Anki.
+"""
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+SCHEMA_MAX_AGE = 24 * 3600
+SCHEMA_RECHECK = 10 * 60   # min age before a missing wanted name forces a re-fetch
+
+
+def _key(database_id: str) -> str:
+    return database_id.replace("-", "")
+
+
+class SyncState:
+    def __init__(self, path=None):
+        self.path = Path(path) if path else None
+        self._lock = threading.Lock()
+        self._data = {}
+        if self.path is not None:
+            try:
+                with self.path.open("r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if isinstance(data, dict):
+                    self._data = data
+            except (OSError, ValueError):
+                pass
+
+    def get(self, database_id: str, key: str, default=None):
+        with self._lock:
+            return self._data.get(_key(database_id), {}).get(key, default)
+
+    def update(self, database_id: str, **values):
+        """Set entries for a database; written through only if something changed."""
+        with self._lock:
+            entry = self._data.setdefault(_key(database_id), {})
+            changed = {k: v for k, v in values.items() if entry.get(k) != v}
+            if not changed:
+                return
+            entry.update(changed)
+            self._save()
+
+    def forget(self, database_id: str, *keys):
+        with self._lock:
+            entry = self._data.get(_key(database_id), {})
+            if not any(k in entry for k in keys):
+                return
+            for k in keys:
+                entry.pop(k, None)
+            self._save()
+
+    def schema(self, database_id: str, fetch, wanted=()) -> dict:
+        """The stored schema, or `fetch()`'s ({name: id}) when there is none,
+        it is older than SCHEMA_MAX_AGE, or it lacks a `wanted` name and is
+        older than SCHEMA_RECHECK."""
+        schema = self.get(database_id, "schema")
+        age = time.time() - self.get(database_id, "schema_at", 0)
+        if schema is None or age > SCHEMA_MAX_AGE or (
+                age > SCHEMA_RECHECK and any(n not in schema for n in wanted)):
+            fresh = fetch()
+            if fresh == schema:
+                # Unchanged: note the check in memory only, so an unchanged
+                # schema never rewrites the (CI-committed) file.
+                with self._lock:
+                    self._data.setdefault(_key(database_id), {})["schema_at"] = time.time()
+            else:
+                self.update(database_id, schema=fresh, schema_at=time.time())
+            schema = fresh
+        return schema
+
+    def _save(self):
+        if self.path is None:
+            return
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        try:
+            with tmp.open("w", encoding="utf-8") as f:
+                json.dump(self._data, f, indent=1, sort_keys=True)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            print(f"Could not save sync state to {self.path}: {e}")
+
+
+def property_ids(schema: dict, include=None, exclude=()):
+    """`filter_properties` ids for a consumer: the schema's properties named in
+    `include` (every property when None) minus those in `exclude`.  None when
+    that would be every property anyway (no filter needed)."""
+    names = [n for n in schema
+             if (include is None or n in include) and n not in exclude]
+    if len(names) == len(schema):
+        return None
+    return [schema[n] for n in names]
+
+
+# ── Adaptive page size ───────────────────────────────────────────────────────
+# Notion computes every formula/rollup of every returned row, so how many rows a
+# query can return before it times out (504) depends on the database and changes
+# as its heavy properties are removed.  Each database's page size is learned:
+# grown while responses come back well under TARGET_RESPONSE_S, trimmed when
+# they're slower, halved on a 504/timeout — and remembered in the sync state.
+# A failure also sets a ceiling (`page_size_limit`, 80 % of the size that
+# failed) so growth stops short of it instead of hitting the same 504 every few
+# pages; a ceiling older than LIMIT_RELAX_AGE is raised by a quarter, so a
+# database that got lighter is re-probed about once a day.
+DEFAULT_PAGE_SIZE = 25     # unknown database: start cautious, grows in a few pages
+MIN_PAGE_SIZE = 5
+MAX_PAGE_SIZE = 100        # Notion's cap
+TARGET_RESPONSE_S = 10.0
+LIMIT_RELAX_AGE = 24 * 3600
+
+
+class PageSizer:
+    def __init__(self, state: SyncState, database_id: str):
+        self.state = state
+        self.database_id = database_id
+        self.size = int(state.get(database_id, "page_size", DEFAULT_PAGE_SIZE))
+        self.limit = int(state.get(database_id, "page_size_limit", MAX_PAGE_SIZE))
+        if time.time() - state.get(database_id, "page_size_limit_at", 0) > LIMIT_RELAX_AGE:
+            self.limit = min(MAX_PAGE_SIZE, int(self.limit * 1.25) + 1)
+
+    def observe(self, seconds: float):
+        """Account one successful response that took `seconds` server-side."""
+        if seconds < TARGET_RESPONSE_S / 2:
+            self._set(int(self.size * 1.5) + 1)
+        elif seconds > TARGET_RESPONSE_S:
+            self._set(int(self.size * 0.75))
+
+    def shrink(self) -> bool:
+        """After a 504/timeout: halve.  False if already at the minimum."""
+        if self.size <= MIN_PAGE_SIZE:
+            return False
+        self.limit = max(MIN_PAGE_SIZE, int(self.size * 0.8))
+        self.state.update(self.database_id, page_size_limit=self.limit,
+                          page_size_limit_at=time.time())
+        self._set(self.size // 2)
+        print(f"  Page size for {self.database_id} reduced to {self.size}")
+        return True
+
+    def _set(self, size: int):
+        self.size = max(MIN_PAGE_SIZE, min(self.limit, size))
+        self.state.update(self.database_id, page_size=self.size)
@@ -0,0 +1,235 @@
+"""
+One executor for the add-on's background cache work.
+
+Every database update (startup check, 'Update Database', Shift+click rebuild,
+per-database refresh) is a task submitted here instead of a thread of its own:
+
+  * a bounded pool of worker threads takes queued tasks by priority, then
+    arrival — the request scheduler's levels: INTERACTIVE (the user is waiting)
+    before SCHEDULED before BACKGROUND (startup checks) — and runs each under
+    its priority, so its Notion requests queue at that priority too;
+  * tasks have a key (the database id): submitting a key that is already
+    queued or running coalesces — the caller's callback is attached to the
+    existing task, whose priority is raised if the new request is more urgent
+    (`supersede=True` also swaps in the new work while it is still queued);
+  * each task carries a CancelToken.  Long operations call `check_cancelled()`
+    between requests (cache_generation.paginate does, per page), so
+    `cancel_all()` — on profile close — stops running work at the next
+    request instead of letting it finish against a closed collection;
+  * `tasks()` lists what is queued / running, for progress UI.
+
+    executor = TaskExecutor(max_workers=3, dispatch=mw.taskman.run_on_main)
+    executor.submit(database_id, work, priority=PRIORITY_INTERACTIVE,
+                    label="Subjects", callback=on_done)
+
+Callbacks run through `dispatch` (the main thread in the add-on) once the task
+finishes, whether it succeeded, failed or was cancelled.  Work functions take
+no arguments; the running task's token is reachable with `current_token()`
+and carried into helper threads with `bind`.
+
+Dependency-free (no aqt); safe to import in CI and inside Anki.
+"""
+import heapq
+import itertools
+import threading
+import time
+
+try:  # standalone (CI) vs add-on package context
+    from request_scheduler import PRIORITY_BACKGROUND, request_priority
+except ImportError:
+    from .request_scheduler import PRIORITY_BACKGROUND, request_priority
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+_local = threading.local()
+
+
+class Cancelled(Exception):
+    """The task this work belongs to was cancelled."""
+
+
+class CancelToken:
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def raise_if_cancelled(self):
+        if self._event.is_set():
+            raise Cancelled()
+
+
+def current_token():
+    """The CancelToken of the task running on this thread, or None."""
+    return getattr(_local, "token", None)
+
+
+def check_cancelled():
+    """Raise Cancelled if this thread's task has been cancelled (no-op outside
+    a task, e.g. in CI)."""
+    token = current_token()
+    if token is not None:
+        token.raise_if_cancelled()
+
+
+def bind(fn):
+    """`fn` wrapped to run under this thread's task token — for handing work
+    to another thread (pool threads don't inherit it)."""
+    token = current_token()
+
+    def run(*args, **kwargs):
+        previous = current_token()
+        _local.token = token
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _local.token = previous
+    return run
+
+
+class Task:
+    def __init__(self, key, fn, priority: int, label: str):
+        self.key = key
+        self.fn = fn
+        self.priority = priority
+        self.label = label
+        self.state = QUEUED
+        self.token = CancelToken()
+        self.callbacks = []
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+    def info(self) -> dict:
+        return {"key": self.key, "label": self.label, "priority": self.priority,
+                "state": self.state, "submitted_at": self.submitted_at,
+                "started_at": self.started_at}
+
+
+class TaskExecutor:
+    def __init__(self, max_workers: int = 3, dispatch=None):
+        self.max_workers = max_workers
+        self._dispatch = dispatch or (lambda callback: callback())
+        self._cond = threading.Condition()
+        self._queue = []                # heap of (priority, seq, task)
+        self._seq = itertools.count()
+        self._active = {}               # key → queued or running Task
+        self._workers = 0
+        self._idle = 0
+
+    def submit(self, key, fn, priority: int = PRIORITY_BACKGROUND, label: str = None,
+               callback=None, supersede: bool = False) -> Task:
+        """Queue `fn` under `key`, or coalesce with the task already queued or
+        running for it.  Returns the task that will run."""
+        with self._cond:
+            task = self._active.get(key)
+            if task is not None and not task.token.cancelled:
+                if callback:
+                    task.callbacks.append(callback)
+                if task.state == QUEUED:
+                    if supersede:
+                        task.fn, task.label = fn, label or task.label
+                    if priority < task.priority:
+                        task.priority = priority
+                        heapq.heappush(self._queue, (priority, next(self._seq), task))
+                return task
+            task = Task(key, fn, priority, label or str(key))
+            if callback:
+                task.callbacks.append(callback)
+            self._active[key] = task
+            heapq.heappush(self._queue, (priority, next(self._seq), task))
+            if len(self._queue) > self._idle and self._workers < self.max_workers:
+                self._workers += 1
+                threading.Thread(target=self._work, daemon=True,
+                                 name=f"malleus-task-{self._workers}").start()
+            self._cond.notify()
+            return task
+
+    def tasks(self) -> list:
+        """Queued and running tasks (most urgent first), as dicts."""
+        with self._cond:
+            active = sorted(self._active.values(), key=lambda t: (t.state != RUNNING, t.priority))
+            return [t.info() for t in active]
+
+    def cancel(self, key) -> bool:
+        with self._cond:
+            task = self._active.get(key)
+            if task is None:
+                return False
+            callbacks = self._cancel(task)
+        self._run_callbacks(callbacks)
+        return True
+
+    def cancel_all(self):
+        """Cancel every queued and running task (e.g. the profile is closing).
+        Queued ones never start; running ones stop at their next check."""
+        with self._cond:
+            callbacks = [cb for task in list(self._active.values()) for cb in self._cancel(task)]
+        self._run_callbacks(callbacks)
+
+    def _cancel(self, task: Task) -> list:
+        task.token.cancel()
+        if task.state == QUEUED:       # its heap entry is skipped when popped
+            return self._finish(task, CANCELLED)
+        return []
+
+    # ── workers ──────────────────────────────────────────────────────────────
+    def _next(self):
+        with self._cond:
+            while True:
+                while self._queue:
+                    _, _, task = heapq.heappop(self._queue)
+                    if task.state == QUEUED:
+                        task.state = RUNNING
+                        task.started_at = time.time()
+                        return task
+                    # else: stale entry (re-prioritised or cancelled task)
+                self._idle += 1
+                self._cond.wait()
+                self._idle -= 1
+
+    def _work(self):
+        while True:
+            task = self._next()
+            _local.token = task.token
+            state = DONE
+            try:
+                with request_priority(task.priority):
+                    task.fn()
+            except Cancelled:
+                state = CANCELLED
+            except Exception as e:
+                print(f"Task {task.label} failed: {e}")
+                state = FAILED
+            finally:
+                _local.token = None
+            if task.token.cancelled:
+                state = CANCELLED
+            with self._cond:
+                callbacks = self._finish(task, state)
+            self._run_callbacks(callbacks)
+
+    def _finish(self, task: Task, state: str) -> list:
+        """Mark `task` finished (holding _cond); returns its callbacks, which
+        the caller dispatches once the lock is released."""
+        task.state = state
+        task.finished_at = time.time()
+        if self._active.get(task.key) is task:
+            del self._active[task.key]
+        return task.callbacks
+
+    def _run_callbacks(self, callbacks):
+        for callback in callbacks:
+            try:
+                self._dispatch(callback)
+            except Exception as e:
+                print(f"Task callback failed: {e}")
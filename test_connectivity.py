@@ -0,0 +1,160 @@
+"""
+Standalone test for the per-endpoint circuit breakers (connectivity.py) and
+how the request scheduler feeds them.
+Run from the repo root with:
+    python test_connectivity.py
+No Anki installation or network required — requests go to a fake session.
+"""
+import requests
+
+from connectivity import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, guard
+from request_scheduler import RequestScheduler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeResponse:
+    status_code = 200
+
+
+class FlakySession:
+    """Raises ConnectionError for the first `failures` requests."""
+    def __init__(self, failures: int):
+        self.failures = failures
+        self.requests = 0
+
+    def request(self, method, url, **kwargs):
+        self.requests += 1
+        if self.requests <= self.failures:
+            raise requests.ConnectionError("connection reset")
+        return FakeResponse()
+
+
+def breaker():
+    clock = FakeClock()
+    return CircuitBreaker("test", base_interval=5, max_interval=20, clock=clock), clock
+
+
+def test_closed_open_half_open_closed():
+    b, clock = breaker()
+    assert b.state == CLOSED and b.allow()
+
+    b.record_failure()
+    assert b.state == OPEN
+    assert not b.allow() and not b.available()
+
+    clock.now += 5
+    assert b.available()                 # doesn't claim the probe
+    assert b.state == OPEN
+    assert b.allow()                     # this caller is the probe
+    assert b.state == HALF_OPEN
+    assert not b.allow()                 # everyone else still fails fast
+
+    b.record_success()
+    assert b.state == CLOSED and b.allow()
+
+
+def test_failed_probe_doubles_the_interval():
+    b, clock = breaker()
+    b.record_failure()
+    for wait in (5, 10, 20, 20):         # doubled per failed probe, capped
+        clock.now += wait - 0.5
+        assert not b.allow()
+        clock.now += 0.5
+        assert b.allow() and b.state == HALF_OPEN
+        b.record_failure()
+    b.record_success()
+    b.record_failure()
+    clock.now += 5
+    assert b.allow()                     # a success resets the back-off
+
+
+def test_guard():
+    b, clock = breaker()
+    with guard(b):
+        pass
+    assert b.state == CLOSED
+    try:
+        with guard(b):
+            raise requests.ConnectionError("down")
+    except requests.ConnectionError:
+        pass
+    assert b.state == OPEN
+    try:
+        with guard(b):
+            raise AssertionError("an open breaker must not run the block")
+    except requests.ConnectionError as e:
+        assert "test unreachable" in str(e)
+    with guard(None):                    # no breaker: a no-op
+        pass
+
+
+def scheduler(b):
+    s = RequestScheduler(rate=1000, burst=1000)
+    s._backoff = lambda attempt: 0.0
+    s.use_breaker(b)
+    return s
+
+
+def test_scheduler_retries_one_connection_error():
+    b, clock = breaker()
+    session = FlakySession(failures=1)
+    assert scheduler(b).send(session, "GET", "http://x").status_code == 200
+    assert session.requests == 2
+    assert b.state == CLOSED             # a single reset doesn't open the breaker
+
+
+def test_scheduler_opens_breaker_on_repeated_failure():
+    b, clock = breaker()
+    s = scheduler(b)
+    session = FlakySession(failures=99)
+    try:
+        s.send(session, "GET", "http://x")
+        raise AssertionError("expected ConnectionError")
+    except requests.ConnectionError:
+        pass
+    assert session.requests == 2 and b.state == OPEN
+
+    session = FlakySession(failures=0)
+    try:
+        s.send(session, "GET", "http://x")
+        raise AssertionError("expected ConnectionError")
+    except requests.ConnectionError:
+        pass
+    assert session.requests == 0         # failed fast, no network
+
+    clock.now += 5
+    assert s.send(session, "GET", "http://x").status_code == 200
+    assert b.state == CLOSED
+
+
+def test_scheduler_failed_probe_is_not_retried():
+    b, clock = breaker()
+    b.record_failure()
+    clock.now += 5
+    session = FlakySession(failures=99)
+    try:
+        scheduler(b).send(session, "GET", "http://x")
+        raise AssertionError("expected ConnectionError")
+    except requests.ConnectionError:
+        pass
+    assert session.requests == 1 and b.state == OPEN
+
+
+def main():
+    tests = [(name, fn) for name, fn in globals().items()
+             if name.startswith("test_") and callable(fn)]
+    for name, fn in tests:
+        fn()
+        print(f"ok  {name}")
+    print(f"\n{len(tests)} tests passed")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+"""
+Standalone test for the page-keyed cache store (page_store.py).
+Run from the repo root with:
+    python test_page_store.py
+No Anki installation required — works in a temporary directory.
+"""
+import json
+import os
+import tempfile
+from pathlib import Path
+
+from page_store import PageStore, COMPACT_RATIO
+
+
+def page(page_id, title="x"):
+    return {"id": page_id, "title": title}
+
+
+def new_store(tmp):
+    store = PageStore(Path(tmp) / "db.json")
+    # Padded so a few small journal entries stay under the compaction ratio.
+    store.replace({"timestamp": 1, "padding": "." * 4096,
+                   "pages": [page("a"), page("b"), page("c")]})
+    return store
+
+
+def journal_lines(store):
+    return store.journal.read_text(encoding="utf-8").splitlines()
+
+
+def test_journal_replay():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = new_store(tmp)
+        store.apply(upserts=[page("b", "edited"), page("d")], timestamp=2)
+        store.apply(deletes=["a"], timestamp=3)
+
+        assert len(journal_lines(store)) == 3          # header + two entries
+        doc = store.load()
+        assert [p["id"] for p in doc["pages"]] == ["b", "c", "d"]
+        assert doc["pages"][0]["title"] == "edited"
+        assert doc["timestamp"] == 3
+        assert [p["id"] for p in store.load(base_only=True)["pages"]] == ["a", "b", "c"]
+
+
+def test_save_writes_only_the_difference():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = new_store(tmp)
+        store.save([page("a"), page("b", "edited"), page("c")], timestamp=1)
+        entry = json.loads(journal_lines(store)[-1])
+        assert entry == {"upsert": [page("b", "edited")]}
+
+        # A new order replay can't reproduce is written out whole.
+        store.save([page("c"), page("a")], timestamp=1)
+        assert not store.journal.exists()
+        assert [p["id"] for p in store.load(base_only=True)["pages"]] == ["c", "a"]
+
+
+def test_torn_last_line_is_skipped():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = new_store(tmp)
+        store.apply(upserts=[page("d")])
+        with store.journal.open("ab") as f:
+            f.write(b'{"upsert": [{"id": "e", "tit')     # crash mid-append
+        assert [p["id"] for p in store.load()["pages"]] == ["a", "b", "c", "d"]
+
+        # The next append starts on a fresh line, so only the torn entry is lost.
+        store.apply(upserts=[page("f")])
+        assert [p["id"] for p in store.load()["pages"]] == ["a", "b", "c", "d", "f"]
+
+
+def test_compaction_threshold():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = new_store(tmp)
+        store.apply(upserts=[page("n0")])
+        n = 1
+        while store.journal.stat().st_size <= COMPACT_RATIO * store.path.stat().st_size:
+            store.apply(upserts=[page(f"n{n}")])
+            n += 1
+        assert store.journal.exists()                  # past the ratio, not yet folded
+
+        store.apply(upserts=[page("last")])            # the write after compacts
+        assert not store.journal.exists()
+        ids = [p["id"] for p in store.load(base_only=True)["pages"]]
+        assert ids == ["a", "b", "c"] + [f"n{i}" for i in range(n)] + ["last"]
+
+
+def test_journal_of_a_replaced_base_is_ignored():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = new_store(tmp)
+        store.apply(upserts=[page("stale")])
+        journal = store.journal.read_bytes()
+
+        # A crash between replacing the base and deleting the journal leaves
+        # the old journal next to a new base.
+        store.replace({"timestamp": 5, "pages": [page("z")]})
+        store.journal.write_bytes(journal)
+        assert [p["id"] for p in store.load()["pages"]] == ["z"]
+
+
+def test_missing_or_corrupt_base():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = PageStore(Path(tmp) / "db.json")
+        assert store.load() is None
+        store.path.write_text("{not json", encoding="utf-8")
+        assert store.load() is None
+        store.save([page("a")], timestamp=1)           # creates the base
+        assert store.load() == {"timestamp": 1, "pages": [page("a")]}
+        os.remove(store.path)
+        assert store.load() is None
+
+
+def main():
+    tests = [(name, fn) for name, fn in globals().items()
+             if name.startswith("test_") and callable(fn)]
+    for name, fn in tests:
+        fn()
+        print(f"ok  {name}")
+    print(f"\n{len(tests)} tests passed")
+
+
+if __name__ == '__main__':
+    main()
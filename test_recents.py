@@ -0,0 +1,172 @@
+"""
+Standalone test for the page selector's recents store (recents.py).
+Run from the repo root with:
+    python test_recents.py
+No Anki installation required — works in a temporary directory.
+"""
+import json
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from recents import FORMAT_VERSION, RecentsStore
+from task_executor import TaskExecutor
+
+TIMEOUT = 5
+DB, OTHER = "db-subjects", "db-pharm"
+
+
+def saved(path) -> list:
+    with Path(path).open(encoding="utf-8") as f:
+        data = json.load(f)
+    assert data["version"] == FORMAT_VERSION
+    return [(r["db"], r["id"], r["count"]) for r in data["recents"]]
+
+
+class HeldStore(RecentsStore):
+    """Holds its first write until released, to record while it runs."""
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.writing = threading.Event()
+        self.release = threading.Event()
+        self.writes = 0
+
+    def _write(self, data):
+        self.writes += 1
+        if self.writes == 1:
+            self.writing.set()
+            assert self.release.wait(TIMEOUT)
+        super()._write(data)
+
+
+def test_record_during_running_flush_is_written():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "recents.json"
+        executor = TaskExecutor(max_workers=1)
+        writes = iter(range(1000))
+        store = HeldStore(path, schedule=lambda fn: executor.submit(("recents", next(writes)), fn))
+
+        store.record(DB, "p1")
+        assert store.writing.wait(TIMEOUT)       # the first write is under way
+        store.record(DB, "p2")                   # lands while it runs
+        store.record(OTHER, "p3")
+        store.release.set()
+
+        done = threading.Event()
+        executor.submit("drain", lambda: None, priority=99, callback=done.set)
+        assert done.wait(TIMEOUT)
+        assert saved(path) == [(DB, "p1", 1), (DB, "p2", 1), (OTHER, "p3", 1)]
+        assert store.writes == 2                 # the two late records: one write
+        assert not store._write_pending          # the next record schedules again
+
+
+def test_record_as_the_write_task_ends_is_written():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "recents.json"
+        executor = TaskExecutor(max_workers=1)
+        writes = iter(range(1000))
+        flushed, release = threading.Event(), threading.Event()
+
+        def schedule(fn):
+            def write():
+                fn()
+                flushed.set()                    # flush is done, the task not yet
+                assert release.wait(TIMEOUT)
+            executor.submit(("recents", next(writes)), write)
+        store = RecentsStore(path, schedule=schedule)
+
+        store.record(DB, "p1")
+        assert flushed.wait(TIMEOUT)
+        store.record(DB, "p2")                   # must not join the ending task
+        release.set()
+
+        done = threading.Event()
+        executor.submit("drain", lambda: None, priority=99, callback=done.set)
+        assert done.wait(TIMEOUT)
+        assert saved(path) == [(DB, "p1", 1), (DB, "p2", 1)]
+
+
+def test_concurrent_records_are_all_saved():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "recents.json"
+        executor = TaskExecutor(max_workers=2)
+        writes = iter(range(10000))
+        lock = threading.Lock()
+
+        def schedule(fn):
+            with lock:
+                key = next(writes)
+            executor.submit(("recents", key), fn)
+        store = RecentsStore(path, schedule=schedule)
+
+        def use(n):
+            for i in range(8):
+                store.record(DB, f"t{n}-{i}")
+        threads = [threading.Thread(target=use, args=(n,)) for n in range(6)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        store.flush()
+        assert len(saved(path)) == 48
+
+
+def test_legacy_list_is_converted():
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy = Path(tmp) / "recent_tags.json"
+        legacy.write_text(json.dumps([     # newest first, whole page dicts
+            {"page_id": "newest", "database_name": "Subjects", "page_data": {"id": "newest"}},
+            {"database_name": "Pharmacology", "page_data": {"id": "from-page-data"}},
+            {"page_id": "gone", "database_name": "Removed database"},
+            {"page_id": "oldest", "database_name": "Subjects", "page_data": {}},
+        ]), encoding="utf-8")
+        path = Path(tmp) / "user_files" / "recents.json"
+        store = RecentsStore(path, legacy_path=legacy,
+                             database_ids={"Subjects": DB, "Pharmacology": OTHER})
+
+        assert [(r["db"], r["id"]) for r in store.ranked()] == [
+            (DB, "newest"), (OTHER, "from-page-data"), (DB, "oldest")]
+        store.flush()                            # rewritten in the compact format
+        assert saved(path) == [(DB, "newest", 1), (OTHER, "from-page-data", 1), (DB, "oldest", 1)]
+        assert RecentsStore(path, legacy_path=legacy).ranked()[0]["id"] == "newest"
+
+
+def test_ranking_and_boosts():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "recents.json"
+        now = time.time()
+        day = 86400
+        path.write_text(json.dumps({"version": FORMAT_VERSION, "recents": [
+            {"db": DB, "id": "daily", "subtag": None, "count": 20, "last_used": now - day},
+            {"db": DB, "id": "once-long-ago", "subtag": None, "count": 3, "last_used": now - 60 * day},
+            {"db": DB, "id": "twice", "subtag": "Management", "count": 2, "last_used": now - 2 * day},
+            {"db": OTHER, "id": "drug", "subtag": None, "count": 1, "last_used": now - 3 * day},
+        ]}), encoding="utf-8")
+        store = RecentsStore(path)
+        assert [r["id"] for r in store.ranked()] == ["daily", "twice", "drug", "once-long-ago"]
+
+        store.record(OTHER, "drug", subtag="Indications")
+        ranked = store.ranked(limit=2)
+        assert [r["id"] for r in ranked] == ["drug", "daily"]      # most recent always first
+        assert ranked[0]["subtag"] == "Indications" and ranked[0]["count"] == 2
+
+        boosts = store.boosts(DB)
+        assert set(boosts) == {"daily", "once-long-ago", "twice"}
+        assert 0 < boosts["once-long-ago"] < boosts["twice"] < boosts["daily"] < 1
+        assert store.boosts(DB) is boosts        # cached until the next record
+        store.record(DB, "twice")
+        assert store.boosts(DB)["twice"] > boosts["twice"]
+
+
+def main():
+    tests = [(name, fn) for name, fn in globals().items()
+             if name.startswith("test_") and callable(fn)]
+    for name, fn in tests:
+        fn()
+        print(f"ok  {name}")
+    print(f"\n{len(tests)} tests passed")
+
+
+if __name__ == '__main__':
+    main()
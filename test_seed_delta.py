@@ -0,0 +1,110 @@
+"""
+Standalone test for seed delta chains (seed_delta.py).
+Run from the repo root with:
+    python test_seed_delta.py
+No Anki installation required — works in a temporary directory.
+"""
+import json
+import tempfile
+from pathlib import Path
+
+from seed_delta import (DELTA_DIR, apply_delta, chain_from, content_hash,
+                        publish)
+
+DB = "db"
+
+
+# Pages every version shares, so a few edits make a delta well under
+# MAX_DELTA_RATIO of the seed.
+COMMON = [(f"p{i:02}", f"Page {i}") for i in range(40)]
+
+
+def seed(*pages, **meta):
+    return {"version": 1, **meta,
+            "pages": [{"id": page_id, "title": title} for page_id, title in pages]}
+
+
+def publish_all(cache_dir, *docs) -> dict:
+    """Publish each seed as the successor of the one before; the last index."""
+    previous = {}
+    for doc in docs:
+        index = publish(cache_dir, DB, previous, doc)
+        previous = doc
+    return index
+
+
+def patch(cache_dir, doc, index):
+    """What a client holding `doc` ends up with after walking the chain."""
+    for entry in chain_from(index, content_hash(doc)):
+        with (Path(cache_dir) / DELTA_DIR / DB / entry["file"]).open(encoding="utf-8") as f:
+            doc = apply_delta(doc, json.load(f))
+    return doc
+
+
+V1 = seed(("a", "A"), ("b", "B"), ("c", "C"), *COMMON, timestamp=1)
+V2 = seed(("a", "A"), ("b", "B2"), ("c", "C"), *COMMON, timestamp=2)
+V3 = seed(("e", "E"), ("a", "A"), ("b", "B2"), *COMMON, timestamp=3)
+
+
+def test_patched_hash_equals_head():
+    with tempfile.TemporaryDirectory() as tmp:
+        index = publish_all(tmp, V1, V2, V3)
+        assert index["head"] == content_hash(V3)
+        assert len(index["deltas"]) == 2
+
+        for start in (V1, V2):
+            patched = patch(tmp, start, index)
+            assert content_hash(patched) == index["head"]
+        # Page order may differ from the seed's (new pages are appended); the
+        # hash doesn't care.
+        ids = [p["id"] for p in patch(tmp, V1, index)["pages"]]
+        assert ids[:2] == ["a", "b"] and ids[-1] == "e" and "c" not in ids
+
+
+def test_chain_at_head_is_empty():
+    with tempfile.TemporaryDirectory() as tmp:
+        index = publish_all(tmp, V1, V2)
+        assert chain_from(index, content_hash(V2)) == []
+        assert publish(tmp, DB, V2, V2) == index           # unchanged seed: nothing new
+
+
+def test_unknown_base_has_no_chain():
+    with tempfile.TemporaryDirectory() as tmp:
+        index = publish_all(tmp, V1, V2, V3)
+        assert chain_from(index, content_hash(seed(("z", "Z")))) is None
+        assert chain_from(index, None) is None
+
+
+def test_gap_in_chain_has_no_chain():
+    with tempfile.TemporaryDirectory() as tmp:
+        index = publish_all(tmp, V1, V2, V3)
+        gapped = {"head": index["head"], "deltas": index["deltas"][:1] + index["deltas"][2:]}
+        assert chain_from(gapped, content_hash(V1)) is None
+        # A chain that stops short of the head is a gap too.
+        short = {"head": index["head"], "deltas": index["deltas"][:1]}
+        assert chain_from(short, content_hash(V1)) is None
+
+
+def test_oversized_delta_restarts_chain():
+    with tempfile.TemporaryDirectory() as tmp:
+        rewritten = seed(*[(page_id, title + " (renamed)") for page_id, title in COMMON],
+                         timestamp=4)
+        index = publish_all(tmp, V1, V2, rewritten)
+        assert index["head"] == content_hash(rewritten)
+        assert index["deltas"] == []
+        assert chain_from(index, content_hash(V2)) is None
+        files = {p.name for p in (Path(tmp) / DELTA_DIR / DB).iterdir()}
+        assert files == {"index.json"}                      # pruned with the chain
+
+
+def main():
+    tests = [(name, fn) for name, fn in globals().items()
+             if name.startswith("test_") and callable(fn)]
+    for name, fn in tests:
+        fn()
+        print(f"ok  {name}")
+    print(f"\n{len(tests)} tests passed")
+
+
+if __name__ == '__main__':
+    main()
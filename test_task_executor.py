@@ -0,0 +1,139 @@
+"""
+Standalone test for the background task executor (task_executor.py).
+Run from the repo root with:
+    python test_task_executor.py
+No Anki installation required — callbacks run on the worker thread.
+"""
+import threading
+import time
+
+from request_scheduler import PRIORITY_BACKGROUND, PRIORITY_INTERACTIVE, PRIORITY_SCHEDULED
+from task_executor import CANCELLED, DONE, RUNNING, TaskExecutor, check_cancelled
+
+TIMEOUT = 5
+
+
+class Gate:
+    """A task that holds the executor's only worker until opened, so what is
+    submitted meanwhile stays queued."""
+    def __init__(self, executor):
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.task = executor.submit("gate", self.run, priority=PRIORITY_INTERACTIVE)
+        assert self.started.wait(TIMEOUT)
+
+    def run(self):
+        self.started.set()
+        assert self.release.wait(TIMEOUT)
+
+    def open(self):
+        self.release.set()
+
+
+def drain(executor):
+    """Block until everything queued so far has run, callbacks included: with
+    one worker, a no-op queued behind it all runs last."""
+    done = threading.Event()
+    executor.submit(object(), lambda: None, priority=PRIORITY_BACKGROUND + 1,
+                    callback=done.set)
+    assert done.wait(TIMEOUT), "executor did not drain"
+
+
+def test_coalescing():
+    executor = TaskExecutor(max_workers=1)
+    gate = Gate(executor)
+    runs, called = [], []
+    first = executor.submit("db", lambda: runs.append(1), callback=lambda: called.append("a"))
+    second = executor.submit("db", lambda: runs.append(2), callback=lambda: called.append("b"))
+    assert second is first
+    assert [t["key"] for t in executor.tasks()] == ["gate", "db"]
+    gate.open()
+    drain(executor)
+    assert runs == [1] and called == ["a", "b"] and first.state == DONE
+
+    # A finished task is never joined: the key starts a new one.
+    third = executor.submit("db", lambda: runs.append(3))
+    assert third is not first
+    drain(executor)
+    assert runs == [1, 3]
+
+
+def test_priority_raise_on_queued_task():
+    executor = TaskExecutor(max_workers=1)
+    gate = Gate(executor)
+    order = []
+    low = executor.submit("low", lambda: order.append("low"), priority=PRIORITY_BACKGROUND)
+    mid = executor.submit("mid", lambda: order.append("mid"), priority=PRIORITY_SCHEDULED)
+    again = executor.submit("low", lambda: None, priority=PRIORITY_INTERACTIVE)
+    assert again is low and low.priority == PRIORITY_INTERACTIVE
+    # A less urgent request never lowers it.
+    executor.submit("mid", lambda: None, priority=PRIORITY_BACKGROUND)
+    assert mid.priority == PRIORITY_SCHEDULED
+    gate.open()
+    drain(executor)
+    assert order == ["low", "mid"]
+
+
+def test_supersede():
+    executor = TaskExecutor(max_workers=1)
+    gate = Gate(executor)
+    runs = []
+    task = executor.submit("db", lambda: runs.append("old"), label="old")
+    executor.submit("db", lambda: runs.append("ignored"))
+    executor.submit("db", lambda: runs.append("new"), label="new", supersede=True)
+    assert task.label == "new"
+    gate.open()
+    drain(executor)
+    assert runs == ["new"]
+
+
+def test_supersede_leaves_running_work_alone():
+    executor = TaskExecutor(max_workers=1)
+    gate = Gate(executor)
+    runs = []
+    assert executor.submit("gate", lambda: runs.append("new"), supersede=True) is gate.task
+    assert gate.task.state == RUNNING
+    gate.open()
+    drain(executor)
+    assert runs == []
+
+
+def test_cancel_all_runs_every_callback():
+    executor = TaskExecutor(max_workers=1)
+    started = threading.Event()
+    runs, called = [], []
+
+    def long_running():
+        started.set()
+        while True:                          # a paginated fetch, checking per page
+            check_cancelled()
+            time.sleep(0.01)
+
+    running = executor.submit("running", long_running, callback=lambda: called.append("running"))
+    assert started.wait(TIMEOUT)
+    queued = executor.submit("queued", lambda: runs.append("queued"),
+                             callback=lambda: called.append("queued"))
+    executor.cancel_all()
+    assert queued.state == CANCELLED and "queued" in called   # at once, never started
+    drain(executor)
+    assert running.state == CANCELLED
+    assert sorted(called) == ["queued", "running"]
+    assert runs == [] and executor.tasks() == []
+
+    # A cancelled key can be submitted afresh.
+    executor.submit("queued", lambda: runs.append("again"))
+    drain(executor)
+    assert runs == ["again"]
+
+
+def main():
+    tests = [(name, fn) for name, fn in globals().items()
+             if name.startswith("test_") and callable(fn)]
+    for name, fn in tests:
+        fn()
+        print(f"ok  {name}")
+    print(f"\n{len(tests)} tests passed")
+
+
+if __name__ == '__main__':
+    main()
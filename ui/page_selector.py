@@ -16,6 +16,7 @@ from aqt.utils import showInfo
 from ..utils import malleus_tooltip
 from PyQt6.QtGui import QDesktopServices
 import re as _re
+import time
 import anki.notes
 
 
@@ -305,6 +306,89 @@ DB_TAG_MAPPING = {
 # Maximum search results shown across all databases
 _MAX_SEARCH_RESULTS = 15
 
+# (collection path, note count, newest note mod) → every note's tag string.
+# Shared by all dialogs (and filled early by the warm-up); any note added,
+# retagged or deleted changes the key.
+_note_tags_memo = {}
+
+
+def note_tag_strings(col) -> list:
+    """Every note's raw tag string, fetched in one query and reused until the
+    collection's notes change (the key query reads only integers)."""
+    count, newest = col.db.first("select count(), max(mod) from notes")
+    key = (str(col.path), count, newest)
+    tags = _note_tags_memo.get(key)
+    if tags is None:
+        tags = col.db.list("select tags from notes")
+        _note_tags_memo.clear()
+        _note_tags_memo[key] = tags
+    return tags
+
+ROTATION_DEFS_INDEX = "page_selector.rotation_defs"
+
+
+def rotation_defs(pages) -> list:
+    """[{name, tag, group, parent}] for every Rotation page, ordered for display:
+    General first, then Internal Medicine and Surgery, each group headed by
+    its parent rotation (whose tag has no sub-level) and then alphabetical.
+    Served as a derived index of the Rotation snapshot (ROTATION_DEFS_INDEX)."""
+    defs = []
+    for p in pages:
+        props = p.get('properties', {})
+        title_list = props.get('Name', {}).get('title', [])
+        name = title_list[0]['text']['content'] if title_list else ''
+        tag_prop = props.get('Tag', {})
+        tag = ''
+        if tag_prop.get('type') == 'formula':
+            tag = (tag_prop.get('formula', {}).get('string', '') or '').strip()
+        elif tag_prop.get('type') == 'rich_text':
+            tag = ''.join(t.get('plain_text', '')
+                          for t in tag_prop.get('rich_text', [])).strip()
+        if not (name and tag.startswith(ROTATION_TAG_PREFIX)):
+            continue
+        levels = tag[len(ROTATION_TAG_PREFIX):].lstrip(':').split('::')
+        group = levels[0].replace('_', ' ') if len(levels) > 1 else "General"
+        defs.append({'name': name, 'tag': tag, 'group': group, 'parent': False})
+
+    # A rotation whose name matches another rotation's group (e.g.
+    # 'Internal Medicine') heads that group instead of sitting in General.
+    group_names = {d['group'] for d in defs}
+    for d in defs:
+        if d['group'] == "General" and d['name'] in group_names:
+            d['group'] = d['name']
+            d['parent'] = True
+
+    order = {"General": 0, "Internal Medicine": 1, "Surgery": 2}
+    defs.sort(key=lambda d: (order.get(d['group'], 99), d['group'],
+                             not d['parent'], d['name'].lower()))
+    return defs
+
+# With the `log_dialog_open` config flag on (off by default), the
+# open-to-first-paint latency of every page-selector open is appended here
+# (user_files/) for benchmarks/bench_dialog_open.py.  Capped: restarted once
+# past the limit.
+OPEN_LOG_NAME = "_dialog_open.jsonl"
+OPEN_LOG_MAX_BYTES = 64 * 1024
+
+
+def log_open_latency(addon_dir: str, latency_ms: float, reused: bool):
+    import json, os
+    print(f"[PageSelector] open → first paint: {latency_ms:.0f}ms "
+          f"({'reused' if reused else 'new'} dialog)")
+    path = os.path.join(addon_dir, "user_files", OPEN_LOG_NAME)
+    try:
+        mode = "w" if os.path.getsize(path) > OPEN_LOG_MAX_BYTES else "a"
+    except OSError:
+        mode = "a"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, mode, encoding="utf-8") as f:
+            f.write(json.dumps({"ts": round(time.time(), 3), "reused": reused,
+                                "first_paint_ms": round(latency_ms, 1)}) + "\n")
+    except OSError as e:
+        print(f"[PageSelector] could not log open latency: {e}")
+
+
 # Score multipliers applied per-database before the global top-N sort.
 # Values > 1.0 push that database's results higher; < 1.0 pushes them lower.
 _DB_SCORE_BIAS = {
@@ -354,7 +438,8 @@ from ..extra_sync import (
     SYNCED_EXTRA_DATABASE_ID, EXTRA_FIELD
 )
 from .synced_extra_dialog import SyncedExtraSelectionDialog
-from ..suggest_tags import suggest_subject_tags, invalidate_index
+from ..suggest_tags import suggest_subject_tags
+from ..derived_indexes import BY_ID, BY_TITLE, page_title
 from .tag_selection_dialog import TagSelectionDialog
 try:
     from .styles import apply_malleus_style, make_header, COLORS
@@ -385,13 +470,7 @@ class NotionPageSelector(QDialog):
         super().__init__(parent)
 
         # Initialize current_note first
-        self.current_note = None
-        if isinstance(parent, Browser) and hasattr(parent.editor, 'note'):
-            self.current_note = parent.editor.note
-        elif isinstance(parent, EditCurrent) and hasattr(parent.editor, 'note'):
-            self.current_note = parent.editor.note
-        elif isinstance(parent, AddCards) and hasattr(parent.editor, 'note'):
-            self.current_note = parent.editor.note
+        self.current_note = self._note_from_parent(parent)
         self.notion_cache = notion_cache
         self.config = config
         import os
@@ -406,9 +485,76 @@ class NotionPageSelector(QDialog):
         self._result_rows = []
         self._showing_recent = False
         self._db_chips = {}  # db_name → QPushButton (filter chips)
+        self._open_started = None   # perf_counter() of the pending open
+        self._open_reused = False
         self.setup_ui()
         apply_malleus_style(self)
 
+    @staticmethod
+    def _note_from_parent(parent):
+        if isinstance(parent, (Browser, EditCurrent, AddCards)) and hasattr(parent.editor, 'note'):
+            return parent.editor.note
+        return None
+
+    # ── Reuse across opens ────────────────────────────────────────────────────
+    #
+    # show_page_selector keeps one hidden dialog per parent window and shows it
+    # again instead of building a new one.  Everything that can change between
+    # opens is reset in reset_for_show(); the layout itself only depends on
+    # _layout_key(), and a dialog whose key no longer matches is rebuilt.
+
+    def _layout_key(self) -> tuple:
+        """What setup_ui's layout depends on (the button rows, the search button)."""
+        return (self.has_notes_to_process(), bool(self.config['autosearch']))
+
+    def can_reuse(self) -> bool:
+        return self.isHidden() and self._layout_key() == self._built_layout_key
+
+    def reset_for_show(self):
+        """Put a reused dialog back into the state of a freshly built one."""
+        self.current_note = self._note_from_parent(self.parent())
+        self.search_timer.stop()
+        self.search_input.blockSignals(True)
+        self.search_input.clear()
+        self.search_input.blockSignals(False)
+        for btn in self._db_chips.values():
+            btn.setChecked(True)
+        self._clear_checkbox_layout()
+        self._result_rows = []
+        self._showing_recent = False
+        self.results_group.setTitle("Search Results")
+        self._restore_yield_selection()
+        self._reset_rotations()
+        apply_malleus_style(self)   # no-op unless the theme changed
+        self.search_input.setFocus()
+
+    def present(self, started: float = None, reused: bool = False):
+        """Show the dialog; the work it does not need for its first frame
+        (recent tags, the cache-age tooltip) runs right after that frame is
+        painted.  `started` (perf_counter) is when the user asked for it —
+        open-to-first-paint latency is measured from there."""
+        self._open_started = time.perf_counter() if started is None else started
+        self._open_reused = reused
+        self.show()
+        self.raise_()
+        self.activateWindow()
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if self._open_started is not None:
+            latency_ms = (time.perf_counter() - self._open_started) * 1000
+            self._open_started = None
+            QTimer.singleShot(0, lambda: self._after_first_paint(latency_ms))
+
+    def _after_first_paint(self, latency_ms: float):
+        try:
+            self._show_recent_tags()
+            self._update_cache_age_label()
+        except RuntimeError:
+            return   # dialog deleted in the meantime
+        if self.config.get('log_dialog_open', False):
+            log_open_latency(self._addon_dir, latency_ms, self._open_reused)
+
     def has_notes_to_process(self):
         """Check if there are notes available to process"""
         parent = self.parent()
@@ -727,21 +873,7 @@ class NotionPageSelector(QDialog):
         yield_panel_layout.addWidget(yield_segment)
 
         # Restore previous yield selection (opt-in via remember_yield_selection)
-        if (self.config.get('remember_yield_selection', False)
-                and NotionPageSelector.last_yield_selection in self.yield_radio_buttons):
-            self._last_checked_yield = NotionPageSelector.last_yield_selection
-            _btn = self.yield_radio_buttons[NotionPageSelector.last_yield_selection]
-            _btn.setStyleSheet(_btn._active_style)
-            _r, _g, _b = _btn._yield_rgb
-            _short = {"High Yield": "High Yield", "Medium Yield": "Medium Yield",
-                      "Low Yield": "Low Yield", "Beyond Medical Student Level": "Beyond MS"}
-            self._yield_badge.setText(_short.get(NotionPageSelector.last_yield_selection, ""))
-            self._yield_badge.setStyleSheet(
-                f"font-size: 10px; color: {_btn._yield_color}; font-weight: 600;"
-                f" background: rgba({_r},{_g},{_b},0.12);"
-                f" border: 1px solid rgba({_r},{_g},{_b},0.30);"
-                " border-radius: 5px; padding: 1px 6px;"
-            )
+        self._restore_yield_selection()
 
         yield_panel.setSizePolicy(
             QSizePolicy.Policy.Expanding,
@@ -769,8 +901,8 @@ class NotionPageSelector(QDialog):
 
             def _after_update():
                 # Runs once the async update chain finishes — refreshing the
-                # suggestion index / age label any earlier would read stale data.
-                invalidate_index()
+                # age label any earlier would read stale data.  (Derived
+                # indexes follow the new cache version on their own.)
                 try:
                     self._update_cache_age_label()
                 except RuntimeError:
@@ -781,7 +913,7 @@ class NotionPageSelector(QDialog):
 
         update_database_button.clicked.connect(_on_update_database)
         self._update_database_button = update_database_button
-        self._update_cache_age_label()
+        # (cache-age tooltip: filled in after first paint — see present())
 
         guidelines_button = QPushButton("Guidelines ↗")
         guidelines_button.setObjectName("secondary")
@@ -883,9 +1015,8 @@ class NotionPageSelector(QDialog):
 
         layout.addWidget(content_widget)
         self.setLayout(layout)
-
-        # Show recent tags on first open
-        self._show_recent_tags()
+        self._built_layout_key = (has_notes, bool(self.config['autosearch']))
+        # Recent tags are shown after first paint — see present().
 
     def _remember_subtag(self, selection: str):
         """Record the user's subtag pick (always stored; restored on new rows
@@ -937,25 +1068,14 @@ class NotionPageSelector(QDialog):
 
     def _load_note_tag_strings(self) -> None:
         """
-        Fetch every note's raw tag string from the collection DB in one query
-        and cache the result on self._note_tag_strings.
+        Put every note's raw tag string (see note_tag_strings) on
+        self._note_tag_strings.
         """
         try:
-            col = mw.col
-            if col is None:
-                self._note_tag_strings = []
-                self._note_tag_strings_col = None
-                return
-            col_path = str(col.path)
-            if (getattr(self, '_note_tag_strings_col', None) == col_path
-                    and hasattr(self, '_note_tag_strings')):
-                return
-            self._note_tag_strings = col.db.list("select tags from notes")
-            self._note_tag_strings_col = col_path
+            self._note_tag_strings = note_tag_strings(mw.col) if mw.col is not None else []
         except Exception as e:
             print(f"[MalleusCardCount] failed to load note tag strings: {e}")
             self._note_tag_strings = []
-            self._note_tag_strings_col = None
 
     def _get_card_count_for_page(self, page: dict) -> int:
         """Return the number of notes tagged with this Notion page."""
@@ -1353,7 +1473,7 @@ class NotionPageSelector(QDialog):
             self._load_note_tag_strings()
 
         for suggestion in suggestions:
-            page          = suggestion['page']
+            page          = dict(suggestion['page'])    # cache snapshot page — don't mutate
             title         = suggestion['title']
             score         = suggestion['score']
             matched_terms = suggestion.get('matched_terms', [])
@@ -1419,42 +1539,57 @@ class NotionPageSelector(QDialog):
 
     def handle_yield_click(self, yield_option):
         """Handle yield segment button clicks — allow deselection of selected button."""
-        btn = self.yield_radio_buttons[yield_option]
+        if self._last_checked_yield == yield_option:
+            self._show_yield_selection(None)
+            NotionPageSelector.last_yield_selection = ""
+        else:
+            self._show_yield_selection(yield_option)
+            NotionPageSelector.last_yield_selection = yield_option
+
+    def _restore_yield_selection(self):
+        """The remembered yield when remember_yield_selection is on, else none."""
+        remembered = NotionPageSelector.last_yield_selection
+        if (self.config.get('remember_yield_selection', False)
+                and remembered in self.yield_radio_buttons):
+            self._show_yield_selection(remembered)
+        else:
+            self._show_yield_selection(None)
+
+    def _show_yield_selection(self, yield_option):
+        """Style the segment buttons and badge for `yield_option` (None: no
+        selection) without touching the session memory."""
         _short = {
             "High Yield": "High Yield",
             "Medium Yield": "Medium Yield",
             "Low Yield": "Low Yield",
             "Beyond Medical Student Level": "Beyond Medical School",
         }
+        previous = self._last_checked_yield
+        if previous == yield_option:
+            return
+        if previous in self.yield_radio_buttons:
+            old_btn = self.yield_radio_buttons[previous]
+            old_btn.setStyleSheet(old_btn._inactive_style)
+        self._last_checked_yield = yield_option
 
-        if self._last_checked_yield == yield_option:
-            # Deselect current
-            btn.setStyleSheet(btn._inactive_style)
-            self._last_checked_yield = None
-            NotionPageSelector.last_yield_selection = ""
+        if yield_option is None:
             self._yield_badge.setText("None selected")
             self._yield_badge.setStyleSheet(
                 "font-size: 10px; color: palette(placeholderText);"
                 " background: palette(midlight); border: 1px solid rgba(128,128,128,0.25);"
                 " border-radius: 5px; padding: 1px 6px;"
             )
-        else:
-            # Deselect previous
-            if self._last_checked_yield and self._last_checked_yield in self.yield_radio_buttons:
-                old_btn = self.yield_radio_buttons[self._last_checked_yield]
-                old_btn.setStyleSheet(old_btn._inactive_style)
-            # Select new
-            btn.setStyleSheet(btn._active_style)
-            self._last_checked_yield = yield_option
-            NotionPageSelector.last_yield_selection = yield_option
-            r, g, b = btn._yield_rgb
-            self._yield_badge.setText(_short.get(yield_option, yield_option))
-            self._yield_badge.setStyleSheet(
-                f"font-size: 10px; color: {btn._yield_color}; font-weight: 600;"
-                f" background: rgba({r},{g},{b},0.12);"
-                f" border: 1px solid rgba({r},{g},{b},0.30);"
-                " border-radius: 5px; padding: 1px 6px;"
-            )
+            return
+        btn = self.yield_radio_buttons[yield_option]
+        btn.setStyleSheet(btn._active_style)
+        r, g, b = btn._yield_rgb
+        self._yield_badge.setText(_short.get(yield_option, yield_option))
+        self._yield_badge.setStyleSheet(
+            f"font-size: 10px; color: {btn._yield_color}; font-weight: 600;"
+            f" background: rgba({r},{g},{b},0.12);"
+            f" border: 1px solid rgba({r},{g},{b},0.30);"
+            " border-radius: 5px; padding: 1px 6px;"
+        )
 
     def get_selected_yield_tags(self):
         """Get the selected yield tags from the segmented control."""
@@ -1523,61 +1658,41 @@ class NotionPageSelector(QDialog):
     )
 
     def _load_rotation_defs(self) -> list:
-        """[{name, tag, group}] for every Rotation page, ordered for display:
-        General first, then Internal Medicine and Surgery, each group headed by
-        its parent rotation (whose tag has no sub-level) and then alphabetical."""
+        """The Rotation cache's rotations in display order (see rotation_defs);
+        [] when the cache is missing."""
         try:
-            pages, _ = self.notion_cache.load_from_cache(
-                ROTATION_DATABASE_ID, warn_if_expired=False)
+            return self.notion_cache.index(
+                ROTATION_DATABASE_ID, ROTATION_DEFS_INDEX, rotation_defs) or []
         except Exception:
-            pages = []
-
-        defs = []
-        for p in pages or []:
-            props = p.get('properties', {})
-            title_list = props.get('Name', {}).get('title', [])
-            name = title_list[0]['text']['content'] if title_list else ''
-            tag_prop = props.get('Tag', {})
-            tag = ''
-            if tag_prop.get('type') == 'formula':
-                tag = (tag_prop.get('formula', {}).get('string', '') or '').strip()
-            elif tag_prop.get('type') == 'rich_text':
-                tag = ''.join(t.get('plain_text', '')
-                              for t in tag_prop.get('rich_text', [])).strip()
-            if not (name and tag.startswith(ROTATION_TAG_PREFIX)):
-                continue
-            levels = tag[len(ROTATION_TAG_PREFIX):].lstrip(':').split('::')
-            group = levels[0].replace('_', ' ') if len(levels) > 1 else "General"
-            defs.append({'name': name, 'tag': tag, 'group': group, 'parent': False})
-
-        # A rotation whose name matches another rotation's group (e.g.
-        # 'Internal Medicine') heads that group instead of sitting in General.
-        group_names = {d['group'] for d in defs}
-        for d in defs:
-            if d['group'] == "General" and d['name'] in group_names:
-                d['group'] = d['name']
-                d['parent'] = True
-
-        order = {"General": 0, "Internal Medicine": 1, "Surgery": 2}
-        defs.sort(key=lambda d: (order.get(d['group'], 99), d['group'],
-                                 not d['parent'], d['name'].lower()))
-        return defs
+            return []
+
+    def _selectable_rotations(self) -> dict:
+        """tag → display name of every rotation that can be picked, in display
+        order.  Parent rotations (Internal Medicine / Surgery) are headings
+        only — they are not selectable."""
+        return {d['tag']: d['name'] for d in self._load_rotation_defs() if not d['parent']}
 
     def _build_rotations_panel(self) -> QFrame:
         """
-        Collapsible full-width panel with every rotation as a checkable chip.
-
-        Chips are pre-selected from the rotation tags embedded in the checked
-        result rows (Subjects directly, eTG via linked Subjects, Guidelines via
-        their Rotation relation); the user can tick extras or untick any of
-        them.  The panel is authoritative: the tags applied to notes contain
-        exactly the checked rotations (embedded ones are stripped elsewhere).
+        Collapsible full-width panel for picking rotations.
+
+        Rotations are pre-selected from the rotation tags embedded in the
+        checked result rows (Subjects directly, eTG via linked Subjects,
+        Guidelines via their Rotation relation); the user can tick extras or
+        untick any of them.  The panel is authoritative: the tags applied to
+        notes contain exactly the selected rotations (embedded ones are
+        stripped elsewhere).
+
+        The selection lives in _rotation_auto / _rotation_overrides; only the
+        collapsed summary is built here.  The chip cloud of every rotation is
+        built the first time the panel is expanded.
         """
-        self._rotation_chips = {}       # tag → chip QPushButton
-        self._rotation_names = {}       # tag → display name
+        self._rotation_chips = {}       # tag → chip QPushButton (once expanded)
         self._rotation_overrides = {}   # tag → bool (user forced on/off)
         self._rotation_auto = set()     # tags auto-derived from checked rows
         self._rotation_expanded = False
+        self._rotation_full_area = None
+        self._rotation_cloud_defs = None   # the defs the chip cloud was built from
 
         panel = QFrame()
         panel.setObjectName("card_panel")
@@ -1585,6 +1700,7 @@ class NotionPageSelector(QDialog):
         v = QVBoxLayout(panel)
         v.setContentsMargins(10, 10, 10, 10)
         v.setSpacing(6)
+        self._rotation_panel_layout = v
 
         # ── Header: title + badge + hint + expand/collapse toggle ──────────
         header = QHBoxLayout()
@@ -1613,25 +1729,29 @@ class NotionPageSelector(QDialog):
         header.addWidget(self._rotation_toggle_btn)
         v.addLayout(header)
 
-        defs = self._load_rotation_defs()
+        # ── Collapsed view: just the selected chips (click to remove) ──────
+        self._rotation_summary_host = QWidget()
+        self._rotation_summary_host.setStyleSheet("background: transparent;")
+        self._rotation_summary_flow = _FlowLayout(self._rotation_summary_host)
+        v.addWidget(self._rotation_summary_host)
+
+        self._refresh_rotation_summary()
+        return panel
+
+    def _build_rotation_chip_cloud(self):
+        """Expanded view: every rotation as a checkable chip, grouped, inside a
+        capped scroll area.  Built on first expand."""
+        defs = self._rotation_cloud_defs = self._load_rotation_defs()
         if not defs:
             empty = QLabel("Rotation list unavailable — use ↻ Update Database to download it.")
             empty.setStyleSheet(
                 "font-size: 11px; color: palette(placeholderText); background: transparent;"
             )
-            v.addWidget(empty)
+            self._rotation_full_area = empty
+            self._rotation_panel_layout.addWidget(empty)
             self._rotation_toggle_btn.setVisible(False)
-            self._rotation_summary_host = None
-            self._rotation_full_area = None
-            return panel
-
-        # ── Collapsed view: just the selected chips (click to remove) ──────
-        self._rotation_summary_host = QWidget()
-        self._rotation_summary_host.setStyleSheet("background: transparent;")
-        self._rotation_summary_flow = _FlowLayout(self._rotation_summary_host)
-        v.addWidget(self._rotation_summary_host)
+            return
 
-        # ── Expanded view: grouped chip cloud inside a capped scroll area ──
         full_widget = QWidget()
         full_widget.setStyleSheet("background: transparent;")
         fa = QVBoxLayout(full_widget)
@@ -1651,8 +1771,6 @@ class NotionPageSelector(QDialog):
             flow_host.setStyleSheet("background: transparent;")
             flow = _FlowLayout(flow_host)
             for d in defs:
-                # Parent rotations (Internal Medicine / Surgery) are headings
-                # only — they are not selectable, so no chip is created.
                 if d['group'] != group or d['parent']:
                     continue
                 chip = QPushButton(_fix_amp_display(d['name']))
@@ -1664,33 +1782,54 @@ class NotionPageSelector(QDialog):
                 )
                 flow.addWidget(chip)
                 self._rotation_chips[d['tag']] = chip
-                self._rotation_names[d['tag']] = d['name']
             fa.addWidget(flow_host)
 
-        self._rotation_full_area = QScrollArea()
-        self._rotation_full_area.setWidgetResizable(True)
-        self._rotation_full_area.setFrameShape(QFrame.Shape.NoFrame)
+        area = QScrollArea()
+        area.setWidgetResizable(True)
+        area.setFrameShape(QFrame.Shape.NoFrame)
         # The global stylesheet gives QScrollArea a border — the chip cloud
         # lives inside the card panel, so keep this one frameless.
-        self._rotation_full_area.setStyleSheet(
-            "QScrollArea { background: transparent; border: none; }"
-        )
-        self._rotation_full_area.setWidget(full_widget)
-        self._rotation_full_area.setMaximumHeight(200)
-        self._rotation_full_area.setVisible(False)
-        v.addWidget(self._rotation_full_area)
-
-        self._refresh_rotation_summary()
-        return panel
+        area.setStyleSheet("QScrollArea { background: transparent; border: none; }")
+        area.setWidget(full_widget)
+        area.setMaximumHeight(200)
+        area.setVisible(False)
+        self._rotation_full_area = area
+        self._rotation_panel_layout.addWidget(area)
+        self._sync_rotation_chips()
 
     def _set_rotation_expanded(self, expanded: bool):
+        if expanded and self._rotation_full_area is None:
+            self._build_rotation_chip_cloud()
         self._rotation_expanded = expanded
         if self._rotation_full_area is not None:
             self._rotation_full_area.setVisible(expanded)
-        if self._rotation_summary_host is not None:
-            self._rotation_summary_host.setVisible(not expanded)
+        self._rotation_summary_host.setVisible(not expanded)
         self._rotation_toggle_btn.setText("Hide  ▴" if expanded else "Show all  ▾")
 
+    def _reset_rotations(self):
+        """Back to the state of a freshly opened dialog: nothing selected,
+        collapsed.  A built chip cloud is kept while the Rotation cache it was
+        built from is still current."""
+        self._rotation_overrides = {}
+        self._rotation_auto = set()
+        self._set_rotation_expanded(False)
+        if (self._rotation_full_area is not None
+                and self._load_rotation_defs() is not self._rotation_cloud_defs):
+            # The Rotation cache changed (or was missing): rebuild on expand.
+            self._rotation_full_area.deleteLater()
+            self._rotation_full_area = None
+            self._rotation_chips = {}
+            self._rotation_toggle_btn.setVisible(True)
+        self._sync_rotation_chips()
+        self._refresh_rotation_summary()
+
+    def _sync_rotation_chips(self):
+        """Make the chip cloud (if built) show the current selection."""
+        for tag, chip in self._rotation_chips.items():
+            want = self._rotation_overrides.get(tag, tag in self._rotation_auto)
+            if chip.isChecked() != want:
+                chip.setChecked(want)   # setChecked() does not emit clicked
+
     def _on_rotation_chip_clicked(self, tag: str, checked: bool):
         """Record a manual chip toggle.  A toggle back to what auto-selection
         would give simply drops the override, so the chip follows the rows again."""
@@ -1704,7 +1843,7 @@ class NotionPageSelector(QDialog):
         chip = self._rotation_chips.get(tag)
         if chip is not None:
             chip.setChecked(False)
-            self._on_rotation_chip_clicked(tag, False)
+        self._on_rotation_chip_clicked(tag, False)
 
     def _refresh_rotation_summary(self):
         """Rebuild the collapsed-view chips and the count badge."""
@@ -1718,8 +1857,6 @@ class NotionPageSelector(QDialog):
             self._rotation_badge.setText(f"{n} selected")
             self._rotation_badge.setStyleSheet(self._ROT_BADGE_ON)
 
-        if self._rotation_summary_host is None:
-            return
         while self._rotation_summary_flow.count():
             item = self._rotation_summary_flow.takeAt(0)
             w = item.widget()
@@ -1734,10 +1871,9 @@ class NotionPageSelector(QDialog):
             )
             self._rotation_summary_flow.addWidget(placeholder)
         else:
+            names = self._selectable_rotations()
             for tag in selected:
-                b = QPushButton(
-                    _fix_amp_display(self._rotation_names.get(tag, tag)) + "  ✕"
-                )
+                b = QPushButton(_fix_amp_display(names.get(tag, tag)) + "  ✕")
                 b.setStyleSheet(self._ROT_SUMMARY_CHIP_STYLE)
                 b.setToolTip("Remove this rotation")
                 b.clicked.connect(lambda _, t=tag: self._summary_remove_rotation(t))
@@ -1746,9 +1882,9 @@ class NotionPageSelector(QDialog):
         self._rotation_summary_host.updateGeometry()
 
     def _recompute_rotation_autoselect(self):
-        """Sync chip states with the rotation tags embedded in the checked
-        result rows.  Chips the user has manually toggled keep their state."""
-        if not getattr(self, '_rotation_chips', None):
+        """Sync the selection with the rotation tags embedded in the checked
+        result rows.  Rotations the user has manually toggled keep their state."""
+        if not hasattr(self, '_rotation_auto'):
             return
         rows = self._get_selected_rows()
         auto = set()
@@ -1758,100 +1894,79 @@ class NotionPageSelector(QDialog):
                         if t.startswith(ROTATION_TAG_PREFIX)}
             except Exception as e:
                 print(f"[Rotations] autoselect failed: {e}")
-        auto &= set(self._rotation_chips)
+            auto &= set(self._selectable_rotations())
+        if auto == self._rotation_auto:
+            return
         self._rotation_auto = auto
-
-        for tag, chip in self._rotation_chips.items():
-            want = self._rotation_overrides.get(tag, tag in auto)
-            if chip.isChecked() != want:
-                chip.setChecked(want)   # setChecked() does not emit clicked
+        self._sync_rotation_chips()
         self._refresh_rotation_summary()
 
+    def _rotation_chip_tags(self) -> set:
+        """Rotation tags the panel is authoritative for (the selectable ones)."""
+        return set(self._selectable_rotations())
+
     def get_selected_rotation_tags(self) -> list:
-        """All rotation tags currently checked in the panel (auto + manual)."""
-        if not getattr(self, '_rotation_chips', None):
+        """All rotation tags currently selected in the panel (auto + manual)."""
+        if not hasattr(self, '_rotation_auto'):
             return []
-        return [t for t, chip in self._rotation_chips.items() if chip.isChecked()]
+        return [t for t in self._selectable_rotations()
+                if self._rotation_overrides.get(t, t in self._rotation_auto)]
 
     def get_manual_rotation_tags(self) -> list:
         """Only the rotation tags the user explicitly turned on.  Used by
         Remove Tags so auto pre-selected chips never widen a removal."""
-        if not getattr(self, '_rotation_chips', None):
+        if not hasattr(self, '_rotation_overrides'):
             return []
+        selectable = self._selectable_rotations()
         return [t for t, forced_on in self._rotation_overrides.items()
-                if forced_on and t in self._rotation_chips
-                and self._rotation_chips[t].isChecked()]
+                if forced_on and t in selectable]
 
-    # ── Recent tags ───────────────────────────────────────────────────────────
 
-    def _recent_tags_path(self):
-        """Recents live in user_files/ so they survive add-on updates.
-        Migrates the legacy <addon>/recent_tags.json on first use."""
-        import os, shutil
-        user_files = os.path.join(self._addon_dir, "user_files")
-        new_path = os.path.join(user_files, "recent_tags.json")
-        old_path = os.path.join(self._addon_dir, "recent_tags.json")
-        try:
-            os.makedirs(user_files, exist_ok=True)
-            if not os.path.exists(new_path) and os.path.exists(old_path):
-                shutil.copy2(old_path, new_path)
-        except OSError as e:
-            print(f"[Malleus] recent-tags migration skipped: {e}")
-        return new_path
-
-    def _load_recent_tags(self):
-        """Load the list of recently used page selections from disk."""
-        import json, os
-        path = self._recent_tags_path()
-        if not os.path.exists(path):
-            return []
-        try:
-            with open(path, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except Exception:
-            return []
+    # ── Recent tags ───────────────────────────────────────────────────────────
+    #
+    # Recents are (database, page id, subtag, count, last used) records in
+    # notion_cache.recents (see recents.py): recorded in memory, written in the
+    # background, and resolved against the cache snapshots when shown.
 
-    def _save_recent_tag(self, page, database_name=None):
-        """Prepend a page to the recent tags list and persist it (max 8 entries)."""
-        import json
+    def _save_recent_tag(self, page, database_name=None, subtag=None):
+        """Count one use of `page` (and the subtag picked with it)."""
         if database_name is None:
             database_name = page.get('_database_name', '')
         try:
-            title = ""
-            if database_name == "Textbooks":
-                title = (page.get('properties', {}).get('Search Term', {})
-                         .get('formula', {}).get('string', '') or "Untitled")
-            else:
-                title_list = page.get('properties', {}).get('Name', {}).get('title', [])
-                title = title_list[0]['text']['content'] if title_list else "Untitled"
-
-            suffix = (page.get('properties', {}).get('Search Suffix', {})
-                      .get('formula', {}).get('string', ''))
-            # Prefix emoji lives in the badge widget, not stored in display_text
-            display_text = _fix_amp_display(f"{title} {suffix}".strip())
-
-            entry = {
-                'page_id': page.get('id', ''),
-                'database_name': database_name,
-                'display_text': display_text,
-                'page_data': page,
-            }
-
-            recent = self._load_recent_tags()
-            recent = [r for r in recent if r.get('page_id') != entry['page_id']]
-            recent.insert(0, entry)
-            recent = recent[:8]
-
-            with open(self._recent_tags_path(), 'w', encoding='utf-8') as f:
-                json.dump(recent, f)
-        except Exception:
-            pass
+            self.notion_cache.recents.record(
+                get_database_id(database_name), page.get('id', ''), subtag or None)
+        except Exception as e:
+            print(f"[Malleus] could not record recent page: {e}")
+
+    def _save_recent_rows(self, rows):
+        """_save_recent_tag for result rows, with each row's chosen subtag."""
+        for row_data in rows:
+            combo = row_data.get('subtag_combo')
+            self._save_recent_tag(row_data['page'],
+                                  subtag=combo.currentText() if combo is not None else None)
+
+    def _load_recent_tags(self) -> list:
+        """[(page, database name, subtag)] to show, best first: the store's
+        ranking resolved against the current snapshots (pages no longer in
+        the cache are skipped).  The pages are copies — safe to stamp."""
+        entries = []
+        for record in self.notion_cache.recents.ranked():
+            db_name = get_database_name(record['db'])
+            # Rotation rows no longer exist in the UI
+            if db_name == 'Rotation' or db_name not in DB_TAG_MAPPING:
+                continue
+            page = self.notion_cache.index(record['db'], BY_ID).get(record['id'])
+            if page is not None:
+                entries.append((dict(page), db_name, record.get('subtag')))
+        return entries
 
     def _show_recent_tags(self):
         """Populate the checkbox layout with recently used tags."""
-        recent = self._load_recent_tags()
-        # Rotation rows no longer exist in the UI — drop legacy recents entries
-        recent = [r for r in recent if r.get('database_name') != 'Rotation']
+        try:
+            recent = self._load_recent_tags()
+        except Exception as e:
+            print(f"[Malleus] could not load recent pages: {e}")
+            return
         if not recent:
             return
 
@@ -1877,11 +1992,7 @@ class NotionPageSelector(QDialog):
 
         self.checkbox_layout.addWidget(sep_widget)
 
-        for entry in recent:
-            page = entry.get('page_data')
-            if not page:
-                continue
-            db_name = entry.get('database_name', '')
+        for page, db_name, subtag in recent:
             # Stamp _database_name so the badge and subtag combo render correctly
             page['_database_name'] = db_name
 
@@ -1913,6 +2024,11 @@ class NotionPageSelector(QDialog):
             row, cb, subtag_combo = self._make_result_row(
                 _fix_amp_display(title), page, show_count=False, subtitle=_subtitle
             )
+            # Offer the subtag last picked for this page
+            if subtag_combo is not None and subtag:
+                idx = subtag_combo.findText(subtag)
+                if idx >= 0:
+                    subtag_combo.setCurrentIndex(idx)
             self.checkbox_layout.addWidget(row)
             self._result_rows.append({
                 'page': page,
@@ -1934,7 +2050,8 @@ class NotionPageSelector(QDialog):
             oldest_name = ""
             missing_name = None
             for db_id, db_name in DATABASES:
-                _, ts = self.notion_cache.load_from_cache(db_id, warn_if_expired=False)
+                snapshot = self.notion_cache.snapshot(db_id)
+                ts = snapshot.timestamp if snapshot is not None else 0
                 if ts <= 0:   # no cache file yet (e.g. right after an add-on update)
                     missing_name = db_name
                     break
@@ -1987,13 +2104,14 @@ class NotionPageSelector(QDialog):
     def _search_single_database(self, db_id: str, db_name: str, search_term: str) -> list:
         """
         Load one database from cache, filter by search_term, stamp each result
-        with _database_name, and return the filtered page list.
+        with _database_name, and return the filtered page list (filter_pages
+        hits are copies, so stamping them leaves the cache snapshot alone).
         """
         try:
             cached_pages, _ = self.notion_cache.load_from_cache(db_id)
             if not cached_pages:
                 return []
-            results = self.notion_cache.filter_pages(cached_pages, search_term)
+            results = self.notion_cache.filter_pages(cached_pages, search_term, db_id)
             for page in results:
                 page['_database_name'] = db_name
             return results
@@ -2099,58 +2217,36 @@ class NotionPageSelector(QDialog):
     # ── Tag extraction helpers ────────────────────────────────────────────────
 
     def _load_id_lookup(self, database_id: str) -> dict:
-        """Load a database's cache and index it by page id (dash + dash-less).
-        Memoized per dialog instance — the rotation auto-select recomputes on
-        every checkbox toggle and must not re-read the JSON from disk each time."""
-        memo = getattr(self, '_id_lookup_memo', None)
-        if memo is None:
-            memo = self._id_lookup_memo = {}
-        if database_id not in memo:
-            pages, _ = self.notion_cache.load_from_cache(database_id)
-            lookup = {}
-            for p in pages:
-                lookup[p['id']] = p
-                lookup[p['id'].replace('-', '')] = p
-            memo[database_id] = lookup
-        return memo[database_id]
+        """The database's id → page index (dash + dash-less keys).  Served by
+        the cache's derived-index registry: built once per cache version and
+        shared with every other dialog — the rotation auto-select asks again
+        on every checkbox toggle."""
+        return self.notion_cache.index(database_id, BY_ID)
 
     # ── Related-subject rows (Pharmacology → Subjects) ────────────────────────
 
     @staticmethod
     def _page_title(page: dict) -> str:
-        return "".join(t.get('plain_text', '')
-                       for t in page.get('properties', {}).get('Name', {}).get('title', []))
+        return page_title(page)
 
     def _active_subjects_index(self):
         """(by_id, by_name) index of the ACTIVE Subjects cache (the one the add-on
         uses — generated for the testing copy, formula-based for the original)."""
-        if getattr(self, '_rs_active_idx', None) is None:
-            by_id, by_name = {}, {}
-            pages, _ = self.notion_cache.load_from_cache(SUBJECT_DATABASE_ID)
-            for p in pages:
-                by_id[p['id']] = p
-                by_id[p['id'].replace('-', '')] = p
-                by_name.setdefault(self._page_title(p), p)
-            self._rs_active_idx = (by_id, by_name)
-        return self._rs_active_idx
+        return (self.notion_cache.index(SUBJECT_DATABASE_ID, BY_ID),
+                self.notion_cache.index(SUBJECT_DATABASE_ID, BY_TITLE))
 
     def _original_subjects_byid(self):
         """id→page index of the ORIGINAL Subjects cache, used only to bridge the
         testing pharma copy's `Related Subject` ids (which point at original
         subject ids) to a name we can find in the active cache.  Empty when the
         active cache already IS the original (release)."""
-        if getattr(self, '_rs_orig_idx', None) is None:
-            idx = {}
-            if SUBJECT_DATABASE_ID_ORIGINAL != SUBJECT_DATABASE_ID:
-                try:
-                    pages, _ = self.notion_cache.load_from_cache(SUBJECT_DATABASE_ID_ORIGINAL)
-                    for p in pages:
-                        idx[p['id']] = p
-                        idx[p['id'].replace('-', '')] = p
-                except Exception as e:
-                    print(f"[RelatedSubject] could not load original subjects cache: {e}")
-            self._rs_orig_idx = idx
-        return self._rs_orig_idx
+        if SUBJECT_DATABASE_ID_ORIGINAL == SUBJECT_DATABASE_ID:
+            return {}
+        try:
+            return self.notion_cache.index(SUBJECT_DATABASE_ID_ORIGINAL, BY_ID)
+        except Exception as e:
+            print(f"[RelatedSubject] could not load original subjects cache: {e}")
+            return {}
 
     def _resolve_related_subjects(self, page: dict, relation_prop: str) -> list:
         """Resolve a page's subject-relation ids (Pharmacology `Related Subject`
@@ -2303,15 +2399,9 @@ class NotionPageSelector(QDialog):
             pharmacology_lookup = {}
 
             if property_name in subjects_subtags:
-                subject_pages, _ = self.notion_cache.load_from_cache(SUBJECT_DATABASE_ID)
-                for p in subject_pages:
-                    subjects_lookup[p['id']] = p
-                    subjects_lookup[p['id'].replace('-', '')] = p
+                subjects_lookup = self._load_id_lookup(SUBJECT_DATABASE_ID)
             elif property_name in pharmacology_subtags:
-                pharm_pages, _ = self.notion_cache.load_from_cache(PHARMACOLOGY_DATABASE_ID)
-                for p in pharm_pages:
-                    pharmacology_lookup[p['id']] = p
-                    pharmacology_lookup[p['id'].replace('-', '')] = p
+                pharmacology_lookup = self._load_id_lookup(PHARMACOLOGY_DATABASE_ID)
 
             return self._get_etg_tags_for_page(
                 page, property_name,
@@ -2401,7 +2491,7 @@ class NotionPageSelector(QDialog):
         if not selected_rows:
             return ["#Malleus_CM::#TO_BE_TAGGED"]
 
-        chip_tags = set(getattr(self, '_rotation_chips', {}) or {})
+        chip_tags = self._rotation_chip_tags()
         tags = [t for t in self._tags_for_rows(selected_rows)
                 if t not in chip_tags]
         return tags if tags else ["#Malleus_CM::#TO_BE_TAGGED"]
@@ -2478,8 +2568,7 @@ class NotionPageSelector(QDialog):
         else:
             open_browser_with_search(search_query)
 
-        for row_data in selected_rows:
-            self._save_recent_tag(row_data['page'])
+        self._save_recent_rows(selected_rows)
 
         self.accept()
 
@@ -3074,8 +3163,7 @@ class NotionPageSelector(QDialog):
         if len(notes) == 1:
             result = self._add_tags_single_note(notes[0], selected_rows)
             if result:
-                for row_data in selected_rows:
-                    self._save_recent_tag(row_data['page'])
+                self._save_recent_rows(selected_rows)
                 parent = self.parent()
                 if isinstance(parent, Browser):
                     parent.model.reset()
@@ -3127,8 +3215,7 @@ class NotionPageSelector(QDialog):
             notes_modified += 1
 
         if notes_modified > 0:
-            for row_data in selected_rows:
-                self._save_recent_tag(row_data['page'])
+            self._save_recent_rows(selected_rows)
 
         if isinstance(parent, Browser):
             parent.model.reset()
@@ -3322,7 +3409,7 @@ class NotionPageSelector(QDialog):
                 notes_modified += 1
 
         if notes_modified > 0:
-            self._save_recent_tag(page)
+            self._save_recent_rows([selected_row])
 
         if isinstance(parent, Browser):
             parent.model.reset()
@@ -3412,7 +3499,7 @@ class NotionPageSelector(QDialog):
         # The Rotations panel is authoritative — replace embedded rotation tags
         # with the panel's current selection.  Tags with no chip (non-selectable
         # parents) pass through untouched.
-        chip_tags = set(getattr(self, '_rotation_chips', {}) or {})
+        chip_tags = self._rotation_chip_tags()
         new_tags = [t for t in new_tags if t not in chip_tags]
 
         # ── Rebuild final tag list ────────────────────────────────────────────
@@ -8,6 +8,7 @@ Design philosophy:
   - Styled interactive elements (buttons, inputs, indicators) work in both modes
   - Semi-transparent rgba borders adapt to whatever background is underneath
 """
+from functools import lru_cache
 
 # ── Design tokens ─────────────────────────────────────────────────────────────
 COLORS = {
@@ -405,24 +406,16 @@ QDialogButtonBox QPushButton {{
 """
 
 
-def apply_malleus_style(widget):
-    """
-    Apply the Malleus stylesheet to a widget and all its children.
-
-    QToolTip background is resolved to a concrete hex colour at call time
-    because ``palette(toolTipBase)`` is unreliable on macOS / some Qt builds
-    and renders as fully transparent.  We sample the current app palette and
-    pick appropriate light / dark colours ourselves.
-    """
-    try:
-        from aqt.qt import QApplication, QPalette
-        pal  = QApplication.instance().palette()
-        dark = pal.color(QPalette.ColorRole.Window).lightness() < 128
+@lru_cache(maxsize=4)
+def _stylesheet(dark) -> str:
+    """MALLEUS_STYLE plus the QToolTip colours for a dark (True), light
+    (False) or unknown (None) palette — built once per theme."""
+    if dark is None:
+        tt_bg, tt_text, tt_border = "#fffde7", "#1a1a1a", "rgba(160,140,80,0.55)"
+    else:
         tt_bg   = "#2b2b2b" if dark else "#f5f5f5"
         tt_text = "#e6e6e6" if dark else "#1a1a1a"
         tt_border = "rgba(120,120,120,0.55)" if dark else "rgba(120,120,120,0.40)"
-    except Exception:
-        tt_bg, tt_text, tt_border = "#fffde7", "#1a1a1a", "rgba(160,140,80,0.55)"
 
     tooltip_override = f"""
 QToolTip {{
@@ -435,7 +428,31 @@ QToolTip {{
     opacity: 255;
 }}
 """
-    widget.setStyleSheet(MALLEUS_STYLE + tooltip_override)
+    return MALLEUS_STYLE + tooltip_override
+
+
+def apply_malleus_style(widget):
+    """
+    Apply the Malleus stylesheet to a widget and all its children.
+
+    QToolTip background is resolved to a concrete hex colour at call time
+    because ``palette(toolTipBase)`` is unreliable on macOS / some Qt builds
+    and renders as fully transparent.  We sample the current app palette and
+    pick appropriate light / dark colours ourselves.
+
+    The sheet is built once per theme, and a widget that already carries it
+    (a reused dialog) is left alone — setStyleSheet re-polishes every child.
+    """
+    try:
+        from aqt.qt import QApplication, QPalette
+        pal  = QApplication.instance().palette()
+        dark = pal.color(QPalette.ColorRole.Window).lightness() < 128
+    except Exception:
+        dark = None
+
+    sheet = _stylesheet(dark)
+    if widget.styleSheet() != sheet:
+        widget.setStyleSheet(sheet)
 
 
 # ── Sponsor logo widget ───────────────────────────────────────────────────────
@@ -21,6 +21,7 @@ from ..extra_sync import (
 from .synced_extra_dialog import SyncedExtraSelectionDialog
 from ..tag_utils import parse_tag, normalize_subtag_for_matching
 from ..suggest_tags import suggest_subject_tags
+from ..derived_indexes import keyed
 from .page_selector import _SubtagChip
 try:
     from ..ui.styles import apply_malleus_style, make_header, COLORS
@@ -368,7 +369,7 @@ class MissingPageDialog(QDialog):
         try:
             cached_pages, _ = self.notion_cache.load_from_cache(database_id)
             pages = (
-                self.notion_cache.filter_pages(cached_pages, search_term_normalised)
+                self.notion_cache.filter_pages(cached_pages, search_term_normalised, database_id)
                 if cached_pages else []
             )
         except Exception as e:
@@ -485,35 +486,27 @@ def is_general_page(page: Dict) -> bool:
     )
     return 'ℹ️' in search_prefix
 
+def _title_key(page: Dict) -> str:
+    return _normalise(page['properties']['Name']['title'][0]['text']['content'])
+
+
+# _normalise(title) → Subjects page, in the cache's derived-index registry.
+TITLE_INDEX = "update_subject_tags.title"
+_by_title = keyed(_title_key)
+
+
 def search_page_in_cache(notion_cache, page_name: str) -> Optional[Dict]:
     """
     Find a page by *exact* title match (case-insensitive, underscore-tolerant)
     in the Subjects database cache.
 
     page_name comes straight from the tag, e.g. 'Inclusion_body_myositis'.
+    The title index is built once per cache version, not scanned per note.
     """
     database_id = get_database_id("Subjects")
     try:
-        cached_pages, _ = notion_cache.load_from_cache(database_id, warn_if_expired=False)
-        if not cached_pages:
-            return None
-
-        # Normalise: underscores → spaces, lowercase
-        target = _normalise(page_name)
-
-        for page in cached_pages:
-            try:
-                title_list = page['properties']['Name']['title']
-                if not title_list:
-                    continue
-                title = _normalise(title_list[0]['text']['content'])
-                if title == target:
-                    return page
-            except Exception:
-                continue
-
-        return None
-
+        titles = notion_cache.index(database_id, TITLE_INDEX, _by_title)
+        return titles.get(_normalise(page_name))
     except Exception as e:
         print(f"Error searching cache: {e}")
         return None
@@ -1,15 +1,24 @@
 import os
 import json
 import time
-import threading
+import hashlib
+import itertools
+import tempfile
 import concurrent.futures
 import requests
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
 from pathlib import Path
 
 from hierarchy_tags import GUIDELINES_PREFIX_SEGMENTS
-from cache_generation import generate_from_pages, GENERATOR_VERSION
+from cache_generation import (generate_from_pages, GENERATOR_VERSION, API_BASE,
+                              GENERATED_PROPERTIES, CROSSREF_PROPERTIES, query_page,
+                              paginate)
+from fetch_checkpoint import FetchCheckpoint
+import seed_codec
+import seed_delta
+from generation_profile import GenerationProfile
+from shared_fetch import SharedFetchRegistry
+from request_scheduler import SCHEDULER
+from sync_state import SyncState, PageSizer, property_ids
 
 NOTION_TOKEN = os.environ.get('NOTION_TOKEN')
 if not NOTION_TOKEN:
@@ -44,20 +53,15 @@ USES_FOR_SEARCH = {
     GUIDELINES_DATABASE_ID,
 }
 
-# Large databases time out at page_size=100 even with server-side formula filtering.
-# eTG has heavy rollups that make each row expensive to return — use page_size=5 so
-# Notion only computes rollups for 5 rows per request instead of 25/100.
-PAGE_SIZE_OVERRIDE = {
-    # The original Subjects/Pharmacology DBs are throttled while they still carry
-    # the heavy Notion formulas (generation fetches every page).  Once those
-    # formula properties are deleted the DBs are light — bump these to 100 (or
-    # remove the entries) for faster generation.
-    SUBJECT_DATABASE_ID_ORIGINAL: 25,
-    PHARMACOLOGY_DATABASE_ID_ORIGINAL: 25,
-    ETG_DATABASE_ID:          100,
-    GUIDELINES_DATABASE_ID:   25,
-}
-DEFAULT_PAGE_SIZE = 100
+# Page sizes are learned per database (sync_state.PageSizer, persisted in
+# cache/_sync_state.json): grown while Notion answers quickly, halved on a 504.
+# A database that sheds its heavy formulas speeds up without a code change.
+
+# Checkpoints of part-finished paginated fetches (fetch_checkpoint.py): a
+# database whose fetch dies part-way resumes from its last cursor when _run_one
+# retries it.  Outside cache/ so they are never committed; discarded on success.
+CHECKPOINT_DIR = Path(os.environ.get('FETCH_CHECKPOINT_DIR')
+                      or Path(tempfile.gettempdir()) / "malleus_fetch_checkpoints")
 
 # No databases currently need client-side-only filtering, but this set is kept
 # for future use if a database's formula scan is too expensive even at page_size=5.
@@ -94,42 +98,82 @@ PHARMACOLOGY_GENERATE = {
     },
 }
 
-TIMEOUT = 120  # seconds — large databases need time
-
-# ── Global rate limiter (3 req/s across all threads) ──────────────────
+# Cross-ref databases read by more than one build.  Each is fetched once per run
+# (full, unfiltered) through a SharedFetchRegistry and shared read-only; the
+# Rotation seed is cut from that same fetch by filtering `For Search` client-side.
+SHARED_FETCH_DATABASES = {QUESTION_BANKS_DATABASE_ID, ROTATION_DATABASE_ID}
+
+# Properties fetched (filter_properties) for databases whose only consumer is a
+# generator; every other database is fetched whole since its pages are the seed.
+#   generated DBs   everything but the properties the generator writes itself
+#   Question Banks  only what the generators read (it has no seed of its own)
+FETCH_PROPERTIES = {
+    SUBJECT_DATABASE_ID: {'exclude_properties': GENERATED_PROPERTIES['subjects']},
+    PHARMACOLOGY_DATABASE_ID: {'exclude_properties': GENERATED_PROPERTIES['pharmacology']},
+    GUIDELINES_DATABASE_ID: {'exclude_properties': GENERATED_PROPERTIES['guidelines']},
+    QUESTION_BANKS_DATABASE_ID: {'properties': CROSSREF_PROPERTIES['qb']},
+}
 
-_rate_lock = threading.Lock()
-_last_request_time = 0.0
-_MIN_INTERVAL = 1.0 / 3  # enforce max 3 requests/second
+TIMEOUT = 120  # seconds — large databases need time
 
-def _rate_limited_wait():
-    global _last_request_time
-    with _rate_lock:
-        now = time.time()
-        wait = _MIN_INTERVAL - (now - _last_request_time)
-        if wait > 0:
-            time.sleep(wait)
-        _last_request_time = time.time()
+# Every generated build prints its stage profile to the CI log; set this to a
+# path to also append the profiles as JSON lines (e.g. for an uploaded artifact).
+GENERATION_PROFILE_LOG = os.environ.get('GENERATION_PROFILE_LOG')
+
+# ── Content-addressed builds ──────────────────────────────────────────
+# Every seed records `input_hash` — a digest of everything its content is derived
+# from (raw page payloads, the Question Bank / Rotation inputs, GENERATOR_VERSION).
+# When that build's fetch began is kept apart from the seed, as
+# `inputs_fetched_at` in the sync state (cache/_sync_state.json), so moving it
+# forward never changes a published seed (or its deltas and manifest entry).  A
+# daily run first probes each source database for pages edited since then; with
+# none it skips the database without fetching.  Otherwise it fetches, and if the
+# inputs still hash the same it skips generation (and block fetches) and leaves
+# the seed untouched.  Probes can't see deleted pages, so a build older than
+# FULL_REBUILD_AGE always re-fetches.
+FULL_REBUILD_AGE = 7 * 24 * 3600
+PROBE_OVERLAP = 10 * 60   # last_edited_time is minute-granular — probe a margin before
+FORCE_REBUILD = os.environ.get('FORCE_REBUILD') == '1'   # ignore hashes/probes
+
+def _stable(obj):
+    """`obj` minus the fields that differ between two fetches of unchanged
+    content: Notion-hosted file URLs (signed, rotated hourly with `expiry_time`)
+    and request ids."""
+    if isinstance(obj, dict):
+        drop = ('url', 'expiry_time') if 'expiry_time' in obj else ('request_id',)
+        return {k: _stable(v) for k, v in obj.items() if k not in drop}
+    if isinstance(obj, list):
+        return [_stable(v) for v in obj]
+    return obj
+
+def inputs_hash(*page_lists, generator_version=None) -> str:
+    """sha256 over the stable part of each page list (order-independent within a
+    list) plus the generator version for locally-generated databases."""
+    h = hashlib.sha256()
+    if generator_version is not None:
+        h.update(f"generator:{generator_version}\n".encode("utf-8"))
+    for pages in page_lists:
+        h.update(b"--\n")
+        for page in sorted(pages, key=lambda p: p.get("id", "")):
+            h.update(json.dumps(_stable(page), sort_keys=True, separators=(",", ":")).encode("utf-8"))
+            h.update(b"\n")
+    return h.hexdigest()
+
+def _iso(ts: float) -> str:
+    return time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(ts))
 
 # ── Session factory ───────────────────────────────────────────────────
+# Rate limiting and retries (429 / 5xx / connection errors) are done per request
+# by request_scheduler.SCHEDULER, shared with cache_generation in this process.
 
 def make_session():
-    """Create a requests session with built-in retry/backoff at the transport level."""
+    """Create a requests session carrying the Notion auth headers."""
     session = requests.Session()
     session.headers.update({
         "Authorization": f"Bearer {NOTION_TOKEN}",
         "Notion-Version": "2025-09-03",
         "Content-Type": "application/json",
     })
-    retry = Retry(
-        total=5,
-        backoff_factor=2,
-        status_forcelist=[429, 500, 502, 503, 504],
-        allowed_methods=["POST", "GET"],
-        raise_on_status=False,
-    )
-    adapter = HTTPAdapter(max_retries=retry)
-    session.mount("https://", adapter)
     return session
 
 # ── Block → HTML converter ────────────────────────────────────────────
@@ -268,46 +312,51 @@ def blocks_to_html(blocks: list) -> str:
 # ── NotionCache ───────────────────────────────────────────────────────
 
 class NotionCache:
-    def __init__(self):
+    def __init__(self, shared: SharedFetchRegistry = None, sync_state: SyncState = None):
         self.cache_dir = Path("cache")
         self.cache_dir.mkdir(exist_ok=True)
         self.session = make_session()  # each instance gets its own session (thread-safe)
-        self._data_source_id_cache = {}
+        self.shared = shared or SharedFetchRegistry()
+        # Data-source ids / property schemas, committed with the seeds so the
+        # next run needn't rediscover them (see sync_state.py).
+        self.sync_state = sync_state or SyncState(self.cache_dir / "_sync_state.json")
+        self._sizers = {}
 
     def _get_data_source_id(self, database_id: str) -> str:
-        if database_id in self._data_source_id_cache:
-            return self._data_source_id_cache[database_id]
-        data = self.get(f"https://api.notion.com/v1/databases/{database_id}")
+        ds_id = self.sync_state.get(database_id, "data_source_id")
+        if ds_id:
+            return ds_id
+        data = self.get(f"{API_BASE}/databases/{database_id}")
         sources = data.get("data_sources", [])
         ds_id = sources[0].get("id", database_id) if sources else database_id
-        self._data_source_id_cache[database_id] = ds_id
+        self.sync_state.update(database_id, data_source_id=ds_id)
         print(f"  data_source_id for {database_id}: {ds_id}")
         return ds_id
 
+    def _schema(self, database_id: str, wanted=()) -> dict:
+        """{property name: property id} of the database's data source."""
+        def fetch():
+            ds_id = self._get_data_source_id(database_id)
+            data = self.get(f"{API_BASE}/data_sources/{ds_id}")
+            return {name: prop.get("id", name)
+                    for name, prop in data.get("properties", {}).items()}
+        return self.sync_state.schema(database_id, fetch, wanted)
+
     def get(self, url: str) -> dict:
-        for attempt in range(1, 6):
-            try:
-                _rate_limited_wait()
-                r = self.session.get(url, timeout=TIMEOUT)
-                r.raise_for_status()
-                return r.json()
-            except Exception as e:
-                print(f"  GET attempt {attempt}/5 failed: {type(e).__name__}: {e}")
-                if attempt < 5:
-                    time.sleep(2 ** attempt)
-                else:
-                    raise
+        r = SCHEDULER.send(self.session, "GET", url, timeout=TIMEOUT)
+        r.raise_for_status()
+        return r.json()
 
     def _fetch_children_flat(self, block_id: str) -> list:
         """Fetch direct children of a block, handling pagination."""
         blocks = []
-        url = f"https://api.notion.com/v1/blocks/{block_id}/children?page_size=100"
+        url = f"{API_BASE}/blocks/{block_id}/children?page_size=100"
         while url:
             data = self.get(url)
             blocks.extend(data.get("results", []))
             if data.get("has_more") and data.get("next_cursor"):
                 cursor = data["next_cursor"]
-                url = f"https://api.notion.com/v1/blocks/{block_id}/children?page_size=100&start_cursor={cursor}"
+                url = f"{API_BASE}/blocks/{block_id}/children?page_size=100&start_cursor={cursor}"
             else:
                 url = None
         return blocks
@@ -320,49 +369,160 @@ class NotionCache:
                 block["_children"] = self.fetch_blocks(block["id"])
         return blocks
 
+    def _page_sizer(self, database_id: str) -> PageSizer:
+        if database_id not in self._sizers:
+            self._sizers[database_id] = PageSizer(self.sync_state, database_id)
+        return self._sizers[database_id]
+
+    def _query(self, database_id: str, payload: dict, narrow: bool = True,
+               paged: bool = True) -> dict:
+        """POST a data-source query (scheduled and retried by SCHEDULER),
+        returning only the FETCH_PROPERTIES for this database when `narrow`.
+        With `paged`, the page size is the database's adaptive one.
+
+        A 400/404 may mean the stored data-source id or schema is out of date (a
+        property renamed or deleted): they are forgotten and the query re-sent
+        once with fresh ones, then once more without a property filter."""
+        narrowing = FETCH_PROPERTIES.get(database_id) if narrow else None
+        for attempt in ("stored", "refreshed", "unfiltered"):
+            ds_id = self._get_data_source_id(database_id)
+            prop_ids = None
+            if narrowing and attempt != "unfiltered":
+                wanted = narrowing.get('properties') or ()
+                prop_ids = property_ids(self._schema(database_id, wanted), narrowing.get('properties'),
+                                        narrowing.get('exclude_properties', ()))
+            url = f"{API_BASE}/data_sources/{ds_id}/query"
+            params = {"filter_properties[]": prop_ids} if prop_ids else None
+            if paged:
+                response = query_page(self.session, url, payload, self._page_sizer(database_id),
+                                      params=params, timeout=TIMEOUT)
+            else:
+                response = SCHEDULER.send(self.session, "POST", url, params=params,
+                                          json=payload, timeout=TIMEOUT)
+            if response.status_code in (400, 404) and attempt != "unfiltered" \
+                    and not (attempt == "refreshed" and not prop_ids):
+                print(f"  Query of {database_id} failed ({response.status_code}) — retrying "
+                      f"with {'a refreshed schema' if attempt == 'stored' else 'every property'}")
+                self.sync_state.forget(database_id, "data_source_id", "schema", "schema_at")
+                continue
+            response.raise_for_status()
+            return response.json()
+
     def fetch_pages_batch(self, database_id: str, start_cursor: str = None, use_for_search: bool = False) -> dict:
-        page_size = PAGE_SIZE_OVERRIDE.get(database_id, DEFAULT_PAGE_SIZE)
         if use_for_search:
             payload = {
                 "filter": {
                     "property": "For Search",
                     "formula": {"checkbox": {"equals": True}}
                 },
-                "page_size": page_size,
             }
         else:
-            payload = {"page_size": page_size}
+            payload = {}
 
         if start_cursor:
             payload["start_cursor"] = start_cursor
 
-        ds_id = self._get_data_source_id(database_id)
-        url = f"https://api.notion.com/v1/data_sources/{ds_id}/query"
+        return self._query(database_id, payload)
 
-        for attempt in range(1, 9):
-            try:
-                _rate_limited_wait()
-                response = self.session.post(url, json=payload, timeout=TIMEOUT)
-                response.raise_for_status()
-                return response.json()
-            except Exception as e:
-                print(f"  Attempt {attempt}/8 failed: {type(e).__name__}: {e}")
-                if attempt < 8:
-                    wait = 2 ** attempt
-                    print(f"  Waiting {wait}s before retry...")
-                    time.sleep(wait)
-                else:
-                    raise
-
-    def fetch_all(self, database_id: str, use_for_search: bool = False) -> list:
-        """Fetch every page of a database (handling pagination)."""
-        pages, start_cursor, has_more = [], None, True
-        while has_more:
-            data = self.fetch_pages_batch(database_id, start_cursor, use_for_search=use_for_search)
-            pages.extend(data["results"])
-            has_more = data.get("has_more", False)
-            start_cursor = data.get("next_cursor")
-        return pages
+    def any_edits_since(self, database_id: str, since_ts: float, use_for_search: bool = False) -> bool:
+        """Cheap probe: one page_size=1 query for a page edited on/after
+        `since_ts` (restricted to `For Search` pages when the build only fetches
+        those, so edits to pages it never reads don't trigger a rebuild)."""
+        edited = {"timestamp": "last_edited_time",
+                  "last_edited_time": {"on_or_after": _iso(since_ts)}}
+        if use_for_search:
+            edited = {"and": [
+                {"property": "For Search", "formula": {"checkbox": {"equals": True}}},
+                edited,
+            ]}
+        data = self._query(database_id, {"page_size": 1, "filter": edited},
+                           narrow=False, paged=False)
+        return bool(data.get("results"))
+
+    # ── seeds ────────────────────────────────────────────────────────────
+    def _load_seed(self, database_id: str) -> dict:
+        """The committed seed for `database_id`, or {} if there is none yet."""
+        try:
+            with (self.cache_dir / f"{database_id}.json").open("r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _inputs_fetched_at(self, database_id: str, seed: dict) -> float:
+        """When the build behind `seed` began fetching (0 if unknown).  Seeds
+        written before the stamp moved to the sync state still carry it."""
+        return float(self.sync_state.get(database_id, "inputs_fetched_at",
+                                         seed.get("inputs_fetched_at", 0)))
+
+    def _write_seed(self, database_id: str, seed: dict, fetched_at: float) -> Path:
+        """Write a seed, publishing its change against the previous one as a
+        delta (seed_delta.py) so the add-on can catch up without the full file,
+        and its compressed copies (seed_codec.py) for a smaller full download.
+        `fetched_at` (when its inputs were fetched) goes to the sync state."""
+        index = seed_delta.publish(self.cache_dir, database_id, self._load_seed(database_id), seed)
+        print(f"  Seed {database_id}: head {index['head'][:12]}, {len(index['deltas'])} delta(s) in chain")
+        cache_path = self.cache_dir / f"{database_id}.json"
+        blob = json.dumps(seed).encode("utf-8")
+        cache_path.write_bytes(blob)
+        for suffix, path in seed_codec.write_variants(cache_path, blob).items():
+            print(f"  Seed {database_id}{suffix}: {path.stat().st_size / max(len(blob), 1):.0%} of the JSON")
+        self.sync_state.update(database_id, inputs_fetched_at=fetched_at)
+        return cache_path
+
+    def _unchanged_since_build(self, name: str, database_id: str, seed: dict,
+                               probes: list, generated: bool = False) -> bool:
+        """True when the seed can stand without fetching anything: it carries an
+        input hash, its build is younger than FULL_REBUILD_AGE, (generated DBs) it
+        came from this GENERATOR_VERSION, and none of `probes` —
+        (database_id, use_for_search) pairs — has an edit since its fetch began."""
+        if FORCE_REBUILD or not seed.get("input_hash"):
+            return False
+        if generated and seed.get("generator_version") != GENERATOR_VERSION:
+            return False
+        fetched_at = self._inputs_fetched_at(database_id, seed)
+        if time.time() - fetched_at > FULL_REBUILD_AGE:
+            print(f"  [{name}] Last build older than {FULL_REBUILD_AGE // 86400} days — full rebuild")
+            return False
+        for db_id, for_search in probes:
+            if self.any_edits_since(db_id, fetched_at - PROBE_OVERLAP, use_for_search=for_search):
+                print(f"  [{name}] Edits in {db_id} since last build")
+                return False
+        print(f"  [{name}] No edits since {_iso(fetched_at)} — skipped")
+        return True
+
+    def _keep_if_same_inputs(self, name: str, database_id: str, seed: dict,
+                             digest: str, fetched_at: float) -> bool:
+        """If the freshly fetched inputs hash to the seed's `input_hash`, keep
+        the seed as it is (no generation, no block fetches, no write) and only
+        move `inputs_fetched_at` forward so later probes start from here."""
+        if FORCE_REBUILD or digest != seed.get("input_hash"):
+            return False
+        self.sync_state.update(database_id, inputs_fetched_at=fetched_at)
+        print(f"  [{name}] Inputs unchanged ({digest[:12]}) — kept existing seed")
+        return True
+
+    def fetch_all(self, database_id: str, use_for_search: bool = False,
+                  label: str = None) -> list:
+        """Fetch every page of a database (handling pagination).  Pages are
+        checkpointed as they arrive (CHECKPOINT_DIR), so when _run_one retries a
+        database whose fetch died part-way, it resumes from the last cursor."""
+        batches = itertools.count(1)
+
+        def send(cursor):
+            if label:
+                print(f"  [{label}] Fetching batch {next(batches)}...")
+            return self.fetch_pages_batch(database_id, cursor, use_for_search=use_for_search)
+
+        checkpoint = FetchCheckpoint(CHECKPOINT_DIR, "all", database_id, use_for_search,
+                                     FETCH_PROPERTIES.get(database_id))
+        return paginate(send, checkpoint, label or database_id)
+
+    def fetch_shared(self, database_id: str) -> list:
+        """fetch_all through the run's shared registry — for cross-ref databases
+        several builds read.  The returned list is shared: don't mutate it.
+        (Rotation is fetched whole for its own seed; Question Banks narrowed to
+        what the generators read, see FETCH_PROPERTIES.)"""
+        return self.shared.get(database_id, lambda: self.fetch_all(database_id))
 
     def update_subjects(self, database_id: str, name: str):
         """Generate the Subjects cache locally from the relation graph + the
@@ -370,18 +530,32 @@ class NotionCache:
         (those with no `Sub-item`).  Injects the same property names the old
         Notion formulas produced, so the add-on is unchanged."""
         cfg = SUBJECTS_GENERATE[database_id]
-        print(f"  [{name}] Fetching full Subjects graph...")
-        all_pages = self.fetch_all(database_id)
-        print(f"  [{name}] Fetched {len(all_pages)} pages; fetching Question Banks...")
-        qb_pages = self.fetch_all(cfg["qb_database_id"])
-        print(f"  [{name}] Fetched {len(qb_pages)} QB pages; fetching Rotation...")
-        rotation_pages = self.fetch_all(cfg["rotation_database_id"])
+        seed = self._load_seed(database_id)
+        probes = [(database_id, False), (cfg["qb_database_id"], False),
+                  (cfg["rotation_database_id"], False)]
+        if self._unchanged_since_build(name, database_id, seed, probes, generated=True):
+            return
+        fetched_at = time.time()
+        profile = GenerationProfile('subjects')
+        with profile.stage('fetch'):
+            print(f"  [{name}] Fetching full Subjects graph...")
+            all_pages = self.fetch_all(database_id)
+            print(f"  [{name}] Fetched {len(all_pages)} pages; fetching Question Banks...")
+            qb_pages = self.fetch_shared(cfg["qb_database_id"])
+            print(f"  [{name}] Fetched {len(qb_pages)} QB pages; fetching Rotation...")
+            rotation_pages = self.fetch_shared(cfg["rotation_database_id"])
+        digest = inputs_hash(all_pages, qb_pages, rotation_pages,
+                             generator_version=GENERATOR_VERSION)
+        if self._keep_if_same_inputs(name, database_id, seed, digest, fetched_at):
+            return
         print(f"  [{name}] Generating tags from {len(all_pages)} pages...")
-        leaves = generate_from_pages('subjects', all_pages, qb_pages, rotation_pages)
-        cache_path = self.cache_dir / f"{database_id}.json"
-        with cache_path.open("w", encoding="utf-8") as f:
-            json.dump({"version": 1, "generator_version": GENERATOR_VERSION,
-                       "timestamp": time.time(), "pages": leaves}, f)
+        leaves = generate_from_pages('subjects', all_pages, qb_pages, rotation_pages,
+                                     profile=profile, profile_log=GENERATION_PROFILE_LOG)
+        print(f"  [{name}] {profile.summary()}")
+        cache_path = self._write_seed(database_id, {
+            "version": 1, "generator_version": GENERATOR_VERSION,
+            "timestamp": time.time(), "input_hash": digest,
+            "pages": leaves}, fetched_at)
         print(f"  [{name}] Generated + saved {len(leaves)} leaf pages → {cache_path}")
 
     def update_pharmacology(self, database_id: str, name: str):
@@ -390,16 +564,28 @@ class NotionCache:
         one-level-above-leaf categories).  Same injected property names as the
         old Notion formulas, so the add-on is unchanged."""
         cfg = PHARMACOLOGY_GENERATE[database_id]
-        print(f"  [{name}] Fetching full Pharmacology graph...")
-        all_pages = self.fetch_all(database_id)
-        print(f"  [{name}] Fetched {len(all_pages)} pages; fetching Question Banks...")
-        qb_pages = self.fetch_all(cfg["qb_database_id"])
+        seed = self._load_seed(database_id)
+        probes = [(database_id, False), (cfg["qb_database_id"], False)]
+        if self._unchanged_since_build(name, database_id, seed, probes, generated=True):
+            return
+        fetched_at = time.time()
+        profile = GenerationProfile('pharmacology')
+        with profile.stage('fetch'):
+            print(f"  [{name}] Fetching full Pharmacology graph...")
+            all_pages = self.fetch_all(database_id)
+            print(f"  [{name}] Fetched {len(all_pages)} pages; fetching Question Banks...")
+            qb_pages = self.fetch_shared(cfg["qb_database_id"])
+        digest = inputs_hash(all_pages, qb_pages, generator_version=GENERATOR_VERSION)
+        if self._keep_if_same_inputs(name, database_id, seed, digest, fetched_at):
+            return
         print(f"  [{name}] Generating tags from {len(all_pages)} pages...")
-        leaves = generate_from_pages('pharmacology', all_pages, qb_pages)
-        cache_path = self.cache_dir / f"{database_id}.json"
-        with cache_path.open("w", encoding="utf-8") as f:
-            json.dump({"version": 1, "generator_version": GENERATOR_VERSION,
-                       "timestamp": time.time(), "pages": leaves}, f)
+        leaves = generate_from_pages('pharmacology', all_pages, qb_pages,
+                                     profile=profile, profile_log=GENERATION_PROFILE_LOG)
+        print(f"  [{name}] {profile.summary()}")
+        cache_path = self._write_seed(database_id, {
+            "version": 1, "generator_version": GENERATOR_VERSION,
+            "timestamp": time.time(), "input_hash": digest,
+            "pages": leaves}, fetched_at)
         print(f"  [{name}] Generated + saved {len(leaves)} pages → {cache_path}")
 
     def update_cache(self, database_id: str, name: str):
@@ -422,34 +608,48 @@ class NotionCache:
             and database_id not in SERVER_SIDE_FILTER_SKIP
         )
         is_synced_extra = database_id in (SYNCED_EXTRA_DATABASE_ID, SYNCED_ADDITIONAL_RESOURCES_DATABASE_ID)
-        pages = []
-        has_more = True
-        start_cursor = None
-        batch = 0
-
-        while has_more:
-            batch += 1
-            print(f"  [{name}] Fetching batch {batch}...")
-            data = self.fetch_pages_batch(database_id, start_cursor, use_for_search=server_side_filter)
-            results = data['results']
-            if use_for_search and not generate_hierarchy:
-                # Always filter client-side — for server_side_filter DBs this is a no-op
-                # (server already filtered), for SERVER_SIDE_FILTER_SKIP DBs this does the work
-                results = [
-                    p for p in results
-                    if p.get("properties", {}).get("For Search", {}).get("formula", {}).get("boolean", False)
-                ]
-            pages.extend(results)
-            has_more = data.get('has_more', False)
-            start_cursor = data.get('next_cursor')
-            print(f"  [{name}] Batch {batch}: {len(results)} pages (total: {len(pages)})")
+        seed = self._load_seed(database_id)
+        if self._unchanged_since_build(name, database_id, seed,
+                                       [(database_id, server_side_filter)],
+                                       generated=generate_hierarchy):
+            return
+        fetched_at = time.time()
+        fetch_started = time.perf_counter()
+
+        if database_id in SHARED_FETCH_DATABASES and not generate_hierarchy:
+            pages = self.fetch_shared(database_id)
+            print(f"  [{name}] {len(pages)} pages from the shared fetch")
+        else:
+            pages = self.fetch_all(database_id, use_for_search=server_side_filter, label=name)
+            print(f"  [{name}] Fetched {len(pages)} pages")
+        if use_for_search and not generate_hierarchy:
+            # Always filter client-side — for server_side_filter DBs this is a no-op
+            # (server already filtered), for SERVER_SIDE_FILTER_SKIP DBs / the
+            # shared full fetch this does the work
+            pages = [
+                p for p in pages
+                if p.get("properties", {}).get("For Search", {}).get("formula", {}).get("boolean", False)
+            ]
+
+        digest = inputs_hash(pages, generator_version=GENERATOR_VERSION if generate_hierarchy else None)
+        # Synced pages embed block content that a page's own hash can't see (e.g.
+        # an edited synced-block original), so their periodic full rebuild always
+        # re-fetches blocks.
+        stale = time.time() - self._inputs_fetched_at(database_id, seed) > FULL_REBUILD_AGE
+        if not (is_synced_extra and stale) and \
+                self._keep_if_same_inputs(name, database_id, seed, digest, fetched_at):
+            return
 
         # Generate hierarchy tags from the full `Parent item` graph (shared
         # dispatch), keeping only the `For Search` leaves.
         if generate_hierarchy:
-            leaves = generate_from_pages('guidelines', pages)
+            profile = GenerationProfile('guidelines')
+            profile.stages['fetch'] = time.perf_counter() - fetch_started
+            leaves = generate_from_pages('guidelines', pages, profile=profile,
+                                         profile_log=GENERATION_PROFILE_LOG)
             print(f"  [{name}] Built hierarchy tags from {len(pages)} pages; "
                   f"{len(leaves)} leaves kept")
+            print(f"  [{name}] {profile.summary()}")
             pages = leaves
 
         # For Synced Extra, fetch block content and embed as HTML
@@ -466,21 +666,29 @@ class NotionCache:
                 except Exception as e:
                     print(f"    [{name}] Warning: could not fetch blocks for {page_id}: {e}")
 
-        cache_path = self.cache_dir / f"{database_id}.json"
-        cache_obj = {'version': 1, 'timestamp': time.time(), 'pages': pages}
+        if is_synced_extra and seed.get('input_hash') == digest and seed.get('pages') == pages:
+            # Periodic block re-fetch found nothing new — only advance the stamp.
+            self.sync_state.update(database_id, inputs_fetched_at=fetched_at)
+            print(f"  [{name}] Block content unchanged — kept existing seed")
+            return
+
+        cache_obj = {'version': 1, 'timestamp': time.time(), 'input_hash': digest,
+                     'pages': pages}
         if generate_hierarchy:   # locally-generated (Guidelines) — stamp the generator
             cache_obj['generator_version'] = GENERATOR_VERSION
-        with cache_path.open('w', encoding='utf-8') as f:
-            json.dump(cache_obj, f)
+        cache_path = self._write_seed(database_id, cache_obj, fetched_at)
         print(f"  [{name}] Saved {len(pages)} pages → {cache_path}")
 
-def _run_one(db_id: str, name: str):
-    """Worker function — each database gets its own NotionCache (and session).
-    Retries the full database update up to 3 times on failure with increasing waits."""
+def _run_one(db_id: str, name: str, shared: SharedFetchRegistry = None,
+             sync_state: SyncState = None):
+    """Worker function — each database gets its own NotionCache (and session),
+    all sharing one fetch registry for the cross-ref databases.
+    Retries the full database update up to 3 times on failure with increasing waits
+    (a fetch that got part-way resumes from its checkpoint)."""
     for db_attempt in range(1, 4):
         try:
             print(f"\n--- Starting {name} (attempt {db_attempt}/3) ---")
-            cache = NotionCache()
+            cache = NotionCache(shared, sync_state)
             cache.update_cache(db_id, name)
             print(f"--- Done: {name} ---")
             return
@@ -510,8 +718,11 @@ def update_notion_cache():
     ]
 
     print(f"Running {len(databases)} database updates in parallel...")
+    shared = SharedFetchRegistry()   # one per run: Question Banks / Rotation fetched once
+    sync_state = SyncState(Path("cache") / "_sync_state.json")
     with concurrent.futures.ThreadPoolExecutor(max_workers=len(databases)) as executor:
-        futures = {executor.submit(_run_one, db_id, name): name for db_id, name in databases}
+        futures = {executor.submit(_run_one, db_id, name, shared, sync_state): name
+                   for db_id, name in databases}
         failed = []
         for future in concurrent.futures.as_completed(futures):
             name = futures[future]
@@ -520,6 +731,11 @@ def update_notion_cache():
             except Exception as e:
                 print(f"\nERROR updating {name}: {e}")
                 failed.append(name)
+    # Written even when some databases failed: their previous seeds (and
+    # manifest entries) still stand.
+    seed_delta.write_manifest(Path("cache"), [db_id for db_id, _ in databases])
+    print(f"Shared cross-ref fetches: {shared.counts}")
+    print(f"Request scheduler: {SCHEDULER.stats()}")
 
     if failed:
         raise RuntimeError(f"The following databases failed to update: {', '.join(failed)}")
@@ -542,7 +758,8 @@ if __name__ == "__main__":
         matched = [(db_id, name) for db_id, name in databases if target in name.lower()]
         if not matched:
             raise SystemExit(f"No database matching '{sys.argv[1]}'. Options: {[n for _, n in databases]}")
+        shared = SharedFetchRegistry()
         for db_id, name in matched:
-            _run_one(db_id, name)
+            _run_one(db_id, name, shared)
     else:
         update_notion_cache()
@@ -0,0 +1,93 @@
+"""
+Idle-time warmup: pay the first search's costs before the first search.
+
+Opening the page selector for the first time used to parse every cache,
+expand every page's search vocabulary and, for "Suggest tags", build the
+token index — all while the user waited.  Once startup has settled the add-on
+runs a Warmup instead: a list of named steps (load a snapshot, build an index,
+import a module, …) executed one by one on a BACKGROUND task of the executor,
+so any real update or interactive request goes first, and
+
+  * throttled — it pauses between steps so the UI thread gets the GIL back;
+  * cancellable — it checks the task's token between steps (profile close);
+  * memory-bounded — each step reports roughly how many bytes it kept alive
+    (`estimate_bytes`), and once the budget is spent the remaining steps are
+    skipped: they simply happen on first use, as before.
+
+    warmup = Warmup(budget_mb=256)
+    warmup.add("Subjects cache", lambda: estimate_bytes(load_pages()))
+    executor.submit("_warmup", warmup.run, priority=PRIORITY_BACKGROUND)
+
+Steps are ordered most useful first; a step that fails is logged and skipped.
+
+Dependency-free (no aqt); safe to import in CI and inside Anki.
+"""
+import sys
+import time
+
+try:  # standalone (CI) vs add-on package context
+    from task_executor import check_cancelled
+except ImportError:
+    from .task_executor import check_cancelled
+
+DEFAULT_BUDGET_MB = 256
+STEP_PAUSE = 0.05          # seconds between steps
+
+
+def _deep_size(obj, seen: set) -> int:
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(_deep_size(k, seen) + _deep_size(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(_deep_size(item, seen) for item in obj)
+    return size
+
+
+def estimate_bytes(items, sample: int = 64) -> int:
+    """Rough in-memory size of a collection of JSON-like objects, from a
+    spread-out sample of `sample` of them (sizing all of a large cache would
+    cost about as much as loading it)."""
+    items = list(items.values()) if isinstance(items, dict) else list(items)
+    if not items:
+        return 0
+    step = max(1, len(items) // sample)
+    picked = items[::step]
+    seen = set()
+    return int(sum(_deep_size(item, seen) for item in picked) * len(items) / len(picked))
+
+
+class Warmup:
+    def __init__(self, budget_mb: float = DEFAULT_BUDGET_MB, pause: float = STEP_PAUSE):
+        self.budget = budget_mb * 1024 * 1024
+        self.pause = pause
+        self.used = 0
+        self._steps = []           # (label, fn → bytes kept alive or None)
+
+    def add(self, label: str, fn):
+        self._steps.append((label, fn))
+
+    def run(self):
+        started = time.perf_counter()
+        done = 0
+        for i, (label, fn) in enumerate(self._steps):
+            check_cancelled()
+            if self.used >= self.budget:
+                skipped = ", ".join(name for name, _ in self._steps[i:])
+                print(f"[Warmup] memory budget ({self.budget / 2**20:.0f} MB) reached; "
+                      f"left for first use: {skipped}")
+                break
+            t0 = time.perf_counter()
+            try:
+                kept = fn() or 0
+            except Exception as e:
+                print(f"[Warmup] {label} failed: {e}")
+            else:
+                self.used += kept
+                done += 1
+                print(f"[Warmup] {label}: {(time.perf_counter() - t0) * 1000:.0f}ms")
+            time.sleep(self.pause)     # yield to the UI thread
+        print(f"[Warmup] {done}/{len(self._steps)} steps in "
+              f"{time.perf_counter() - started:.1f}s, ~{self.used / 2**20:.0f} MB")